@@ -0,0 +1,181 @@
+"""Routes chat completions across several OpenAI-compatible backends.
+
+Each backend is the hosted OpenAI API or any compatible endpoint reached via
+a base URL, such as a local inference server or another provider. The router
+presents the same ``client.chat.completions.create(...)`` surface as
+``openai.OpenAI``, so the interpretation code does not know which backend
+answered.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Optional
+
+import openai
+
+
+DEFAULT_BACKEND_MAX_CONCURRENCY = 8
+LOCAL_BACKEND_API_KEY = "not-needed"
+HOSTED_BACKEND_URL = "https://api.openai.com/v1"
+FALLBACK_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+@dataclass(frozen=True)
+class AIBackendConfig:
+    """Connection settings for one backend; unset values fall back to the main AI settings.
+
+    ``stream_usage`` is False for endpoints that reject ``stream_options``;
+    streamed requests to them omit it and their token usage is estimated.
+    """
+
+    name: str
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    model: Optional[str] = None
+    timeout_seconds: Optional[float] = None
+    max_concurrency: int = DEFAULT_BACKEND_MAX_CONCURRENCY
+    stream_usage: bool = True
+
+    def client_kwargs(self, default_api_key, timeout_seconds, max_retries):
+        api_key = self.api_key or default_api_key
+        if not api_key and self.base_url:
+            api_key = LOCAL_BACKEND_API_KEY
+
+        client_kwargs = {"api_key": api_key, "timeout": timeout_seconds, "max_retries": max_retries}
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
+        if self.timeout_seconds is not None:
+            client_kwargs["timeout"] = self.timeout_seconds
+        return client_kwargs
+
+    def cache_identity(self, model):
+        """Names this backend and the model it serves for a requested model, for cache keys."""
+        base_url = (self.base_url or HOSTED_BACKEND_URL).rstrip("/")
+        return f"{self.name}={base_url}|{self.model or model}"
+
+
+class AIBackend:
+    """A client for one backend plus the semaphore that caps its concurrent requests."""
+
+    def __init__(self, config, client):
+        self.config = config
+        self.client = client
+        self._slots = threading.BoundedSemaphore(config.max_concurrency)
+
+    def try_acquire(self):
+        return self._slots.acquire(blocking=False)
+
+    def acquire(self):
+        self._slots.acquire()
+
+    def release(self):
+        self._slots.release()
+
+    def create(self, **kwargs):
+        if self.config.model:
+            kwargs["model"] = self.config.model
+        if self.config.timeout_seconds is not None:
+            kwargs["timeout"] = self.config.timeout_seconds
+        if not self.config.stream_usage:
+            kwargs.pop("stream_options", None)
+        return self.client.chat.completions.create(**kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+class AIBackendRouter:
+    """Sends each request to the first backend, in fallback order, that has a free slot.
+
+    A backend that fails with a connection error, timeout, rate limit, or
+    server error is skipped and the request moves to the next backend; other
+    errors, such as invalid requests, are raised immediately. When every
+    backend is at its concurrency cap, the request waits for the first one.
+    """
+
+    def __init__(self, backends):
+        if not backends:
+            raise ValueError("At least one AI backend is required.")
+
+        self.backends = list(backends)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._served = threading.local()
+
+    def create(self, **kwargs):
+        last_error = None
+        for backend in self._backends_with_free_slots():
+            try:
+                response = backend.create(**kwargs)
+            except FALLBACK_ERRORS as e:
+                backend.release()
+                logging.warning(f"AI backend '{backend.config.name}' failed, trying the next one: {e}")
+                last_error = e
+                continue
+            except BaseException:
+                backend.release()
+                raise
+
+            self._served.backend = backend
+            if kwargs.get("stream"):
+                return _ReleasingStream(response, backend)
+            backend.release()
+            return response
+
+        raise last_error
+
+    def served_backend(self):
+        """Returns the backend that answered the calling thread's latest request, or None."""
+        return getattr(self._served, "backend", None)
+
+    def cache_identities(self, model):
+        """Returns the cache identity of every backend for a requested model, in fallback order."""
+        return [backend.config.cache_identity(model) for backend in self.backends]
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+    def is_closed(self):
+        return all(backend.client.is_closed() for backend in self.backends)
+
+    def _backends_with_free_slots(self):
+        """Yields backends in fallback order, each with one slot already acquired."""
+        waiting = []
+        for backend in self.backends:
+            if backend.try_acquire():
+                yield backend
+            else:
+                waiting.append(backend)
+
+        for backend in waiting:
+            backend.acquire()
+            yield backend
+
+
+class _ReleasingStream:
+    """Iterates a streamed response and frees its backend slot once it ends."""
+
+    def __init__(self, stream, backend):
+        self._stream = stream
+        self._backend = backend
+        self._released = False
+
+    def __iter__(self):
+        try:
+            yield from self._stream
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._released:
+            self._released = True
+            try:
+                self._stream.close()
+            finally:
+                self._backend.release()
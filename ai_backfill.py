@@ -0,0 +1,261 @@
+"""Batch job that fills in AI contemplations for saved journal entries.
+
+Run with ``python ai_backfill.py`` (or ``make backfill``). Interpretations are
+requested concurrently through an async OpenAI client, appended to a JSONL
+checkpoint as they arrive, and committed to the journal in batched writes, so
+an interrupted run resumes without repeating finished requests.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+
+from ai_integration import (
+    AIConfigurationError,
+    AIRateLimitError,
+    build_ai_config,
+    get_ai_interpretation_async,
+    get_ai_runtime,
+    retry_after_seconds,
+)
+from constants import AI_BACKFILL_CHECKPOINT_FILE
+from file_handler import (
+    JournalValidationError,
+    enrich_journal,
+    load_iching_data,
+    load_journal,
+    reconstruct_reading_from_row,
+    update_journal_ai_interpretations,
+)
+
+
+DEFAULT_BACKFILL_CONCURRENCY = 4
+DEFAULT_BACKFILL_BATCH_SIZE = 20
+DEFAULT_BACKFILL_MAX_ATTEMPTS = 5
+BACKFILL_BACKOFF_BASE_SECONDS = 2.0
+BACKFILL_BACKOFF_MAX_SECONDS = 60.0
+
+
+@dataclass
+class BackfillResult:
+    """Outcome of a backfill run."""
+
+    completed: list = field(default_factory=list)
+    resumed: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+
+
+def select_backfill_rows(journal_df, iching_data):
+    """Returns the journal rows that do not have an AI contemplation yet."""
+    if journal_df.empty:
+        return journal_df
+
+    enriched_df = enrich_journal(journal_df, iching_data)
+    return journal_df[~enriched_df["Has AI Contemplation"].to_numpy(dtype=bool)]
+
+
+def load_backfill_checkpoint(checkpoint_path):
+    """Reads finished interpretations from a checkpoint, skipping torn lines."""
+    checkpoint_path = Path(checkpoint_path)
+    interpretations = {}
+    if not checkpoint_path.exists():
+        return interpretations
+
+    with checkpoint_path.open(encoding="utf-8") as checkpoint_file:
+        for line in checkpoint_file:
+            try:
+                record = json.loads(line)
+                interpretations[str(record["entry_id"])] = record["interpretation"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                logging.warning("Skipping unreadable backfill checkpoint line.")
+    return interpretations
+
+
+def append_backfill_checkpoint(checkpoint_path, entry_id, interpretation):
+    checkpoint_path = Path(checkpoint_path)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    with checkpoint_path.open("a", encoding="utf-8") as checkpoint_file:
+        checkpoint_file.write(json.dumps({"entry_id": entry_id, "interpretation": interpretation}) + "\n")
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Returns the wait before a retry: the provider hint, or jittered exponential backoff."""
+    if retry_after is not None:
+        return min(retry_after, BACKFILL_BACKOFF_MAX_SECONDS)
+
+    delay = min(BACKFILL_BACKOFF_BASE_SECONDS * (2 ** attempt), BACKFILL_BACKOFF_MAX_SECONDS)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class _RateLimitGate:
+    """Pauses every worker while the provider is rate limiting this job."""
+
+    def __init__(self, sleep):
+        self._sleep = sleep
+        self._resume_at = 0.0
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        while (resume_at := self._resume_at) > (now := loop.time()):
+            await self._sleep(resume_at - now)
+            if self._resume_at == resume_at:
+                return
+
+    def pause(self, delay):
+        loop = asyncio.get_running_loop()
+        self._resume_at = max(self._resume_at, loop.time() + delay)
+
+
+async def backfill_ai_interpretations(
+    client,
+    settings,
+    iching_data=None,
+    concurrency=DEFAULT_BACKFILL_CONCURRENCY,
+    batch_size=DEFAULT_BACKFILL_BATCH_SIZE,
+    checkpoint_path=AI_BACKFILL_CHECKPOINT_FILE,
+    runtime=None,
+    max_attempts=DEFAULT_BACKFILL_MAX_ATTEMPTS,
+    sleep=asyncio.sleep,
+):
+    """Requests contemplations for every entry missing one and saves them to the journal.
+
+    ``client`` is an ``openai.AsyncOpenAI``-compatible client. At most
+    ``concurrency`` requests are in flight; a rate limit pauses all workers.
+    The checkpoint is removed once every result has been committed.
+
+    Rate-limited requests are retried here, up to ``max_attempts`` times,
+    behind a pause shared by all workers. The runtime's rate limiter is left
+    out so it does not retry each attempt again, and the client should be
+    built with ``max_retries=0`` (as ``main`` does) so every attempt is a
+    single upstream request that waits for that pause.
+    """
+    if iching_data is None:
+        iching_data, _ = load_iching_data()
+    if runtime is None:
+        runtime = get_ai_runtime(settings)
+    runtime = replace(runtime, rate_limiter=None)
+
+    result = BackfillResult()
+    pending_rows = select_backfill_rows(load_journal(), iching_data)
+    checkpointed = load_backfill_checkpoint(checkpoint_path)
+
+    pending_batch = {}
+    commit_lock = asyncio.Lock()
+
+    async def commit(interpretations):
+        if interpretations:
+            await asyncio.to_thread(update_journal_ai_interpretations, interpretations)
+
+    async def record(entry_id, interpretation):
+        async with commit_lock:
+            pending_batch[entry_id] = interpretation
+            if len(pending_batch) >= batch_size:
+                batch = dict(pending_batch)
+                pending_batch.clear()
+                await commit(batch)
+
+    resumed = {
+        entry_id: checkpointed[entry_id]
+        for entry_id in pending_rows["Entry ID"].astype(str)
+        if entry_id in checkpointed
+    }
+    await commit(resumed)
+    result.resumed.extend(resumed)
+
+    semaphore = asyncio.Semaphore(max(int(concurrency), 1))
+    gate = _RateLimitGate(sleep)
+
+    async def backfill_row(row):
+        entry_id = str(row["Entry ID"])
+        try:
+            reading = reconstruct_reading_from_row(row, iching_data)
+        except JournalValidationError as e:
+            result.failed[entry_id] = str(e)
+            return
+
+        async with semaphore:
+            for attempt in range(max_attempts):
+                await gate.wait()
+                try:
+                    interpretation = await get_ai_interpretation_async(
+                        reading, client, settings=settings, runtime=runtime
+                    )
+                    break
+                except AIRateLimitError as e:
+                    if attempt + 1 == max_attempts:
+                        result.failed[entry_id] = str(e)
+                        return
+                    delay = backoff_delay(attempt, retry_after_seconds(e))
+                    logging.warning(f"Backfill rate limited; retrying {entry_id} in {delay:.1f}s.")
+                    gate.pause(delay)
+                except Exception as e:
+                    logging.error(f"Backfill failed for journal entry {entry_id}: {e}")
+                    result.failed[entry_id] = str(e)
+                    return
+
+        await asyncio.to_thread(append_backfill_checkpoint, checkpoint_path, entry_id, interpretation)
+        await record(entry_id, interpretation)
+        result.completed.append(entry_id)
+
+    await asyncio.gather(
+        *(
+            backfill_row(row)
+            for _, row in pending_rows.iterrows()
+            if str(row["Entry ID"]) not in resumed
+        )
+    )
+    await commit(pending_batch)
+
+    if not result.failed:
+        Path(checkpoint_path).unlink(missing_ok=True)
+    return result
+
+
+def main(argv=None):
+    import openai
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Add AI contemplations to saved journal entries.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_BACKFILL_CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BACKFILL_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    try:
+        ai_config = build_ai_config()
+    except AIConfigurationError as e:
+        parser.error(str(e))
+    if not ai_config.api_key:
+        parser.error(
+            "OPENAI_API_KEY is not set. The backfill only calls that endpoint (at OPENAI_BASE_URL, "
+            "if set); OPENAI_BACKEND_* endpoints are not used."
+        )
+
+    async def run():
+        client_kwargs = {**ai_config.client_kwargs(), "max_retries": 0}
+        async with openai.AsyncOpenAI(**client_kwargs) as client:
+            return await backfill_ai_interpretations(
+                client,
+                ai_config.settings,
+                concurrency=args.concurrency,
+                batch_size=args.batch_size,
+            )
+
+    result = asyncio.run(run())
+    print(
+        f"Added {len(result.completed) + len(result.resumed)} contemplations "
+        f"({len(result.resumed)} from checkpoint); {len(result.failed)} failed."
+    )
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
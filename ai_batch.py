@@ -0,0 +1,384 @@
+"""Offline batch job that regenerates AI contemplations for the whole journal.
+
+Prompts come from the same builder as interactive requests and are written
+as a Batch API request file (one chat completion per line, ``custom_id`` set
+to the journal Entry ID). A backend runs the file, the job polls until it
+finishes, and all interpretations are merged into the journal in one write.
+
+Run with ``python ai_batch.py`` (hosted Batch API) or
+``python ai_batch.py --local`` to run the same file through the configured
+chat-completions client, such as the stub server.
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from ai_backends import AIBackendRouter
+from ai_integration import (
+    AIConfigurationError,
+    build_ai_config,
+    build_interpretation_cache_key,
+    build_interpretation_messages,
+    get_ai_runtime,
+    get_shared_client,
+)
+from file_handler import (
+    JournalValidationError,
+    load_iching_data,
+    load_journal,
+    reconstruct_reading_from_row,
+    update_journal_ai_interpretations,
+)
+
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+DEFAULT_BATCH_POLL_SECONDS = 60.0
+# Batch API limits per input file; larger journals are split across several jobs.
+BATCH_MAX_REQUESTS = 50_000
+BATCH_MAX_FILE_BYTES = 200 * 1024 * 1024
+
+
+class BatchJobError(Exception):
+    """Raised when a batch job cannot be submitted or does not complete."""
+
+
+@dataclass
+class BatchJobResult:
+    """Outcome of a batch job.
+
+    ``job_id`` is the first submitted job (None when there was nothing to
+    submit) and ``job_ids`` lists every job the requests were split across.
+    ``status`` is "partial" when some, but not all, of those jobs completed.
+    ``failed`` maps Entry IDs to errors, and ``unreadable`` describes output
+    lines that could not be matched to any entry.
+    """
+
+    job_id: Optional[str]
+    status: str
+    job_ids: list = field(default_factory=list)
+    updated: int = 0
+    failed: dict = field(default_factory=dict)
+    unreadable: list = field(default_factory=list)
+
+
+def build_batch_requests(journal_df, iching_data, settings, only_missing=False):
+    """Serializes one chat-completions request per journal entry.
+
+    Returns ``(requests, readings, failed)``: Batch API request dicts, the
+    reconstructed readings by Entry ID, and entries that could not be rebuilt.
+    """
+    requests, readings, failed = [], {}, {}
+    for _, row in journal_df.iterrows():
+        entry_id = str(row["Entry ID"])
+        interpretation = row.get("AI Interpretation")
+        if only_missing and isinstance(interpretation, str) and interpretation.strip():
+            continue
+
+        try:
+            reading = reconstruct_reading_from_row(row, iching_data)
+        except JournalValidationError as e:
+            failed[entry_id] = str(e)
+            continue
+
+        readings[entry_id] = reading
+        requests.append(
+            {
+                "custom_id": entry_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": settings.model,
+                    "max_tokens": settings.max_tokens,
+                    "temperature": settings.temperature,
+                    "messages": build_interpretation_messages(reading),
+                },
+            }
+        )
+    return requests, readings, failed
+
+
+def split_batch_requests(requests, max_requests=BATCH_MAX_REQUESTS, max_bytes=BATCH_MAX_FILE_BYTES):
+    """Splits requests into consecutive chunks that each fit in one Batch API input file."""
+    chunks, chunk, chunk_bytes = [], [], 0
+    for request in requests:
+        request_bytes = len(json.dumps(request, ensure_ascii=False).encode("utf-8")) + 1
+        if chunk and (len(chunk) >= max_requests or chunk_bytes + request_bytes > max_bytes):
+            chunks.append(chunk)
+            chunk, chunk_bytes = [], 0
+        chunk.append(request)
+        chunk_bytes += request_bytes
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def write_batch_requests(requests, output_path):
+    with Path(output_path).open("w", encoding="utf-8") as output_file:
+        for request in requests:
+            output_file.write(json.dumps(request, ensure_ascii=False) + "\n")
+    return Path(output_path)
+
+
+def parse_batch_results(lines):
+    """Returns ``(interpretations, failed, unreadable)`` from Batch API output lines.
+
+    ``interpretations`` and ``failed`` are keyed by custom_id; ``unreadable``
+    lists a message for each line that could not be parsed, since those lines
+    carry no custom_id to report them under.
+    """
+    interpretations, failed, unreadable = {}, {}, []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            unreadable.append(f"Line {line_number}: {e}")
+            continue
+        if not isinstance(record, dict):
+            unreadable.append(f"Line {line_number}: not a JSON object.")
+            continue
+
+        custom_id = str(record.get("custom_id"))
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or (response.get("body") or {}).get("error") or {}
+            failed[custom_id] = error.get("message", f"HTTP {response.get('status_code')}")
+            continue
+
+        try:
+            interpretations[custom_id] = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            failed[custom_id] = "Malformed batch response."
+    return interpretations, failed, unreadable
+
+
+class OpenAIBatchBackend:
+    """Runs request files through the hosted OpenAI Batch API."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, requests_path):
+        with Path(requests_path).open("rb") as requests_file:
+            uploaded = self.client.files.create(file=requests_file, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def status(self, job_id):
+        return self.client.batches.retrieve(job_id).status
+
+    def results(self, job_id):
+        batch = self.client.batches.retrieve(job_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(self.client.files.content(file_id).text.splitlines())
+        return lines
+
+    def cache_endpoint(self, job_id, custom_id):
+        """Every request goes to the configured endpoint, so results use the settings' key."""
+        return None
+
+
+class LocalBatchBackend:
+    """Runs request files in a background thread through a chat-completions client.
+
+    Produces Batch API output lines, so a journal can be regenerated against a
+    local or stub endpoint and the job flow tested without the hosted API.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, requests_path):
+        with Path(requests_path).open(encoding="utf-8") as requests_file:
+            requests = [json.loads(line) for line in requests_file if line.strip()]
+
+        job_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._jobs[job_id] = {"status": "in_progress", "lines": [], "endpoints": {}}
+        threading.Thread(target=self._run, args=(job_id, requests), daemon=True).start()
+        return job_id
+
+    def status(self, job_id):
+        with self._lock:
+            return self._jobs[job_id]["status"]
+
+    def results(self, job_id):
+        with self._lock:
+            return list(self._jobs[job_id]["lines"])
+
+    def cache_endpoint(self, job_id, custom_id):
+        """Returns the identity of the routed backend that served a request, if a router ran it."""
+        with self._lock:
+            return self._jobs[job_id]["endpoints"].get(custom_id)
+
+    def _run(self, job_id, requests):
+        lines, endpoints = [], {}
+        for request in requests:
+            record = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": request["custom_id"]}
+            try:
+                response = self.client.chat.completions.create(**request["body"])
+                if isinstance(self.client, AIBackendRouter):
+                    served_backend = self.client.served_backend()
+                    endpoints[request["custom_id"]] = served_backend.config.cache_identity(request["body"]["model"])
+                message = {"role": "assistant", "content": response.choices[0].message.content}
+                record["response"] = {
+                    "status_code": 200,
+                    "body": {"choices": [{"index": 0, "message": message}]},
+                }
+                record["error"] = None
+            except Exception as e:
+                record["response"] = None
+                record["error"] = {"code": type(e).__name__, "message": str(e)}
+            lines.append(json.dumps(record))
+
+        with self._lock:
+            self._jobs[job_id] = {"status": "completed", "lines": lines, "endpoints": endpoints}
+
+
+def run_batch_job(
+    backend,
+    settings,
+    iching_data=None,
+    only_missing=False,
+    poll_seconds=DEFAULT_BATCH_POLL_SECONDS,
+    runtime=None,
+    sleep=time.sleep,
+):
+    """Submits every journal entry as a batch, waits for it, and merges the results.
+
+    Requests beyond one input file's limits go to further jobs. Successful
+    interpretations replace the entries' AI text in a single journal write and
+    are added to the interpretation cache; entries in a job that did not
+    complete are reported as failed. Raises BatchJobError if no job completed.
+    """
+    if iching_data is None:
+        iching_data, _ = load_iching_data()
+
+    requests, readings, failed = build_batch_requests(
+        load_journal(), iching_data, settings, only_missing=only_missing
+    )
+    if not requests:
+        return BatchJobResult(job_id=None, status="empty", failed=failed)
+
+    entry_ids_by_job = {}
+    chunks = split_batch_requests(requests)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for index, chunk in enumerate(chunks, start=1):
+            requests_path = write_batch_requests(chunk, Path(temp_dir) / f"batch_requests_{index}.jsonl")
+            try:
+                job_id = backend.submit(requests_path)
+            except Exception as e:
+                raise BatchJobError(f"Could not submit batch {index} of {len(chunks)}: {e}") from e
+            entry_ids_by_job[job_id] = [request["custom_id"] for request in chunk]
+            logging.info(f"Submitted batch {job_id} with {len(chunk)} requests.")
+    job_ids = list(entry_ids_by_job)
+
+    statuses = {job_id: backend.status(job_id) for job_id in job_ids}
+    while any(status not in BATCH_TERMINAL_STATUSES for status in statuses.values()):
+        sleep(poll_seconds)
+        for job_id, status in statuses.items():
+            if status not in BATCH_TERMINAL_STATUSES:
+                statuses[job_id] = backend.status(job_id)
+
+    completed = [job_id for job_id in job_ids if statuses[job_id] == "completed"]
+    if not completed:
+        endings = ", ".join(f"{job_id} ended with status '{statuses[job_id]}'" for job_id in job_ids)
+        raise BatchJobError(f"Batch {endings}.")
+
+    interpretations, cache_endpoints, unreadable = {}, {}, []
+    for job_id in job_ids:
+        if job_id not in completed:
+            for entry_id in entry_ids_by_job[job_id]:
+                failed[entry_id] = f"Batch {job_id} ended with status '{statuses[job_id]}'."
+            continue
+
+        job_interpretations, job_failures, job_unreadable = parse_batch_results(backend.results(job_id))
+        failed.update(job_failures)
+        unreadable.extend(f"Batch {job_id}: {message}" for message in job_unreadable)
+        for entry_id, text in job_interpretations.items():
+            if entry_id in readings:
+                interpretations[entry_id] = text
+                cache_endpoints[entry_id] = backend.cache_endpoint(job_id, entry_id)
+    updated = update_journal_ai_interpretations(interpretations)
+
+    runtime = runtime or get_ai_runtime(settings)
+    if runtime.cache is not None:
+        for entry_id, interpretation in interpretations.items():
+            cache_key = build_interpretation_cache_key(
+                readings[entry_id], settings, endpoint=cache_endpoints[entry_id]
+            )
+            runtime.cache.set(cache_key, interpretation)
+
+    return BatchJobResult(
+        job_id=job_ids[0],
+        status="completed" if len(completed) == len(job_ids) else "partial",
+        job_ids=job_ids,
+        updated=updated,
+        failed=failed,
+        unreadable=unreadable,
+    )
+
+
+def main(argv=None):
+    import openai
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Regenerate journal AI contemplations as one batch job.")
+    parser.add_argument("--only-missing", action="store_true", help="Skip entries that already have AI text.")
+    parser.add_argument("--local", action="store_true", help="Run the batch through the chat-completions client.")
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_BATCH_POLL_SECONDS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    try:
+        ai_config = build_ai_config()
+    except AIConfigurationError as e:
+        parser.error(str(e))
+    if args.local:
+        if not ai_config.enabled:
+            parser.error("No AI endpoint is configured. Set OPENAI_API_KEY or OPENAI_BACKEND_ORDER.")
+        backend = LocalBatchBackend(get_shared_client(ai_config))
+    else:
+        if not ai_config.api_key:
+            parser.error(
+                "OPENAI_API_KEY is not set. The hosted Batch API needs it; use --local to run the batch "
+                "through OPENAI_BACKEND_* endpoints instead."
+            )
+        backend = OpenAIBatchBackend(openai.OpenAI(**ai_config.client_kwargs()))
+
+    result = run_batch_job(
+        backend,
+        ai_config.settings,
+        only_missing=args.only_missing,
+        poll_seconds=args.poll_seconds,
+    )
+    job_ids = ", ".join(result.job_ids) or "(none)"
+    for message in result.unreadable:
+        logging.warning(f"Unreadable batch output: {message}")
+    print(f"Batch {job_ids} {result.status}: updated {result.updated} entries; {len(result.failed)} failed.")
+    return 1 if result.failed or result.unreadable else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+"""Disk-backed cache for AI interpretations, shared across sessions and processes."""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+
+DEFAULT_AI_CACHE_MAX_ENTRIES = 5000
+DEFAULT_AI_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+# Cache hits queue their LRU touch and counter update; the queue is written once
+# it holds this many keys or this many seconds have passed, or with the next set().
+PENDING_FLUSH_SIZE = 64
+PENDING_FLUSH_INTERVAL_SECONDS = 5
+
+
+class AIInterpretationCache:
+    """SQLite-backed interpretation cache with LRU eviction, a TTL, and hit/miss counters.
+
+    Reads never take a write lock: recency and counters are bookkeeping that
+    may lag behind by a few seconds and is dropped if the process exits first.
+
+    Cache errors are logged and treated as misses so a broken cache file never
+    blocks an interpretation.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_entries=DEFAULT_AI_CACHE_MAX_ENTRIES,
+        ttl_seconds=DEFAULT_AI_CACHE_TTL_SECONDS,
+        clock=time.time,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._pending_lock = threading.Lock()
+        self._pending_touches = {}
+        self._pending_expired = set()
+        self._pending_counts = {"hits": 0, "misses": 0}
+        self._last_flush = clock()
+
+    def get(self, key):
+        """Returns the cached interpretation for a key, or None on a miss.
+
+        Lookups only read the database. The LRU touch, hit/miss counters, and
+        removal of an expired row are queued in memory and written in batches.
+        """
+        now = self._clock()
+        try:
+            with closing(self._open()) as connection:
+                row = connection.execute(
+                    "SELECT value, created_at FROM interpretations WHERE key = ?",
+                    (key,),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.getLogger(__name__).warning(f"AI cache read failed: {e}")
+            return None
+
+        expired = row is not None and now - row[1] > self.ttl_seconds
+        with self._pending_lock:
+            if row is None or expired:
+                self._pending_counts["misses"] += 1
+                if expired:
+                    self._pending_expired.add(key)
+            else:
+                self._pending_counts["hits"] += 1
+                self._pending_touches[key] = now
+            flush_due = (
+                len(self._pending_touches) + len(self._pending_expired) >= PENDING_FLUSH_SIZE
+                or now - self._last_flush >= PENDING_FLUSH_INTERVAL_SECONDS
+            )
+
+        if flush_due:
+            self._flush_pending(wait=False)
+        return None if row is None or expired else row[0]
+
+    def set(self, key, value):
+        """Stores an interpretation and evicts the least recently used overflow."""
+        now = self._clock()
+        pending = self._take_pending()
+        try:
+            with self._connect() as connection:
+                self._write_pending(connection, pending)
+                connection.execute(
+                    "INSERT OR REPLACE INTO interpretations (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                connection.execute(
+                    "DELETE FROM interpretations WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                )
+                connection.execute(
+                    "DELETE FROM interpretations WHERE key IN ("
+                    "SELECT key FROM interpretations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+                    ")",
+                    (self.max_entries,),
+                )
+        except sqlite3.Error as e:
+            self._restore_pending(pending)
+            logging.getLogger(__name__).warning(f"AI cache write failed: {e}")
+
+    def stats(self):
+        """Returns hit, miss, and entry counts."""
+        self._flush_pending(wait=True)
+        try:
+            with self._connect() as connection:
+                counters = dict(connection.execute("SELECT name, value FROM counters").fetchall())
+                entries = connection.execute("SELECT COUNT(*) FROM interpretations").fetchone()[0]
+        except sqlite3.Error as e:
+            logging.getLogger(__name__).warning(f"AI cache stats failed: {e}")
+            counters, entries = {}, 0
+
+        return {
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "entries": entries,
+        }
+
+    def clear(self):
+        self._take_pending()
+        with self._connect() as connection:
+            connection.execute("DELETE FROM interpretations")
+            connection.execute("DELETE FROM counters")
+
+    def _flush_pending(self, wait):
+        """Writes queued touches and counters; without ``wait`` a busy database defers them."""
+        pending = self._take_pending()
+        if not any(pending):
+            return
+        try:
+            with self._connect(timeout=10 if wait else 0) as connection:
+                self._write_pending(connection, pending)
+        except sqlite3.Error as e:
+            self._restore_pending(pending)
+            if wait:
+                logging.getLogger(__name__).warning(f"AI cache bookkeeping failed: {e}")
+
+    def _take_pending(self):
+        with self._pending_lock:
+            pending = (self._pending_touches, self._pending_expired, self._pending_counts)
+            self._pending_touches = {}
+            self._pending_expired = set()
+            self._pending_counts = {"hits": 0, "misses": 0}
+            self._last_flush = self._clock()
+        touches, expired, counts = pending
+        return touches, expired, {name: value for name, value in counts.items() if value}
+
+    def _restore_pending(self, pending):
+        touches, expired, counts = pending
+        with self._pending_lock:
+            for key, accessed_at in touches.items():
+                self._pending_touches[key] = max(accessed_at, self._pending_touches.get(key, accessed_at))
+            self._pending_expired |= expired
+            for name, value in counts.items():
+                self._pending_counts[name] += value
+
+    def _write_pending(self, connection, pending):
+        touches, expired, counts = pending
+        connection.executemany(
+            "UPDATE interpretations SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in touches.items()],
+        )
+        connection.executemany(
+            "DELETE FROM interpretations WHERE key = ? AND created_at < ?",
+            [(key, self._clock() - self.ttl_seconds) for key in expired],
+        )
+        for name, value in counts.items():
+            connection.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, value),
+            )
+
+    def _open(self, timeout=10):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        try:
+            self._ensure_schema(connection)
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def _connect(self, timeout=10):
+        return _Transaction(self._open(timeout))
+
+    def _ensure_schema(self, connection):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS interpretations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS interpretations_accessed_at "
+                "ON interpretations (accessed_at)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._schema_ready = True
+
+
+class _Transaction:
+    """Runs a block in one immediate SQLite transaction and closes the connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        try:
+            self.connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error:
+            self.connection.close()
+            raise
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        with closing(self.connection):
+            if exc_type is None:
+                self.connection.execute("COMMIT")
+            else:
+                self.connection.execute("ROLLBACK")
+        return False
@@ -0,0 +1,87 @@
+"""Process-wide circuit breaker that fails AI calls fast while the backend is down."""
+
+import threading
+import time
+
+
+DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_AI_CIRCUIT_RESET_SECONDS = 30.0
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Tracks consecutive backend failures and decides whether a call may proceed.
+
+    The circuit opens after ``failure_threshold`` consecutive failures. While
+    open, every call is refused until ``reset_seconds`` have passed; then one
+    trial call is let through (half-open). A successful trial closes the
+    circuit and a failed one reopens it for another ``reset_seconds``. Calls
+    that end without saying anything about backend health, such as rate
+    limits or rejected requests, are released without changing the state.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds=DEFAULT_AI_CIRCUIT_RESET_SECONDS,
+        clock=time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def allow(self):
+        """Returns True if a call may proceed; a half-open trial must then report back."""
+        with self._lock:
+            if self._state == CIRCUIT_CLOSED:
+                return True
+            if self._state == CIRCUIT_OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = CIRCUIT_HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def retry_after(self):
+        """Returns the seconds until the next trial call may be attempted."""
+        with self._lock:
+            if self._state != CIRCUIT_OPEN:
+                return 0.0
+            return max(self.reset_seconds - (self._clock() - self._opened_at), 0.0)
+
+    def record_success(self):
+        with self._lock:
+            self._state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == CIRCUIT_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CIRCUIT_OPEN
+                self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def release(self):
+        """Ends a call whose outcome says nothing about backend health."""
+        with self._lock:
+            self._trial_in_flight = False
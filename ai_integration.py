@@ -1,15 +1,63 @@
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import math
 import os
-from dataclasses import dataclass
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, replace
+from functools import lru_cache
 from typing import Optional
 
+import httpx
 import openai
 
+from ai_backends import (
+    DEFAULT_BACKEND_MAX_CONCURRENCY,
+    HOSTED_BACKEND_URL,
+    AIBackend,
+    AIBackendConfig,
+    AIBackendRouter,
+)
+from ai_circuit_breaker import (
+    DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_AI_CIRCUIT_RESET_SECONDS,
+    CircuitBreaker,
+)
+from ai_cache import (
+    DEFAULT_AI_CACHE_MAX_ENTRIES,
+    DEFAULT_AI_CACHE_TTL_SECONDS,
+    AIInterpretationCache,
+)
+from ai_metrics import AICallTimer, AIMetrics
+from ai_prompts import PROMPT_VERSION, build_interpretation_messages
+from ai_rate_limit import (
+    DEFAULT_AI_REQUESTS_PER_MINUTE,
+    DEFAULT_AI_TOKENS_PER_MINUTE,
+    AIRateLimiter,
+    estimate_prompt_tokens,
+    estimate_request_tokens,
+    estimate_text_tokens,
+)
+from ai_singleflight import SingleFlight
+from constants import AI_CACHE_FILE, AI_METRICS_FILE
+
 
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
 DEFAULT_OPENAI_MAX_TOKENS = 900
 DEFAULT_OPENAI_TEMPERATURE = 0.7
 DEFAULT_OPENAI_TIMEOUT_SECONDS = 30.0
 DEFAULT_OPENAI_MAX_RETRIES = 2
+DEFAULT_OPENAI_ENDPOINT = HOSTED_BACKEND_URL
+DEFAULT_OPENAI_MAX_CONNECTIONS = 20
+DEFAULT_OPENAI_MAX_KEEPALIVE_CONNECTIONS = 10
+RATE_LIMIT_ATTEMPTS = 3
+SINGLE_FLIGHT_WAIT_MARGIN_SECONDS = 10.0
+AI_PREFETCH_WORKERS = 4
+BACKEND_FAILURE_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
 
 
 class AIInterpretationError(Exception):
@@ -24,6 +72,10 @@ class AIConfigurationError(AIInterpretationError):
     """Raised when AI configuration values are invalid."""
 
 
+class AIBackendUnavailableError(AIInterpretationError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
 @dataclass(frozen=True)
 class AISettings:
     """Runtime configuration for OpenAI-backed interpretation."""
@@ -33,6 +85,18 @@ class AISettings:
     temperature: float = DEFAULT_OPENAI_TEMPERATURE
     timeout_seconds: float = DEFAULT_OPENAI_TIMEOUT_SECONDS
     max_retries: int = DEFAULT_OPENAI_MAX_RETRIES
+    cache_max_entries: int = DEFAULT_AI_CACHE_MAX_ENTRIES
+    cache_ttl_seconds: float = DEFAULT_AI_CACHE_TTL_SECONDS
+    max_connections: int = DEFAULT_OPENAI_MAX_CONNECTIONS
+    max_keepalive_connections: int = DEFAULT_OPENAI_MAX_KEEPALIVE_CONNECTIONS
+    requests_per_minute: int = DEFAULT_AI_REQUESTS_PER_MINUTE
+    tokens_per_minute: int = DEFAULT_AI_TOKENS_PER_MINUTE
+    prefetch: bool = False
+    metrics_log: bool = True
+    circuit_failure_threshold: int = DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD
+    circuit_reset_seconds: float = DEFAULT_AI_CIRCUIT_RESET_SECONDS
+    stream_usage: bool = True
+    endpoint: str = DEFAULT_OPENAI_ENDPOINT
 
 
 @dataclass(frozen=True)
@@ -41,20 +105,155 @@ class AIConfig:
 
     api_key: Optional[str]
     settings: AISettings
+    base_url: Optional[str] = None
+    backends: tuple = ()
 
     @property
     def enabled(self):
-        return bool(self.api_key)
+        return bool(self.api_key) or bool(self.backends)
 
     def client_kwargs(self):
         if not self.api_key:
             raise AIConfigurationError("OpenAI API key is missing.")
 
-        return {
+        client_kwargs = {
             "api_key": self.api_key,
             "timeout": self.settings.timeout_seconds,
             "max_retries": self.settings.max_retries,
         }
+        if self.base_url:
+            client_kwargs["base_url"] = self.base_url
+        return client_kwargs
+
+
+@dataclass(frozen=True)
+class AIRuntime:
+    """Process-wide collaborators shared by every AI interpretation request."""
+
+    cache: Optional[AIInterpretationCache] = None
+    rate_limiter: Optional[AIRateLimiter] = None
+    single_flight: Optional[SingleFlight] = None
+    metrics: Optional[AIMetrics] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+
+
+@lru_cache(maxsize=8)
+def get_ai_runtime(settings):
+    """Returns the shared runtime for a settings value, created once per process."""
+    cache = None
+    if settings.cache_max_entries > 0:
+        cache = AIInterpretationCache(
+            AI_CACHE_FILE,
+            max_entries=settings.cache_max_entries,
+            ttl_seconds=settings.cache_ttl_seconds,
+        )
+
+    rate_limiter = None
+    if settings.requests_per_minute or settings.tokens_per_minute:
+        rate_limiter = AIRateLimiter(
+            requests_per_minute=settings.requests_per_minute,
+            tokens_per_minute=settings.tokens_per_minute,
+        )
+
+    circuit_breaker = None
+    if settings.circuit_failure_threshold > 0:
+        circuit_breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_seconds=settings.circuit_reset_seconds,
+        )
+
+    return AIRuntime(
+        cache=cache,
+        rate_limiter=rate_limiter,
+        single_flight=SingleFlight(),
+        metrics=AIMetrics(AI_METRICS_FILE if settings.metrics_log else None),
+        circuit_breaker=circuit_breaker,
+    )
+
+
+_shared_clients = {}
+_shared_clients_lock = threading.Lock()
+
+
+def build_http_client(settings):
+    """Returns an HTTP client whose keep-alive pool follows the configured limits."""
+    return openai.DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+        ),
+    )
+
+
+def shared_client_key(ai_config):
+    """Returns the parts of a config that decide how its client connects.
+
+    Settings such as the model, temperature, or cache size do not change the
+    client, so configs that differ only in those share one connection pool.
+    """
+    settings = ai_config.settings
+    return (
+        ai_config.api_key,
+        ai_config.base_url,
+        ai_config.backends,
+        settings.timeout_seconds,
+        settings.max_retries,
+        settings.max_connections,
+        settings.max_keepalive_connections,
+    )
+
+
+def get_shared_client(ai_config):
+    """Returns the process-wide OpenAI client for a config, creating it on first use.
+
+    Reusing one client per connection setup keeps its connection pool and TLS
+    sessions alive across Streamlit reruns and sessions. The client does not
+    retry on its own: the request loops retry rate limits through the runtime's
+    limiter and transient failures up to ``settings.max_retries`` times.
+    """
+    client_key = shared_client_key(ai_config)
+    with _shared_clients_lock:
+        client = _shared_clients.get(client_key)
+        if client is None:
+            if ai_config.backends:
+                client = build_backend_router(ai_config)
+            else:
+                client = openai.OpenAI(
+                    **{**ai_config.client_kwargs(), "max_retries": 0},
+                    http_client=build_http_client(ai_config.settings),
+                )
+            _shared_clients[client_key] = client
+        return client
+
+
+def build_backend_router(ai_config):
+    """Builds a router over the configured backends, each with its own connection pool."""
+    settings = ai_config.settings
+    return AIBackendRouter(
+        [
+            AIBackend(
+                backend,
+                openai.OpenAI(
+                    **backend.client_kwargs(ai_config.api_key, settings.timeout_seconds, max_retries=0),
+                    http_client=build_http_client(settings),
+                ),
+            )
+            for backend in ai_config.backends
+        ]
+    )
+
+
+def close_shared_clients():
+    """Closes every shared client; called automatically at interpreter exit."""
+    with _shared_clients_lock:
+        clients = list(_shared_clients.values())
+        _shared_clients.clear()
+
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_shared_clients)
 
 
 def build_ai_config(secrets=None, environ=None):
@@ -115,6 +314,124 @@ def build_ai_config(secrets=None, environ=None):
             "OPENAI_MAX_RETRIES",
             minimum=0,
         ),
+        cache_max_entries=_parse_int_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_CACHE_MAX_ENTRIES",
+                nested_key="cache_max_entries",
+                default=DEFAULT_AI_CACHE_MAX_ENTRIES,
+            ),
+            "OPENAI_CACHE_MAX_ENTRIES",
+            minimum=0,
+        ),
+        cache_ttl_seconds=_parse_float_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_CACHE_TTL_SECONDS",
+                nested_key="cache_ttl_seconds",
+                default=DEFAULT_AI_CACHE_TTL_SECONDS,
+            ),
+            "OPENAI_CACHE_TTL_SECONDS",
+            minimum=1,
+        ),
+        max_connections=_parse_int_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_MAX_CONNECTIONS",
+                nested_key="max_connections",
+                default=DEFAULT_OPENAI_MAX_CONNECTIONS,
+            ),
+            "OPENAI_MAX_CONNECTIONS",
+            minimum=1,
+        ),
+        max_keepalive_connections=_parse_int_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_MAX_KEEPALIVE_CONNECTIONS",
+                nested_key="max_keepalive_connections",
+                default=DEFAULT_OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            "OPENAI_MAX_KEEPALIVE_CONNECTIONS",
+            minimum=0,
+        ),
+        requests_per_minute=_parse_int_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_REQUESTS_PER_MINUTE",
+                nested_key="requests_per_minute",
+                default=DEFAULT_AI_REQUESTS_PER_MINUTE,
+            ),
+            "OPENAI_REQUESTS_PER_MINUTE",
+            minimum=0,
+        ),
+        tokens_per_minute=_parse_int_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_TOKENS_PER_MINUTE",
+                nested_key="tokens_per_minute",
+                default=DEFAULT_AI_TOKENS_PER_MINUTE,
+            ),
+            "OPENAI_TOKENS_PER_MINUTE",
+            minimum=0,
+        ),
+        prefetch=_parse_bool_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_PREFETCH",
+                nested_key="prefetch",
+                default=False,
+            ),
+            "OPENAI_PREFETCH",
+        ),
+        metrics_log=_parse_bool_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_METRICS_LOG",
+                nested_key="metrics_log",
+                default=True,
+            ),
+            "OPENAI_METRICS_LOG",
+        ),
+        circuit_failure_threshold=_parse_int_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_CIRCUIT_FAILURE_THRESHOLD",
+                nested_key="circuit_failure_threshold",
+                default=DEFAULT_AI_CIRCUIT_FAILURE_THRESHOLD,
+            ),
+            "OPENAI_CIRCUIT_FAILURE_THRESHOLD",
+            minimum=0,
+        ),
+        circuit_reset_seconds=_parse_float_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_CIRCUIT_RESET_SECONDS",
+                nested_key="circuit_reset_seconds",
+                default=DEFAULT_AI_CIRCUIT_RESET_SECONDS,
+            ),
+            "OPENAI_CIRCUIT_RESET_SECONDS",
+            minimum=0,
+        ),
+        stream_usage=_parse_bool_config(
+            _get_config_value(
+                secrets,
+                environ,
+                env_key="OPENAI_STREAM_USAGE",
+                nested_key="stream_usage",
+                default=True,
+            ),
+            "OPENAI_STREAM_USAGE",
+        ),
     )
 
     api_key = _get_config_value(
@@ -125,7 +442,80 @@ def build_ai_config(secrets=None, environ=None):
         default=None,
     )
 
-    return AIConfig(api_key=_blank_to_none(api_key), settings=settings)
+    base_url = _get_config_value(
+        secrets,
+        environ,
+        env_key="OPENAI_BASE_URL",
+        nested_key="base_url",
+        default=None,
+    )
+
+    api_key = _blank_to_none(api_key)
+    base_url = _blank_to_none(base_url)
+    backends = _build_backend_configs(secrets, environ, api_key)
+    return AIConfig(
+        api_key=api_key,
+        settings=replace(settings, endpoint=_endpoint_identity(base_url, backends, settings.model)),
+        base_url=base_url,
+        backends=backends,
+    )
+
+
+def _endpoint_identity(base_url, backends, model):
+    """Names where requests go, so each endpoint caches its own interpretations."""
+    if backends:
+        return ",".join(backend.cache_identity(model) for backend in backends)
+    return (base_url or DEFAULT_OPENAI_ENDPOINT).rstrip("/")
+
+
+def _build_backend_configs(secrets, environ, api_key):
+    backend_order = _get_config_value(
+        secrets,
+        environ,
+        env_key="OPENAI_BACKEND_ORDER",
+        nested_key="backend_order",
+        default="",
+    )
+    if isinstance(backend_order, str):
+        backend_order = backend_order.split(",")
+    names = [str(name).strip() for name in backend_order if str(name).strip()]
+
+    backends = []
+    for name in names:
+        def backend_value(field, default=None):
+            return _get_config_value(
+                secrets,
+                environ,
+                env_key=f"OPENAI_BACKEND_{name.upper()}_{field.upper()}",
+                nested_key=("backends", name, field),
+                default=default,
+            )
+
+        backend = AIBackendConfig(
+            name=name,
+            base_url=_blank_to_none(backend_value("base_url")),
+            api_key=_blank_to_none(backend_value("api_key")),
+            model=_blank_to_none(backend_value("model")),
+            timeout_seconds=_parse_optional_float_config(
+                backend_value("timeout_seconds"),
+                f"OPENAI_BACKEND_{name.upper()}_TIMEOUT_SECONDS",
+                minimum=1,
+            ),
+            max_concurrency=_parse_int_config(
+                backend_value("max_concurrency", DEFAULT_BACKEND_MAX_CONCURRENCY),
+                f"OPENAI_BACKEND_{name.upper()}_MAX_CONCURRENCY",
+                minimum=1,
+            ),
+            stream_usage=_parse_bool_config(
+                backend_value("stream_usage", True),
+                f"OPENAI_BACKEND_{name.upper()}_STREAM_USAGE",
+            ),
+        )
+        if not (backend.api_key or api_key or backend.base_url):
+            raise AIConfigurationError(f"AI backend '{name}' needs an API key or a base URL.")
+        backends.append(backend)
+
+    return tuple(backends)
 
 
 def _get_config_value(secrets, environ, env_key, nested_key, default):
@@ -149,9 +539,13 @@ def _read_secret_value(secrets, env_key, nested_key):
         if _is_present(flat_value):
             return flat_value
 
-        openai_section = _mapping_get(secrets, "openai")
-        if openai_section is not None:
-            return _mapping_get(openai_section, nested_key)
+        value = _mapping_get(secrets, "openai")
+        nested_path = nested_key if isinstance(nested_key, tuple) else (nested_key,)
+        for key in nested_path:
+            if value is None:
+                return None
+            value = _mapping_get(value, key)
+        return value
     except (AttributeError, KeyError, TypeError, FileNotFoundError):
         return None
 
@@ -196,6 +590,25 @@ def _parse_float_config(value, field_name, minimum=None, maximum=None):
     return parsed_value
 
 
+def _parse_bool_config(value, field_name):
+    if isinstance(value, bool):
+        return value
+
+    normalized = str(value).strip().lower()
+    if normalized in {"1", "true", "yes", "on"}:
+        return True
+    if normalized in {"0", "false", "no", "off"}:
+        return False
+    raise AIConfigurationError(f"{field_name} must be true or false.")
+
+
+def _parse_optional_float_config(value, field_name, minimum=None, maximum=None):
+    if not _is_present(value):
+        return None
+
+    return _parse_float_config(value, field_name, minimum, maximum)
+
+
 def _validate_range(value, field_name, minimum, maximum):
     if minimum is not None and value < minimum:
         raise AIConfigurationError(f"{field_name} must be at least {minimum}.")
@@ -203,122 +616,443 @@ def _validate_range(value, field_name, minimum, maximum):
         raise AIConfigurationError(f"{field_name} must be at most {maximum}.")
 
 
-def get_ai_interpretation(reading, client, settings=None):
-    """Constructs a prompt and gets an interpretation from OpenAI."""
+def get_ai_interpretation(reading, client, settings=None, runtime=None, on_wait=None):
+    """Gets an interpretation from OpenAI, serving repeat requests from the runtime cache.
+
+    Uncached requests queue on the runtime's rate limiter; ``on_wait`` receives
+    the caller's queue position while it waits. Rate limits and transient
+    failures are retried as described in ``_should_retry``. Concurrent
+    identical requests share one upstream call.
+    """
     settings = settings or AISettings()
-    primary_hex = reading['primary_hex']
-    secondary_hex = reading['secondary_hex']
-    
-    changing_lines_text = ""
-    if reading['changing_lines_indices']:
-        changing_lines_text += "The following lines are in a state of transformation:\n"
-        for i in reading['changing_lines_indices']:
-            line_data = primary_hex['lines'][i]
-            changing_lines_text += f"- **Line {i+1}:** {line_data['line_en']}\n"
-    else:
-        changing_lines_text = "There are no changing lines.\n"
+    runtime = runtime or AIRuntime()
 
-    evolving_hex_text = ""
-    if secondary_hex:
-        evolving_hex_text = f"""
-This is evolving into a new energetic pattern:
-- **Evolving Hexagram:** {secondary_hex['number']}. {secondary_hex['name_en']} ({secondary_hex['name_zh']}) - This points to the potential direction of change and the lesson to be integrated.
-- **Judgment:** {secondary_hex['judgment_en']}
-"""
+    request_key, cached_interpretation = _read_cached_interpretation(runtime, reading, settings, client)
+    if cached_interpretation is not None:
+        return cached_interpretation
 
-    prompt = f"""
-You are a wise and compassionate guide to the I Ching, the Book of Changes. Your purpose is not to predict the future, but to offer timeless wisdom that illuminates the present moment and empowers the user to make conscious choices.
+    def fetch():
+        interpretation = _request_with_rate_limit(reading, client, settings, runtime, on_wait)
+        _store_interpretation(runtime, reading, settings, client, request_key, interpretation)
+        return interpretation
 
-A user has approached you with the following inquiry: "{reading['question']}"
+    if runtime.single_flight is None:
+        return fetch()
+    try:
+        return runtime.single_flight.do(request_key, fetch, timeout=single_flight_wait_seconds(settings))
+    except FutureTimeoutError as e:
+        raise _single_flight_timeout_error(settings) from e
 
-They have received a reading that reflects the energies surrounding their question:
-- **Primary Hexagram:** {primary_hex['number']}. {primary_hex['name_en']} ({primary_hex['name_zh']}) - This represents the current state of things.
-- **Judgment:** {primary_hex['judgment_en']}
 
-{changing_lines_text}
-{evolving_hex_text}
+async def get_ai_interpretation_async(reading, client, settings=None, runtime=None):
+    """Async variant of get_ai_interpretation for an openai.AsyncOpenAI client."""
+    settings = settings or AISettings()
+    runtime = runtime or AIRuntime()
+
+    request_key, cached_interpretation = _read_cached_interpretation(runtime, reading, settings, client)
+    if cached_interpretation is not None:
+        return cached_interpretation
+
+    flight = None
+    if runtime.single_flight is not None:
+        flight, is_leader = runtime.single_flight.claim(request_key)
+        if not is_leader:
+            try:
+                # Shielded so a timed-out follower does not cancel the leader's future.
+                return await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(flight)), single_flight_wait_seconds(settings)
+                )
+            except asyncio.TimeoutError as e:
+                raise _single_flight_timeout_error(settings) from e
+
+    try:
+        interpretation = await _request_with_rate_limit_async(reading, client, settings, runtime)
+        _store_interpretation(runtime, reading, settings, client, request_key, interpretation)
+    except BaseException as e:
+        _resolve_flight(runtime, request_key, flight, error=e)
+        raise
 
-Please offer a contemplative interpretation organized into the following four sections, using the bolded titles exactly as written:
+    _resolve_flight(runtime, request_key, flight, result=interpretation)
+    return interpretation
 
-**The Present Situation:**
-Start here. Interpret the primary hexagram and its judgment in the context of the user's question. Describe the current energies at play.
 
-**The Dynamics of Change:**
-Next, explain the significance of the changing lines. If there are no changing lines, briefly state that the situation is stable and focus on the primary hexagram's wisdom.
+AI_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=AI_PREFETCH_WORKERS, thread_name_prefix="ai-prefetch")
 
-**The Emerging Direction:**
-Then, interpret the secondary (evolving) hexagram. Describe the potential future, the direction of change, or the lesson to be integrated. If there is no secondary hexagram, you can omit this section.
 
-**Guidance for Reflection:**
-Conclude with a paragraph of practical, supportive advice. Offer questions for reflection or suggest a focus for the user's energy that weaves together all the elements of the reading.
+def prefetch_ai_interpretation(reading, client, settings=None, runtime=None):
+    """Starts an interpretation in the background and returns its Future.
 
-Your tone should be serene, insightful, and supportive throughout.
+    The request goes through the runtime like any other, so it is rate limited,
+    cached, and shared with an identical request made while it is in flight.
+    The Future resolves to None when the request fails; the caller can then
+    request the interpretation normally.
     """
 
-    system_message = """
-You are a wise and compassionate I Ching interpreter.
+    def fetch():
+        try:
+            return get_ai_interpretation(reading, client, settings=settings, runtime=runtime)
+        except AIInterpretationError as e:
+            logging.warning(f"AI interpretation prefetch failed: {e}")
+            return None
+
+    return AI_PREFETCH_EXECUTOR.submit(fetch)
+
+
+def stream_ai_interpretation(reading, client, settings=None, runtime=None, on_wait=None):
+    """Yields interpretation text deltas as they arrive, caching the assembled result.
+
+    A cached interpretation is yielded as a single chunk, as is the result of an
+    identical request already streaming for another caller. Errors raised while
+    opening or reading the stream are mapped like get_ai_interpretation's, and
+    rate-limited or transiently failing requests are retried until the first
+    delta arrives.
+    """
+    settings = settings or AISettings()
+    runtime = runtime or AIRuntime()
+
+    request_key, cached_interpretation = _read_cached_interpretation(runtime, reading, settings, client)
+    if cached_interpretation is not None:
+        yield cached_interpretation
+        return
+
+    flight = None
+    if runtime.single_flight is not None:
+        flight, is_leader = runtime.single_flight.claim(request_key)
+        if not is_leader:
+            try:
+                yield flight.result(timeout=single_flight_wait_seconds(settings))
+            except FutureTimeoutError as e:
+                raise _single_flight_timeout_error(settings) from e
+            return
+
+    deltas = []
+    try:
+        yield from _stream_with_rate_limit(reading, client, settings, runtime, on_wait, deltas)
+        interpretation = "".join(deltas)
+        _store_interpretation(runtime, reading, settings, client, request_key, interpretation)
+    except GeneratorExit:
+        _resolve_flight(
+            runtime,
+            request_key,
+            flight,
+            error=AIInterpretationError("The interpretation request was interrupted."),
+        )
+        raise
+    except BaseException as e:
+        _resolve_flight(runtime, request_key, flight, error=e)
+        raise
+
+    _resolve_flight(runtime, request_key, flight, result=interpretation)
+
+
+def single_flight_wait_seconds(settings):
+    """Returns how long a caller waits for an identical request already in flight."""
+    # The leading call makes one attempt, up to max_retries more for transient
+    # failures, and up to RATE_LIMIT_ATTEMPTS - 1 more for rate limits, each
+    # bounded by the request timeout.
+    attempts = settings.max_retries + RATE_LIMIT_ATTEMPTS
+    return settings.timeout_seconds * attempts + SINGLE_FLIGHT_WAIT_MARGIN_SECONDS
+
+
+def _single_flight_timeout_error(settings):
+    return AIInterpretationError(
+        "An identical interpretation request is still running after "
+        f"{single_flight_wait_seconds(settings):g} seconds. Please try again shortly."
+    )
+
+
+def _request_with_rate_limit(reading, client, settings, runtime, on_wait):
+    _check_circuit(runtime)
+    timer = AICallTimer(settings.model)
+    attempts = Counter()
+    try:
+        while True:
+            _acquire_rate_limit(runtime, reading, settings, on_wait, timer)
+            try:
+                interpretation = request_ai_interpretation(reading, client, settings, timer=timer)
+                break
+            except AIInterpretationError as e:
+                if not _should_retry(runtime, settings, e, attempts):
+                    raise
+                timer.retried()
+    except BaseException as e:
+        _record_outcome(runtime, timer, error=e)
+        raise
+
+    _record_rate_limit_success(runtime)
+    _record_outcome(runtime, timer)
+    return interpretation
+
+
+async def _request_with_rate_limit_async(reading, client, settings, runtime):
+    _check_circuit(runtime)
+    timer = AICallTimer(settings.model)
+    attempts = Counter()
+    try:
+        while True:
+            if runtime.rate_limiter is not None:
+                await asyncio.to_thread(_acquire_rate_limit, runtime, reading, settings, None, timer)
+            try:
+                response = await client.chat.completions.create(
+                    model=settings.model,
+                    max_tokens=settings.max_tokens,
+                    temperature=settings.temperature,
+                    timeout=settings.timeout_seconds,
+                    messages=build_interpretation_messages(reading),
+                )
+                timer.observe_response(response)
+                interpretation = response.choices[0].message.content
+                break
+            except Exception as e:
+                error = translate_ai_error(e, settings)
+                if not _should_retry(runtime, settings, error, attempts, cause=e):
+                    raise error from e
+                timer.retried()
+    except BaseException as e:
+        _record_outcome(runtime, timer, error=e)
+        raise
+
+    _record_rate_limit_success(runtime)
+    _record_outcome(runtime, timer)
+    return interpretation
+
+
+def _stream_with_rate_limit(reading, client, settings, runtime, on_wait, deltas):
+    _check_circuit(runtime)
+    timer = AICallTimer(settings.model, streamed=True)
+    messages = build_interpretation_messages(reading)
+    stream_kwargs = {"stream_options": {"include_usage": True}} if settings.stream_usage else {}
+    attempts = Counter()
+    try:
+        while True:
+            _acquire_rate_limit(runtime, reading, settings, on_wait, timer)
+            try:
+                stream = client.chat.completions.create(
+                    model=settings.model,
+                    max_tokens=settings.max_tokens,
+                    temperature=settings.temperature,
+                    timeout=settings.timeout_seconds,
+                    messages=messages,
+                    stream=True,
+                    **stream_kwargs,
+                )
+                for chunk in stream:
+                    if not chunk.choices:
+                        timer.observe_response(chunk)
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        timer.first_token()
+                        deltas.append(delta)
+                        yield delta
+                break
+            except Exception as e:
+                error = translate_ai_error(e, settings)
+                if not _should_retry(runtime, settings, error, attempts, cause=e) or deltas:
+                    raise error from e
+                timer.retried()
+    except BaseException as e:
+        _record_outcome(runtime, timer, error=e)
+        raise
+
+    timer.estimate_usage(estimate_prompt_tokens(messages), estimate_text_tokens("".join(deltas)))
+    _record_rate_limit_success(runtime)
+    _record_outcome(runtime, timer)
+
+
+def _resolve_flight(runtime, request_key, flight, result=None, error=None):
+    if flight is not None:
+        runtime.single_flight.resolve(request_key, flight, result=result, error=error)
+
+
+def _acquire_rate_limit(runtime, reading, settings, on_wait, timer=None):
+    if runtime.rate_limiter is None:
+        return
+
+    tokens = estimate_request_tokens(build_interpretation_messages(reading), settings.max_tokens)
+    waited = runtime.rate_limiter.acquire(tokens, on_wait=on_wait)
+    if timer is not None:
+        timer.queued(waited)
+
+
+def _should_retry(runtime, settings, error, attempts, cause=None):
+    """Counts a failed attempt and returns True if the request should be sent again.
+
+    Rate limits are retried through the runtime's limiter, up to
+    ``RATE_LIMIT_ATTEMPTS`` attempts in all, and connection errors, timeouts,
+    and server errors up to ``settings.max_retries`` more times. Each of those
+    failed attempts counts toward opening the circuit breaker, and retrying
+    stops once it opens. ``cause`` is the client exception behind ``error``
+    when it has not been raised yet.
+    """
+    if isinstance(error, AIRateLimitError):
+        attempt = attempts["rate_limit"]
+        attempts["rate_limit"] += 1
+        return _should_retry_rate_limit(runtime, error, attempt)
+    if isinstance(cause if cause is not None else error.__cause__, BACKEND_FAILURE_ERRORS):
+        attempts["backend_failure"] += 1
+        breaker = runtime.circuit_breaker
+        if breaker is not None:
+            breaker.record_failure()
+        if attempts["backend_failure"] > settings.max_retries:
+            return False
+        return breaker is None or breaker.allow()
+    return False
+
+
+def _should_retry_rate_limit(runtime, error, attempt):
+    if runtime.rate_limiter is None:
+        return False
+
+    runtime.rate_limiter.record_rate_limit(retry_after_seconds(error))
+    return attempt + 1 < RATE_LIMIT_ATTEMPTS
+
+
+def _record_rate_limit_success(runtime):
+    if runtime.rate_limiter is not None:
+        runtime.rate_limiter.record_success()
+
+
+def _check_circuit(runtime):
+    breaker = runtime.circuit_breaker
+    if breaker is not None and not breaker.allow():
+        raise AIBackendUnavailableError(
+            "The AI service is not responding, so new requests are paused. "
+            f"Please try again in about {math.ceil(breaker.retry_after()) or 1} seconds."
+        )
 
-**Content Safety Policy for I Ching Interpretation**
 
-As a guide to the I Ching, your primary directive is to provide interpretations that are safe, ethical, and supportive. You must strictly adhere to the following principles:
+def _record_outcome(runtime, timer, error=None):
+    """Reports a finished call to the circuit breaker and, unless interrupted, to the metrics."""
+    breaker = runtime.circuit_breaker
+    if breaker is not None:
+        if error is None:
+            breaker.record_success()
+        else:
+            # Backend failures were already recorded attempt by attempt in _should_retry.
+            breaker.release()
 
-1.  **No Predictions or Guarantees:**
-    -   **Do not** predict specific future events, outcomes, or timelines (e.g., "You will get the job," "The relationship will end in three months").
-    -   **Do not** offer financial, legal, or medical advice. Frame guidance in terms of psychological, spiritual, and personal reflection.
-    -   **Do** use cautious and empowering language, such as "The energy suggests...", "This may be a time for...", "Consider the possibility that...".
+    if runtime.metrics is not None and (error is None or isinstance(error, AIInterpretationError)):
+        runtime.metrics.record(timer.finish(error=error))
 
-2.  **Promote Agency and Responsibility:**
-    -   **Do not** present the I Ching's wisdom as a command or an unchangeable fate.
-    -   **Do** emphasize the user's personal agency, free will, and responsibility in making choices. The reading is a tool for insight, not a substitute for decision-making.
 
-3.  **Avoid Harmful or Unethical Content:**
-    -   **Do not** generate content that is hateful, discriminatory, or violent.
-    -   **Do not** encourage self-harm, suicide, or any dangerous activities.
-    -   **Do not** provide interpretations that could be construed as manipulative, coercive, or promoting harmful relationship dynamics.
-    -   **Do not** create sexually explicit or profane content.
+def _read_cached_interpretation(runtime, reading, settings, client):
+    """Returns ``(request_key, cached)``; the request key identifies the request for single flight.
 
-4.  **Maintain a Supportive and Compassionate Tone:**
-    -   **Do** be consistently serene, empathetic, and non-judgmental.
-    -   **Do not** be alarming, fatalistic, or overly negative, even when interpreting challenging hexagrams. Frame difficulties as opportunities for growth and learning.
+    With a backend router, the cache is checked under each backend's identity
+    in fallback order, since any of them may have served an earlier request.
+    """
+    if runtime.cache is None and runtime.single_flight is None:
+        return None, None
+
+    request_key = build_interpretation_cache_key(reading, settings)
+    if runtime.cache is None:
+        return request_key, None
+
+    cache_keys = [request_key]
+    if isinstance(client, AIBackendRouter):
+        cache_keys = [
+            build_interpretation_cache_key(reading, settings, endpoint=identity)
+            for identity in client.cache_identities(settings.model)
+        ]
+    for cache_key in cache_keys:
+        cached_interpretation = runtime.cache.get(cache_key)
+        if cached_interpretation is not None:
+            return request_key, cached_interpretation
+    return request_key, None
+
+
+def _store_interpretation(runtime, reading, settings, client, request_key, interpretation):
+    """Caches an interpretation under the backend and model that served it."""
+    if runtime.cache is None or request_key is None or not interpretation:
+        return
+
+    cache_key = request_key
+    served_backend = client.served_backend() if isinstance(client, AIBackendRouter) else None
+    if served_backend is not None:
+        cache_key = build_interpretation_cache_key(
+            reading, settings, endpoint=served_backend.config.cache_identity(settings.model)
+        )
+    runtime.cache.set(cache_key, interpretation)
 
-5.  **Stay Within the Scope of the I Ching:**
-    -   **Do not** invent information or provide guidance that is unrelated to the symbols and wisdom of the I Ching.
-    -   **Do** ground your interpretation in the meanings of the hexagrams, lines, and their interplay as provided in the prompt.
 
-By adhering to this policy, you ensure that the user's experience is one of empowerment, clarity, and profound self-reflection.
-"""
+def build_interpretation_cache_key(reading, settings, endpoint=None):
+    """Hashes the normalized reading inputs and request settings that shape a response.
 
+    ``endpoint`` overrides ``settings.endpoint``, naming the backend and model
+    that actually serve the request.
+    """
+    secondary_hex = reading.get('secondary_hex')
+    key_parts = {
+        "question": " ".join(str(reading.get('question', '')).split()).casefold(),
+        "primary": reading['primary_hex']['number'],
+        "secondary": secondary_hex['number'] if secondary_hex else None,
+        "changing": list(reading['changing_lines_indices']),
+        "endpoint": endpoint or settings.endpoint,
+        "prompt_version": PROMPT_VERSION,
+        "model": settings.model,
+        "temperature": settings.temperature,
+        "max_tokens": settings.max_tokens,
+    }
+    key_text = json.dumps(key_parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+
+def request_ai_interpretation(reading, client, settings, timer=None):
+    """Calls the chat completions API and maps client errors to domain errors.
+
+    When a timer is given, it receives the served model and token usage.
+    """
     try:
         response = client.chat.completions.create(
             model=settings.model,
             max_tokens=settings.max_tokens,
             temperature=settings.temperature,
             timeout=settings.timeout_seconds,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ]
+            messages=build_interpretation_messages(reading),
         )
+        if timer is not None:
+            timer.observe_response(response)
         return response.choices[0].message.content
-    except openai.RateLimitError as e:
-        raise AIRateLimitError(f"OpenAI API rate limit exceeded or insufficient quota: {e}") from e
-    except openai.AuthenticationError as e:
-        raise AIInterpretationError(
+    except Exception as e:
+        raise translate_ai_error(e, settings) from e
+
+
+def retry_after_seconds(error):
+    """Returns the provider's Retry-After hint for a mapped or raw API error, if any."""
+    response = getattr(error, "response", None) or getattr(error.__cause__, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def translate_ai_error(error, settings):
+    """Maps an OpenAI client exception to the matching AIInterpretationError."""
+    if isinstance(error, AIInterpretationError):
+        return error
+    if isinstance(error, openai.RateLimitError):
+        return AIRateLimitError(f"OpenAI API rate limit exceeded or insufficient quota: {error}")
+    if isinstance(error, openai.AuthenticationError):
+        return AIInterpretationError(
             "OpenAI authentication failed. Check your OPENAI_API_KEY in .env or Streamlit secrets."
-        ) from e
-    except openai.APITimeoutError as e:
-        raise AIInterpretationError(
+        )
+    if isinstance(error, openai.APITimeoutError):
+        return AIInterpretationError(
             f"OpenAI request timed out after {settings.timeout_seconds:g} seconds. Try again or increase OPENAI_TIMEOUT_SECONDS."
-        ) from e
-    except openai.APIConnectionError as e:
-        raise AIInterpretationError(
+        )
+    if isinstance(error, openai.APIConnectionError):
+        return AIInterpretationError(
             "Could not reach OpenAI. Check your network connection and try again."
-        ) from e
-    except openai.BadRequestError as e:
-        raise AIInterpretationError(
+        )
+    if isinstance(error, openai.BadRequestError):
+        return AIInterpretationError(
             f"OpenAI rejected the request. Check the configured model '{settings.model}' and token limit."
-        ) from e
-    except openai.APIError as e:
-        raise AIInterpretationError("OpenAI returned an API error. Please try again shortly.") from e
-    except Exception as e:
-        raise AIInterpretationError(f"An error occurred while contacting the AI: {e}") from e
+        )
+    if isinstance(error, openai.APIError):
+        return AIInterpretationError("OpenAI returned an API error. Please try again shortly.")
+    return AIInterpretationError(f"An error occurred while contacting the AI: {error}")
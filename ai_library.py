@@ -0,0 +1,302 @@
+"""Offline library of baseline contemplations for every line pattern.
+
+A cast is six lines, each 6, 7, 8, or 9, so there are 4 ** 6 = 4096 line
+patterns, and each one fixes the primary hexagram, the changing lines, and
+the evolving hexagram. ``python ai_library.py`` asks the configured AI
+backend once per pattern, using the interactive prompt with a general
+question, and writes the results to ``ai_library.bin``. The app looks up the
+current pattern in O(1) to show an instant reflection when live AI is
+unavailable.
+
+File layout (little-endian)::
+
+    header   magic b"ICHL", uint16 version, uint16 reserved, uint32 entry count
+    offsets  entry count + 1 uint32 offsets into the data section
+    data     each entry's text, UTF-8 encoded and zlib-compressed
+
+An entry whose offset equals the next one has no text.
+"""
+
+import argparse
+import logging
+import os
+import struct
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from ai_integration import (
+    AIInterpretationError,
+    build_ai_config,
+    get_ai_interpretation,
+    get_ai_runtime,
+    get_shared_client,
+)
+from constants import AI_LIBRARY_FILE
+from file_handler import load_iching_data
+from reading_service import create_reading
+
+
+LINE_VALUES = (6, 7, 8, 9)
+PATTERN_COUNT = len(LINE_VALUES) ** 6
+LIBRARY_QUESTION = "What does this moment ask of me?"
+LIBRARY_MAGIC = b"ICHL"
+LIBRARY_VERSION = 1
+DEFAULT_LIBRARY_WORKERS = 4
+DEFAULT_LIBRARY_CHECKPOINT_EVERY = 64
+
+_HEADER = struct.Struct("<4sHHI")
+_OFFSET = struct.Struct("<I")
+
+
+class OfflineLibraryError(Exception):
+    """Raised when a library file is missing pieces or has an unknown format."""
+
+
+@dataclass
+class LibraryResult:
+    """Outcome of a library generation run."""
+
+    generated: int = 0
+    reused: int = 0
+    failed: dict = field(default_factory=dict)
+
+
+def pattern_index(lines):
+    """Returns the base-4 index of six line values, line 1 being the most significant digit."""
+    if len(lines) != 6:
+        raise ValueError("A line pattern has exactly six lines.")
+
+    index = 0
+    for line in lines:
+        if line not in LINE_VALUES:
+            raise ValueError(f"Invalid line value: {line}")
+        index = index * 4 + (line - 6)
+    return index
+
+
+def pattern_lines(index):
+    """Returns the six line values for a pattern index."""
+    if not 0 <= index < PATTERN_COUNT:
+        raise ValueError(f"Pattern index out of range: {index}")
+
+    lines = []
+    for _ in range(6):
+        index, digit = divmod(index, 4)
+        lines.append(6 + digit)
+    return lines[::-1]
+
+
+class OfflineLibrary:
+    """Read-only view of a library file with constant-time lookups."""
+
+    def __init__(self, data):
+        if len(data) < _HEADER.size:
+            raise OfflineLibraryError("The library file is truncated.")
+
+        magic, version, _, count = _HEADER.unpack_from(data)
+        if magic != LIBRARY_MAGIC or version != LIBRARY_VERSION:
+            raise OfflineLibraryError("The library file has an unknown format.")
+
+        self._data_start = _HEADER.size + (count + 1) * _OFFSET.size
+        if len(data) < self._data_start:
+            raise OfflineLibraryError("The library file is truncated.")
+
+        self._data = data
+        self.count = count
+
+    @classmethod
+    def load(cls, path):
+        return cls(Path(path).read_bytes())
+
+    def get(self, index):
+        """Returns the text stored for a pattern index, or None if it has none."""
+        if not 0 <= index < self.count:
+            return None
+
+        offset_position = _HEADER.size + index * _OFFSET.size
+        start = _OFFSET.unpack_from(self._data, offset_position)[0]
+        end = _OFFSET.unpack_from(self._data, offset_position + _OFFSET.size)[0]
+        if start == end:
+            return None
+
+        try:
+            return zlib.decompress(self._data[self._data_start + start:self._data_start + end]).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError) as e:
+            raise OfflineLibraryError(f"Library entry {index} is corrupt.") from e
+
+    def lookup(self, lines):
+        return self.get(pattern_index(lines))
+
+    def entries(self):
+        """Returns every stored text keyed by pattern index."""
+        stored = {}
+        for index in range(self.count):
+            text = self.get(index)
+            if text is not None:
+                stored[index] = text
+        return stored
+
+
+def write_offline_library(interpretations, path=AI_LIBRARY_FILE):
+    """Atomically writes interpretations keyed by pattern index to a library file."""
+    path = Path(path)
+    offsets = [0]
+    blobs = []
+    for index in range(PATTERN_COUNT):
+        text = interpretations.get(index)
+        if text:
+            blobs.append(zlib.compress(text.encode("utf-8"), 9))
+        offsets.append(offsets[-1] + (len(blobs[-1]) if text else 0))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as temp_file:
+        temp_file.write(_HEADER.pack(LIBRARY_MAGIC, LIBRARY_VERSION, 0, PATTERN_COUNT))
+        temp_file.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for blob in blobs:
+            temp_file.write(blob)
+    os.replace(temp_file.name, path)
+    return path
+
+
+def get_offline_library(path=AI_LIBRARY_FILE):
+    """Returns the library at a path, loaded once per file version, or None if unusable."""
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    try:
+        return _load_offline_library(str(path), stat.st_mtime_ns, stat.st_size)
+    except (OSError, OfflineLibraryError) as e:
+        logging.warning(f"Could not load the offline interpretation library {path}: {e}")
+        return None
+
+
+@lru_cache(maxsize=4)
+def _load_offline_library(path, mtime_ns, size):
+    return OfflineLibrary.load(path)
+
+
+def lookup_offline_interpretation(reading, path=AI_LIBRARY_FILE):
+    """Returns the baseline contemplation for a reading's line pattern, or None."""
+    library = get_offline_library(path)
+    if library is None:
+        return None
+
+    try:
+        return library.lookup(reading["lines"])
+    except (OfflineLibraryError, ValueError) as e:
+        logging.warning(f"Offline interpretation lookup failed: {e}")
+        return None
+
+
+def build_library_reading(index, iching_data, binary_to_hex_map):
+    return create_reading(
+        question=LIBRARY_QUESTION,
+        lines=pattern_lines(index),
+        iching_data=iching_data,
+        binary_to_hex_map=binary_to_hex_map,
+        timestamp=None,
+    )
+
+
+def generate_offline_library(
+    client,
+    settings,
+    iching_data=None,
+    binary_to_hex_map=None,
+    path=AI_LIBRARY_FILE,
+    runtime=None,
+    workers=DEFAULT_LIBRARY_WORKERS,
+    limit=None,
+    checkpoint_every=DEFAULT_LIBRARY_CHECKPOINT_EVERY,
+):
+    """Fills in every missing pattern of the library file.
+
+    Patterns already in the file are kept. Requests go through
+    get_ai_interpretation, so they share the runtime's rate limiter, circuit
+    breaker, and cache. The file is rewritten after every ``checkpoint_every``
+    new patterns and once more when the run ends or is interrupted, so a
+    restarted run repeats at most that many requests. A pattern that fails for
+    any reason is recorded in ``failed`` and the run continues. ``limit`` caps
+    how many new patterns are requested in this run.
+    """
+    if iching_data is None or binary_to_hex_map is None:
+        iching_data, binary_to_hex_map = load_iching_data()
+    runtime = runtime or get_ai_runtime(settings)
+
+    library = get_offline_library(path)
+    interpretations = library.entries() if library is not None else {}
+    result = LibraryResult(reused=len(interpretations))
+
+    missing = [index for index in range(PATTERN_COUNT) if index not in interpretations]
+    if limit is not None:
+        missing = missing[:limit]
+    if not missing:
+        return result
+
+    def fetch(index):
+        reading = build_library_reading(index, iching_data, binary_to_hex_map)
+        return get_ai_interpretation(reading, client, settings=settings, runtime=runtime)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-library")
+    try:
+        futures = {executor.submit(fetch, index): index for index in missing}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                interpretation = future.result()
+            except Exception as e:
+                if not isinstance(e, AIInterpretationError):
+                    logging.exception(f"Library pattern {index} failed unexpectedly.")
+                result.failed[index] = str(e)
+                continue
+            if interpretation:
+                interpretations[index] = interpretation
+                result.generated += 1
+                if result.generated % max(int(checkpoint_every), 1) == 0:
+                    write_offline_library(interpretations, path)
+    finally:
+        executor.shutdown(cancel_futures=True)
+        write_offline_library(interpretations, path)
+    return result
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Generate baseline contemplations for all 4096 line patterns.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_LIBRARY_WORKERS)
+    parser.add_argument("--limit", type=int, default=None, help="Request at most this many new patterns.")
+    parser.add_argument("--output", default=str(AI_LIBRARY_FILE))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    load_dotenv()
+    ai_config = build_ai_config()
+    if not ai_config.enabled:
+        print("Configure OPENAI_API_KEY or an AI backend to generate the library.")
+        return 1
+
+    result = generate_offline_library(
+        get_shared_client(ai_config),
+        ai_config.settings,
+        path=args.output,
+        workers=args.workers,
+        limit=args.limit,
+    )
+    total = result.reused + result.generated
+    print(
+        f"Library has {total} of {PATTERN_COUNT} patterns: {result.generated} new, "
+        f"{result.reused} kept, {len(result.failed)} failed."
+    )
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+"""Latency, token usage, and error metrics for AI interpretation calls.
+
+Every upstream call, successful or not, becomes one AICallRecord. Records are
+kept per model in rolling windows that report p50/p95 latency and token
+counts, and can be appended to a local JSONL file for later analysis.
+Cache hits and single-flight followers never reach the API and are not
+recorded.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_AI_METRICS_WINDOW = 500
+
+
+@dataclass(frozen=True)
+class AICallRecord:
+    """Measurements for one interpretation call, including its retries.
+
+    ``wall_seconds`` runs from the first rate-limiter acquire to the outcome,
+    ``queue_seconds`` is the part spent waiting in the limiter, and
+    ``ttft_seconds`` is the time to the first streamed text (None for
+    non-streamed calls). ``error`` is the mapped AIInterpretationError class
+    and ``cause`` the client exception behind it. ``usage_estimated`` marks
+    token counts estimated from text length because the backend reported none.
+    """
+
+    model: str
+    streamed: bool
+    wall_seconds: float
+    ttft_seconds: Optional[float] = None
+    queue_seconds: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    retries: int = 0
+    error: Optional[str] = None
+    cause: Optional[str] = None
+    usage_estimated: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+
+class AICallTimer:
+    """Collects the measurements of one call as it progresses."""
+
+    def __init__(self, model, streamed=False, clock=time.perf_counter):
+        self.model = model
+        self.streamed = streamed
+        self.retries = 0
+        self.queue_seconds = 0.0
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.usage_estimated = False
+        self._clock = clock
+        self._started_at = clock()
+        self._first_token_at = None
+
+    def queued(self, seconds):
+        self.queue_seconds += seconds or 0.0
+
+    def retried(self):
+        self.retries += 1
+
+    def first_token(self):
+        if self._first_token_at is None:
+            self._first_token_at = self._clock()
+
+    def observe_response(self, response):
+        """Takes the served model and token usage from a response or final stream chunk."""
+        model = getattr(response, "model", None)
+        if isinstance(model, str) and model:
+            self.model = model
+
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if isinstance(prompt_tokens, int):
+            self.prompt_tokens = prompt_tokens
+        if isinstance(completion_tokens, int):
+            self.completion_tokens = completion_tokens
+
+    def estimate_usage(self, prompt_tokens, completion_tokens):
+        """Fills in estimated token counts when the response reported no usage."""
+        if self.prompt_tokens is None and self.completion_tokens is None:
+            self.prompt_tokens = prompt_tokens
+            self.completion_tokens = completion_tokens
+            self.usage_estimated = True
+
+    def finish(self, error=None):
+        cause = getattr(error, "__cause__", None)
+        ttft_seconds = None
+        if self._first_token_at is not None:
+            ttft_seconds = self._first_token_at - self._started_at
+        return AICallRecord(
+            model=self.model,
+            streamed=self.streamed,
+            wall_seconds=self._clock() - self._started_at,
+            ttft_seconds=ttft_seconds,
+            queue_seconds=self.queue_seconds,
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            retries=self.retries,
+            error=type(error).__name__ if error is not None else None,
+            cause=type(cause).__name__ if cause is not None else None,
+            usage_estimated=self.usage_estimated,
+        )
+
+
+class RollingHistogram:
+    """Keeps the most recent ``window`` samples and reports their percentiles."""
+
+    def __init__(self, window=DEFAULT_AI_METRICS_WINDOW):
+        self._samples = deque(maxlen=window)
+
+    def observe(self, value):
+        if value is not None:
+            self._samples.append(value)
+
+    def count(self):
+        return len(self._samples)
+
+    def percentile(self, percent):
+        """Returns the nearest-rank percentile of the window, or None when it is empty."""
+        if not self._samples:
+            return None
+
+        ordered = sorted(self._samples)
+        rank = math.ceil(percent / 100 * len(ordered))
+        return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class _ModelMetrics:
+    def __init__(self, window):
+        self.calls = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.errors = Counter()
+        self.wall_seconds = RollingHistogram(window)
+        self.ttft_seconds = RollingHistogram(window)
+        self.prompt_token_counts = RollingHistogram(window)
+        self.completion_token_counts = RollingHistogram(window)
+
+    def add(self, record):
+        self.calls += 1
+        self.retries += record.retries
+        self.prompt_tokens += record.prompt_tokens or 0
+        self.completion_tokens += record.completion_tokens or 0
+        if record.error:
+            self.errors[record.error] += 1
+        self.wall_seconds.observe(record.wall_seconds)
+        self.ttft_seconds.observe(record.ttft_seconds)
+        self.prompt_token_counts.observe(record.prompt_tokens)
+        self.completion_token_counts.observe(record.completion_tokens)
+
+
+class AIMetrics:
+    """Process-wide, per-model call metrics, optionally appended to a JSONL log.
+
+    Call counts and token totals cover the whole process; latency and token
+    percentiles cover each model's last ``window`` calls. Log write errors are
+    logged and otherwise ignored so metrics never block an interpretation.
+    """
+
+    def __init__(self, log_path=None, window=DEFAULT_AI_METRICS_WINDOW):
+        self.log_path = Path(log_path) if log_path else None
+        self.window = window
+        self._models = {}
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    def record(self, record):
+        with self._lock:
+            model_metrics = self._models.get(record.model)
+            if model_metrics is None:
+                model_metrics = self._models[record.model] = _ModelMetrics(self.window)
+            model_metrics.add(record)
+
+        if self.log_path is not None:
+            self._append(record)
+
+    def summary(self):
+        """Returns one row per model with call counts, p50/p95 latency, and token use."""
+        with self._lock:
+            return [
+                {
+                    "model": model,
+                    "calls": stats.calls,
+                    "errors": sum(stats.errors.values()),
+                    "retries": stats.retries,
+                    "p50_seconds": stats.wall_seconds.percentile(50),
+                    "p95_seconds": stats.wall_seconds.percentile(95),
+                    "p50_ttft_seconds": stats.ttft_seconds.percentile(50),
+                    "p95_ttft_seconds": stats.ttft_seconds.percentile(95),
+                    "p50_prompt_tokens": stats.prompt_token_counts.percentile(50),
+                    "p50_completion_tokens": stats.completion_token_counts.percentile(50),
+                    "p95_completion_tokens": stats.completion_token_counts.percentile(95),
+                    "prompt_tokens": stats.prompt_tokens,
+                    "completion_tokens": stats.completion_tokens,
+                    "error_counts": dict(stats.errors),
+                }
+                for model, stats in sorted(self._models.items())
+            ]
+
+    def _append(self, record):
+        line = json.dumps(asdict(record), ensure_ascii=False) + "\n"
+        try:
+            with self._log_lock, self.log_path.open("a", encoding="utf-8") as log_file:
+                log_file.write(line)
+        except OSError as e:
+            logging.warning(f"Could not write AI metrics to {self.log_path}: {e}")
+
+
+def read_metrics_log(path):
+    """Loads AICallRecords from a metrics JSONL file, skipping unreadable lines."""
+    records = []
+    try:
+        with Path(path).open(encoding="utf-8") as log_file:
+            for line in log_file:
+                try:
+                    records.append(AICallRecord(**json.loads(line)))
+                except (TypeError, ValueError):
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
@@ -0,0 +1,155 @@
+"""Process-wide request and token rate limiting for AI interpretation calls."""
+
+import threading
+import time
+from collections import deque
+
+
+DEFAULT_AI_REQUESTS_PER_MINUTE = 500
+DEFAULT_AI_TOKENS_PER_MINUTE = 200_000
+CHARS_PER_TOKEN_ESTIMATE = 4
+RATE_LIMIT_BACKOFF_MIN_SECONDS = 1.0
+RATE_LIMIT_BACKOFF_MAX_SECONDS = 60.0
+
+
+def estimate_prompt_tokens(messages):
+    """Estimates a prompt's token count as its characters / 4."""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // CHARS_PER_TOKEN_ESTIMATE
+
+
+def estimate_text_tokens(text):
+    return len(text) // CHARS_PER_TOKEN_ESTIMATE
+
+
+def estimate_request_tokens(messages, max_tokens):
+    """Estimates a request's token cost as prompt characters / 4 plus max_tokens."""
+    return estimate_prompt_tokens(messages) + int(max_tokens)
+
+
+class TokenBucket:
+    """A bucket refilled continuously at ``per_minute`` units per minute."""
+
+    def __init__(self, per_minute, now):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._updated_at = now
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def seconds_until(self, amount):
+        """Returns how long until ``amount`` is available, assuming refill() just ran."""
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self._rate, 0.0)
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+    def drain(self):
+        self.level = min(self.level, 0.0)
+
+
+class AIRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets behind a fair FIFO queue.
+
+    Callers are admitted strictly in arrival order. A rate-limit response from
+    the provider blocks the whole queue for its Retry-After hint, or for an
+    exponentially growing backoff when no hint is given. A limit of 0 disables
+    that bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute=DEFAULT_AI_REQUESTS_PER_MINUTE,
+        tokens_per_minute=DEFAULT_AI_TOKENS_PER_MINUTE,
+        clock=time.monotonic,
+    ):
+        self._clock = clock
+        now = clock()
+        self._request_bucket = TokenBucket(requests_per_minute, now) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute, now) if tokens_per_minute else None
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._blocked_until = now
+        self._backoff_seconds = 0.0
+
+    def acquire(self, tokens, on_wait=None):
+        """Blocks until this caller may send a request estimated at ``tokens``.
+
+        ``on_wait`` is called with the caller's 1-based queue position whenever
+        it changes while waiting. Returns the seconds spent waiting.
+        """
+        started_at = self._clock()
+        ticket = object()
+        reported_position = None
+        with self._condition:
+            self._queue.append(ticket)
+
+        try:
+            while True:
+                with self._condition:
+                    position = self._queue.index(ticket) + 1
+                    delay = self._admission_delay(tokens) if position == 1 else None
+                    if delay == 0:
+                        self._take(tokens)
+                        self._queue.popleft()
+                        self._condition.notify_all()
+                        return self._clock() - started_at
+                    if on_wait is None or position == reported_position:
+                        self._condition.wait(delay)
+                        continue
+
+                on_wait(position)
+                reported_position = position
+        except BaseException:
+            with self._condition:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    self._condition.notify_all()
+            raise
+
+    def record_rate_limit(self, retry_after=None):
+        """Pauses admissions after the provider rejected a request for rate limiting."""
+        with self._condition:
+            if retry_after is None:
+                self._backoff_seconds = min(
+                    max(self._backoff_seconds * 2, RATE_LIMIT_BACKOFF_MIN_SECONDS),
+                    RATE_LIMIT_BACKOFF_MAX_SECONDS,
+                )
+                delay = self._backoff_seconds
+            else:
+                delay = min(retry_after, RATE_LIMIT_BACKOFF_MAX_SECONDS)
+
+            self._blocked_until = max(self._blocked_until, self._clock() + delay)
+            for bucket in (self._request_bucket, self._token_bucket):
+                if bucket is not None:
+                    bucket.drain()
+            self._condition.notify_all()
+
+    def record_success(self):
+        with self._condition:
+            self._backoff_seconds = 0.0
+
+    def queue_length(self):
+        with self._condition:
+            return len(self._queue)
+
+    def _admission_delay(self, tokens):
+        now = self._clock()
+        delay = max(self._blocked_until - now, 0.0)
+        if self._request_bucket is not None:
+            self._request_bucket.refill(now)
+            delay = max(delay, self._request_bucket.seconds_until(1))
+        if self._token_bucket is not None:
+            self._token_bucket.refill(now)
+            delay = max(delay, self._token_bucket.seconds_until(tokens))
+        return delay
+
+    def _take(self, tokens):
+        if self._request_bucket is not None:
+            self._request_bucket.take(1)
+        if self._token_bucket is not None:
+            self._token_bucket.take(tokens)
@@ -0,0 +1,63 @@
+"""Coalesces concurrent identical AI requests into one upstream call."""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share its outcome.
+
+    The first caller for a key becomes the leader and runs the call. Callers
+    that arrive while it is in flight wait on the same future and receive the
+    same result or exception. Finished calls are forgotten, so later callers
+    start a fresh call (the interpretation cache covers repeats).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def claim(self, key):
+        """Returns ``(future, is_leader)``; the leader must later call resolve()."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def resolve(self, key, future, result=None, error=None):
+        """Publishes the leader's outcome to every waiting caller."""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, timeout=None):
+        """Calls ``fn()`` once for all concurrent callers with the same key.
+
+        A caller waiting on another's call raises concurrent.futures.TimeoutError
+        after ``timeout`` seconds; the call itself keeps running.
+        """
+        future, is_leader = self.claim(key)
+        if not is_leader:
+            return future.result(timeout=timeout)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self.resolve(key, future, error=e)
+            raise
+
+        self.resolve(key, future, result=result)
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -3,7 +3,6 @@ import time
 import logging
 from datetime import datetime
 
-import openai
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
@@ -13,14 +12,19 @@ from ai_integration import (
     AIRateLimitError,
     AIInterpretationError,
     build_ai_config,
-    get_ai_interpretation,
+    get_ai_runtime,
+    get_shared_client,
+    prefetch_ai_interpretation,
+    stream_ai_interpretation,
 )
+from ai_library import lookup_offline_interpretation
 from constants import LOG_FILE, SAMPLE_QUESTIONS
 from file_handler import (
     JOURNAL_FILE,
     IChingDataError,
     JournalValidationError,
     enrich_journal,
+    get_journal_version,
     load_iching_data,
     load_journal,
     reconstruct_reading_from_row,
@@ -28,7 +32,15 @@ from file_handler import (
     update_journal_entry_flags,
 )
 from iching_logic import cast_reading
-from journal_ui import render_empty_journal_sidebar, render_journal_sidebar
+from journal_analytics import get_journal_analytics, render_journal_analytics
+from journal_similarity import find_similar_readings
+from journal_ui import (
+    render_empty_journal_sidebar,
+    render_journal_pagination,
+    render_journal_sidebar,
+    select_journal_neighbor_entry,
+)
+from page_assets import inject_once, start_page_render
 from reading_service import create_reading
 from ui_components import display_reading
 
@@ -49,8 +61,10 @@ st.set_page_config(
 
 def main():
     """Main function to run the Streamlit app."""
+    start_page_render()
+
     # --- CSS for Button Feel ---
-    st.markdown("""
+    inject_once("button-styles", """
     <style>
         div[data-testid="stButton"] > button {
             transition: transform 150ms ease-in-out;
@@ -64,7 +78,7 @@ def main():
             transform: scale(0.98);
         }
     </style>
-    """, unsafe_allow_html=True)
+    """)
     
     try:
         iching_data, binary_to_hex_map = load_iching_data()
@@ -84,7 +98,7 @@ def main():
 
     openai_enabled = bool(ai_config and ai_config.enabled)
     if openai_enabled:
-        client = openai.OpenAI(**ai_config.client_kwargs())
+        client = get_shared_client(ai_config)
 
     if iching_data and binary_to_hex_map:
         render_main_ui(
@@ -97,6 +111,9 @@ def main():
         )
         render_journal(iching_data)
 
+    if openai_enabled:
+        render_ai_metrics_panel(get_ai_runtime(ai_config.settings).metrics)
+
 
 def render_journal(iching_data):
     """Renders the reading journal section, displaying past readings."""
@@ -104,6 +121,7 @@ def render_journal(iching_data):
     st.header("Reading Journal")
 
     try:
+        journal_version = get_journal_version()
         journal_df = load_journal()
     except JournalValidationError as e:
         logging.error(f"Journal load validation error: {e}")
@@ -116,46 +134,67 @@ def render_journal(iching_data):
         return
 
     journal_df = enrich_journal(journal_df, iching_data)
-    filtered_df = render_journal_sidebar(journal_df, iching_data)
+    filtered_df = render_journal_sidebar(journal_df, iching_data, journal_version=journal_version)
+
+    journal_view = st.radio(
+        "Journal view",
+        ["Readings", "Analytics"],
+        horizontal=True,
+        key="journal_view",
+        label_visibility="collapsed",
+    )
+    if journal_view == "Analytics":
+        render_journal_analytics(get_journal_analytics(journal_version, journal_df), iching_data)
+        return
 
     if filtered_df.empty:
         st.info("No saved readings match the current journal filters.")
         return
 
-    for index, row in filtered_df.iterrows():
+    page_df = render_journal_pagination(filtered_df)
+    for index, row in page_df.iterrows():
+        render_journal_entry(index, row, iching_data)
+
+
+def render_journal_entry(index, row, iching_data):
+    """Renders one journal row, building the full reading only once it is opened."""
+    primary_label = str(row.get("Primary Hexagram") or row["Primary Hexagram Number"])
+    hexagram_path = primary_label
+    if pd.notna(row.get("Evolving Hexagram")) and row.get("Evolving Hexagram"):
+        hexagram_path = f"{hexagram_path} -> {row['Evolving Hexagram']}"
+
+    entry_id = str(row["Entry ID"])
+    favorite_label = "★ " if row.get("Favorite", False) else ""
+    archived_label = " [Archived]" if row.get("Archived", False) else ""
+
+    with st.container(border=True):
+        st.markdown(f"{favorite_label}**{row['Date']}** | {hexagram_path}{archived_label}")
+        if not st.toggle("Open reading", key=f"journal_open_{entry_id}"):
+            return
+
         try:
             reconstructed_reading = reconstruct_reading_from_row(row, iching_data)
         except JournalValidationError as e:
             logging.warning(f"Skipping invalid journal row {index}: {e}")
             st.warning(f"Skipped an invalid journal entry from {row.get('Date', 'an unknown date')}.")
-            continue
-
-        primary_label = str(row.get("Primary Hexagram") or row["Primary Hexagram Number"])
-        hexagram_path = primary_label
-        if pd.notna(row.get("Evolving Hexagram")) and row.get("Evolving Hexagram"):
-            hexagram_path = f"{hexagram_path} -> {row['Evolving Hexagram']}"
-
-        entry_id = str(row["Entry ID"])
-        favorite_label = "★ " if row.get("Favorite", False) else ""
-        archived_label = " [Archived]" if row.get("Archived", False) else ""
-
-        with st.expander(f"{favorite_label}**{row['Date']}** | {hexagram_path}{archived_label}"):
-            st.markdown(f"**Question:** {row['Question']}")
-            st.caption(
-                f"Lines: {row['Lines']} | "
-                f"Changing lines: {'Yes' if row['Has Changing Lines'] else 'No'} | "
-                f"AI contemplation: {'Yes' if row['Has AI Contemplation'] else 'No'}"
-            )
-            render_journal_entry_actions(entry_id, row)
-            display_reading(reconstructed_reading, is_journal=True)
-            if pd.notna(row['AI Interpretation']):
-                st.markdown("**AI Contemplation:**")
-                st.markdown(row['AI Interpretation'])
+            return
+
+        st.markdown(f"**Question:** {row['Question']}")
+        st.caption(
+            f"Lines: {row['Lines']} | "
+            f"Changing lines: {'Yes' if row['Has Changing Lines'] else 'No'} | "
+            f"AI contemplation: {'Yes' if row['Has AI Contemplation'] else 'No'}"
+        )
+        render_journal_entry_actions(entry_id, row)
+        display_reading(reconstructed_reading, is_journal=True)
+        if pd.notna(row['AI Interpretation']):
+            st.markdown("**AI Contemplation:**")
+            st.markdown(row['AI Interpretation'])
 
 
 def render_journal_entry_actions(entry_id, row):
-    """Renders favorite and archive controls for a saved journal reading."""
-    col1, col2 = st.columns([1, 1])
+    """Renders favorite, archive, and find-similar controls for a saved journal reading."""
+    col1, col2, col3 = st.columns([1, 1, 1])
     favorite_key = f"journal_favorite_{entry_id}"
     favorite_value = bool(row.get("Favorite", False))
 
@@ -175,6 +214,16 @@ def render_journal_entry_actions(entry_id, row):
                 update_journal_entry_flags(entry_id, archived=True)
                 st.rerun()
 
+    with col3:
+        st.button(
+            "Find similar",
+            key=f"journal_similar_{entry_id}",
+            help="Filter the journal to readings whose lines differ from this one in only a few places.",
+            use_container_width=True,
+            on_click=select_journal_neighbor_entry,
+            args=([int(value) for value in str(row["Lines"]).split(",")], str(row["Date"])),
+        )
+
 
 def render_main_ui(
     iching_data,
@@ -227,6 +276,14 @@ def render_main_ui(
                 binary_to_hex_map=binary_to_hex_map,
                 timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             )
+            cancel_ai_prefetch()
+            if openai_enabled and ai_config.settings.prefetch:
+                st.session_state.ai_prefetch = prefetch_ai_interpretation(
+                    st.session_state.reading,
+                    client,
+                    settings=ai_config.settings,
+                    runtime=get_ai_runtime(ai_config.settings),
+                )
             st.rerun()
 
     if st.session_state.get('reading_cast'):
@@ -236,27 +293,11 @@ def render_main_ui(
         st.header("Contemplation & Journal")
         
         col1, col2 = st.columns(2)
+        generate_clicked = False
         with col1:
             if openai_enabled:
                 button_label = f"🤖 Generate AI Contemplation ({ai_config.settings.model})"
-                if st.button(button_label, use_container_width=True):
-                    with st.spinner("The AI is consulting the oracle..."):
-                        try:
-                            interpretation = get_ai_interpretation(
-                                st.session_state.reading,
-                                client,
-                                settings=ai_config.settings,
-                            )
-                            if interpretation:
-                                st.session_state.ai_interpretation = interpretation
-                                st.session_state.reading['ai_interpretation'] = interpretation
-                                st.rerun()
-                        except AIRateLimitError as e:
-                            logging.error(f"OpenAI API rate limit error: {e}")
-                            st.error(str(e))
-                        except AIInterpretationError as e:
-                            logging.error(f"OpenAI API error: {e}")
-                            st.error(str(e))
+                generate_clicked = st.button(button_label, use_container_width=True)
             else:
                 st.button("🤖 Generate AI Contemplation", use_container_width=True, disabled=True)
                 if ai_config_error:
@@ -269,7 +310,7 @@ def render_main_ui(
         with col2:
             if st.button("💾 Save to Journal", use_container_width=True, disabled=st.session_state.reading_saved):
                 try:
-                    save_reading_to_csv(st.session_state.reading)
+                    st.session_state.reading['entry_id'] = save_reading_to_csv(st.session_state.reading)
                     st.session_state.reading_saved = True
                     st.success(f"Reading saved to {JOURNAL_FILE}")
                     st.rerun()
@@ -277,9 +318,170 @@ def render_main_ui(
                     logging.error(f"Journal save validation error: {e}")
                     st.error(f"Could not save this reading: {e}")
 
-        if st.session_state.get('ai_interpretation'):
+        if generate_clicked:
+            prefetched_interpretation = take_prefetched_interpretation()
+            if prefetched_interpretation:
+                st.session_state.ai_interpretation = prefetched_interpretation
+                st.session_state.reading['ai_interpretation'] = prefetched_interpretation
+                st.rerun()
+            render_streamed_interpretation(client, ai_config)
+        elif st.session_state.get('ai_interpretation'):
             with st.expander("A Guided Reflection", expanded=True):
                 st.markdown(st.session_state.ai_interpretation)
+        else:
+            render_offline_interpretation(st.session_state.reading, openai_enabled)
+
+        render_related_readings(st.session_state.reading, iching_data)
+
+
+def cancel_ai_prefetch():
+    """Drops the session's background interpretation, cancelling it if not yet started.
+
+    A request that is already running finishes in the background and still
+    fills the interpretation cache.
+    """
+    prefetch = st.session_state.pop("ai_prefetch", None)
+    if prefetch is not None:
+        prefetch.cancel()
+
+
+def take_prefetched_interpretation():
+    """Returns the prefetched interpretation if it finished successfully, else None.
+
+    A prefetch that is still running is left alone: the streamed request joins
+    it through the runtime's single-flight layer instead of calling again.
+    """
+    prefetch = st.session_state.get("ai_prefetch")
+    if prefetch is None or not prefetch.done():
+        return None
+
+    st.session_state.pop("ai_prefetch")
+    if prefetch.cancelled():
+        return None
+    return prefetch.result()
+
+
+def render_streamed_interpretation(client, ai_config):
+    """Streams a new AI contemplation into the reflection expander and stores the result."""
+    try:
+        with st.expander("A Guided Reflection", expanded=True):
+            queue_status = st.empty()
+
+            def show_queue_position(position):
+                queue_status.caption(
+                    f"⏳ The AI is busy with other readings. You are number {position} in line..."
+                )
+
+            interpretation = st.write_stream(
+                clear_on_first_chunk(
+                    stream_ai_interpretation(
+                        st.session_state.reading,
+                        client,
+                        settings=ai_config.settings,
+                        runtime=get_ai_runtime(ai_config.settings),
+                        on_wait=show_queue_position,
+                    ),
+                    queue_status,
+                )
+            )
+        if interpretation:
+            st.session_state.ai_interpretation = interpretation
+            st.session_state.reading['ai_interpretation'] = interpretation
+            st.rerun()
+    except AIRateLimitError as e:
+        logging.error(f"OpenAI API rate limit error: {e}")
+        st.error(str(e))
+        render_offline_interpretation(st.session_state.reading, openai_enabled=False)
+    except AIInterpretationError as e:
+        logging.error(f"OpenAI API error: {e}")
+        st.error(str(e))
+        render_offline_interpretation(st.session_state.reading, openai_enabled=False)
+
+
+def render_offline_interpretation(reading, openai_enabled):
+    """Shows the precomputed baseline contemplation for the reading's line pattern, if any."""
+    interpretation = lookup_offline_interpretation(reading)
+    if not interpretation:
+        return
+
+    with st.expander("A Baseline Reflection", expanded=not openai_enabled):
+        if openai_enabled:
+            st.caption("Prepared in advance for this line pattern. Generate an AI contemplation for one shaped by your question.")
+        else:
+            st.caption("Prepared in advance for this line pattern; it does not address your specific question.")
+        st.markdown(interpretation)
+
+def render_related_readings(reading, iching_data):
+    """Lists the saved readings whose questions, contemplations, and hexagrams best match this one."""
+    try:
+        related = find_similar_readings(reading, get_journal_version(), load_journal)
+    except JournalValidationError as e:
+        logging.error(f"Journal load validation error: {e}")
+        return
+    if not related:
+        return
+
+    def hexagram_label(number):
+        hexagram = iching_data.get(str(number))
+        return f"{number}. {hexagram['name_en']}" if hexagram else str(number)
+
+    with st.expander("Related Past Readings", expanded=False):
+        for match in related:
+            path = hexagram_label(match.primary_number)
+            if match.evolving_number:
+                path += f" -> {hexagram_label(match.evolving_number)}"
+            st.markdown(f"**{match.date}** — {match.question}  \n{path}")
+
+
+def render_ai_metrics_panel(metrics):
+    """Shows per-model AI call latency, token use, and errors in a collapsed sidebar panel."""
+    if metrics is None:
+        return
+
+    with st.sidebar.expander("🔧 AI Call Metrics", expanded=False):
+        summary = metrics.summary()
+        if not summary:
+            st.caption("No AI calls in this process yet.")
+            return
+
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "Model": row["model"],
+                        "Calls": row["calls"],
+                        "Errors": row["errors"],
+                        "Retries": row["retries"],
+                        "p50 s": row["p50_seconds"],
+                        "p95 s": row["p95_seconds"],
+                        "p50 TTFT s": row["p50_ttft_seconds"],
+                        "p95 TTFT s": row["p95_ttft_seconds"],
+                        "p50 prompt tok": row["p50_prompt_tokens"],
+                        "p50 output tok": row["p50_completion_tokens"],
+                        "Total tokens": row["prompt_tokens"] + row["completion_tokens"],
+                    }
+                    for row in summary
+                ]
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        for row in summary:
+            if row["error_counts"]:
+                errors = ", ".join(f"{name}: {count}" for name, count in sorted(row["error_counts"].items()))
+                st.caption(f"{row['model']} errors — {errors}")
+        if metrics.log_path is not None:
+            st.caption(f"Every call is also logged to {metrics.log_path.name}.")
+
+
+def clear_on_first_chunk(chunks, placeholder):
+    """Passes chunks through, emptying a status placeholder once text starts arriving."""
+    cleared = False
+    for chunk in chunks:
+        if not cleared:
+            placeholder.empty()
+            cleared = True
+        yield chunk
 
 if __name__ == "__main__":
     main()
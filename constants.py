@@ -7,6 +7,15 @@ BASE_DIR = Path(__file__).resolve().parent
 ICHING_DATA_FILE = BASE_DIR / "i_ching_data.json"
 JOURNAL_FILE = BASE_DIR / "i_ching_journal.csv"
 LOG_FILE = BASE_DIR / "app.log"
+AI_CACHE_FILE = BASE_DIR / "ai_interpretation_cache.sqlite3"
+AI_BACKFILL_CHECKPOINT_FILE = BASE_DIR / "ai_backfill_checkpoint.jsonl"
+AI_METRICS_FILE = BASE_DIR / "ai_metrics.jsonl"
+AI_LIBRARY_FILE = BASE_DIR / "ai_library.bin"
+
+JOURNAL_FILTER_CACHE_MAX_ENTRIES = 64
+JOURNAL_FILTER_CACHE_MAX_IDS = 500_000
+JOURNAL_PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_JOURNAL_PAGE_SIZE = 25
 
 HEXAGRAM_THEME_SUMMARIES = {
     1: "Your journal has recently emphasized creative force, initiative, discipline, and acting with clarity.",
@@ -1,8 +1,11 @@
 import json
+import logging
 import os
 import hashlib
 import tempfile
 import uuid
+import zipfile
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 
@@ -19,6 +22,20 @@ class JournalValidationError(Exception):
     """Raised when a journal row or reading has invalid data."""
 
 
+class JournalExportError(Exception):
+    """Raised when a journal export cannot be produced."""
+
+
+@dataclass(frozen=True)
+class JournalChange:
+    """Describes one completed journal write for incremental consumers."""
+
+    previous_version: object
+    version: object
+    added_records: tuple = ()
+    updated_records: tuple = ()
+
+
 VALID_LINE_VALUES = {6, 7, 8, 9}
 EXPECTED_HEXAGRAM_COUNT = 64
 EXPECTED_BINARY_CODES = {format(number, "06b") for number in range(64)}
@@ -33,6 +50,7 @@ REQUIRED_HEXAGRAM_FIELDS = [
     "image_en",
     "lines",
 ]
+EXPORT_CHUNK_ROWS = 1000
 REQUIRED_JOURNAL_COLUMNS = [
     "Entry ID",
     "Date",
@@ -46,6 +64,27 @@ REQUIRED_JOURNAL_COLUMNS = [
 ]
 
 
+_journal_listeners = []
+
+
+def add_journal_listener(listener):
+    """Registers a callback that receives a JournalChange after each journal write."""
+    if listener not in _journal_listeners:
+        _journal_listeners.append(listener)
+
+def remove_journal_listener(listener):
+    """Unregisters a callback added with add_journal_listener."""
+    if listener in _journal_listeners:
+        _journal_listeners.remove(listener)
+
+def notify_journal_listeners(change):
+    """Delivers a journal change to every listener without failing the write."""
+    for listener in list(_journal_listeners):
+        try:
+            listener(change)
+        except Exception:
+            logging.getLogger(__name__).exception("Journal listener failed for %r", listener)
+
 @lru_cache(maxsize=1)
 def load_iching_data():
     """Loads the I Ching data and creates a binary-to-hexagram map for efficient lookups."""
@@ -144,7 +183,7 @@ def validate_iching_data(iching_data):
         )
 
 def save_reading_to_csv(reading):
-    """Persists a single reading to the CSV journal."""
+    """Persists a single reading to the CSV journal and returns its Entry ID."""
     validated_lines = parse_lines(reading.get("lines"))
     primary_hex = reading['primary_hex']
     secondary_hex = reading.get('secondary_hex')
@@ -161,6 +200,7 @@ def save_reading_to_csv(reading):
         "Archived": False,
     }
     
+    previous_version = get_journal_version()
     journal_df = load_journal()
     record_df = pd.DataFrame([record])
     updated_df = pd.concat(
@@ -169,6 +209,10 @@ def save_reading_to_csv(reading):
         sort=False,
     )
     write_journal_df(updated_df)
+    notify_journal_listeners(
+        JournalChange(previous_version, get_journal_version(), added_records=(record,))
+    )
+    return record["Entry ID"]
 
 def load_journal():
     """Loads the reading journal as a DataFrame."""
@@ -185,6 +229,15 @@ def load_journal():
             "The existing journal was left unchanged."
         ) from e
 
+def get_journal_version():
+    """Returns a cheap fingerprint of the journal file that changes on every write."""
+    try:
+        stat_result = os.stat(JOURNAL_FILE)
+    except FileNotFoundError:
+        return None
+
+    return (stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+
 def empty_journal_df():
     """Returns an empty journal DataFrame with the expected schema."""
     return pd.DataFrame(columns=REQUIRED_JOURNAL_COLUMNS)
@@ -234,6 +287,7 @@ def normalize_bool(value):
 
 def update_journal_entry_flags(entry_id, favorite=None, archived=None):
     """Updates favorite/archive metadata for a single journal entry."""
+    previous_version = get_journal_version()
     journal_df = load_journal()
     if journal_df.empty:
         raise JournalValidationError("Journal is empty.")
@@ -243,12 +297,58 @@ def update_journal_entry_flags(entry_id, favorite=None, archived=None):
     if not matches.any():
         raise JournalValidationError(f"Unknown journal entry ID: {entry_id}")
 
+    before_records = journal_df[matches].to_dict("records")
     if favorite is not None:
         journal_df.loc[matches, "Favorite"] = bool(favorite)
     if archived is not None:
         journal_df.loc[matches, "Archived"] = bool(archived)
+    after_records = journal_df[matches].to_dict("records")
+
+    write_journal_df(journal_df)
+    notify_journal_listeners(
+        JournalChange(
+            previous_version,
+            get_journal_version(),
+            updated_records=tuple(zip(before_records, after_records)),
+        )
+    )
+
+
+def update_journal_ai_interpretations(interpretations):
+    """Stores AI interpretations for several entries in a single journal write.
+
+    ``interpretations`` maps Entry IDs to interpretation text. Unknown IDs are
+    ignored; returns the number of entries updated.
+    """
+    interpretations = {str(entry_id): text for entry_id, text in interpretations.items() if text}
+    if not interpretations:
+        return 0
+
+    previous_version = get_journal_version()
+    journal_df = load_journal()
+    if journal_df.empty:
+        return 0
+
+    entry_ids = journal_df["Entry ID"].astype(str)
+    matches = entry_ids.isin(interpretations.keys())
+    if not matches.any():
+        return 0
+
+    before_records = journal_df[matches].to_dict("records")
+    journal_df["AI Interpretation"] = journal_df["AI Interpretation"].astype(object)
+    journal_df.loc[matches, "AI Interpretation"] = entry_ids[matches].map(interpretations)
+    after_records = journal_df[matches].to_dict("records")
 
     write_journal_df(journal_df)
+    notify_journal_listeners(
+        JournalChange(
+            previous_version,
+            get_journal_version(),
+            updated_records=tuple(zip(before_records, after_records)),
+        )
+    )
+    return int(matches.sum())
+
 
 def write_journal_df(journal_df):
     """Atomically writes the journal DataFrame to disk."""
@@ -344,28 +444,177 @@ def has_changing_lines(lines):
 
 def journal_to_markdown(journal_df):
     """Formats a journal DataFrame as a readable Markdown export."""
-    sections = ["# I Ching Reading Journal\n"]
-
-    for _, row in journal_df.iterrows():
-        date = row.get("Date", "")
-        question = row.get("Question", "")
-        primary = row.get("Primary Hexagram", row.get("Primary Hexagram Number", ""))
-        evolving = row.get("Evolving Hexagram")
-        lines = row.get("Lines", "")
-        ai_interpretation = row.get("AI Interpretation")
-
-        sections.append(f"## {date} - {question}\n")
-        sections.append(f"Primary: {primary}\n")
-        if pd.notna(evolving) and evolving:
-            sections.append(f"Evolving: {evolving}\n")
-        sections.append(f"Lines: {lines}\n")
-
-        if pd.notna(ai_interpretation) and str(ai_interpretation).strip():
-            sections.append("\n### AI Contemplation\n")
-            sections.append(str(ai_interpretation).strip())
-            sections.append("\n")
-
-    return "\n".join(sections)
+    return "".join(iter_journal_markdown(journal_df))
+
+def iter_journal_markdown(journal_df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yields the Markdown journal export in chunks of formatted rows."""
+    yield "# I Ching Reading Journal\n"
+
+    primary_column = "Primary Hexagram" if "Primary Hexagram" in journal_df.columns else "Primary Hexagram Number"
+    columns = ["Date", "Question", primary_column, "Evolving Hexagram", "Lines", "AI Interpretation"]
+    defaults = ["", "", "", None, "", None]
+    row_values = pd.DataFrame(
+        {
+            column: journal_df[column] if column in journal_df.columns else default
+            for column, default in zip(columns, defaults)
+        },
+        index=journal_df.index,
+    )
+
+    for chunk_df in iter_journal_chunks(row_values, chunk_rows):
+        sections = []
+        for date, question, primary, evolving, lines, ai_interpretation in chunk_df.itertuples(
+            index=False,
+            name=None,
+        ):
+            sections.append(f"## {date} - {question}\n")
+            sections.append(f"Primary: {primary}\n")
+            if pd.notna(evolving) and evolving:
+                sections.append(f"Evolving: {evolving}\n")
+            sections.append(f"Lines: {lines}\n")
+
+            if pd.notna(ai_interpretation) and str(ai_interpretation).strip():
+                sections.append("\n### AI Contemplation\n")
+                sections.append(str(ai_interpretation).strip())
+                sections.append("\n")
+
+        if sections:
+            yield "\n" + "\n".join(sections)
+
+def iter_journal_csv(journal_df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yields the CSV journal export in chunks, starting with the header."""
+    yield journal_df.head(0).to_csv(index=False)
+
+    for chunk_df in iter_journal_chunks(journal_df, chunk_rows):
+        yield chunk_df.to_csv(index=False, header=False)
+
+def iter_journal_chunks(journal_df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yields consecutive row slices of a journal DataFrame."""
+    for start in range(0, len(journal_df), chunk_rows):
+        yield journal_df.iloc[start:start + chunk_rows]
+
+def iter_journal_jsonl(journal_df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yields the journal as JSON Lines, one record per row, in chunks."""
+    for chunk_df in iter_journal_chunks(journal_df, chunk_rows):
+        yield format_jsonl_chunk(chunk_df)
+
+def format_jsonl_chunk(chunk_df):
+    """Formats journal rows as newline-terminated JSON Lines."""
+    if chunk_df.empty:
+        return ""
+
+    chunk_text = chunk_df.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+    return chunk_text if chunk_text.endswith("\n") else chunk_text + "\n"
+
+def write_text_export(chunks, output_path):
+    """Streams text chunks to a UTF-8 file."""
+    with open(output_path, "w", encoding="utf-8", newline="") as output_file:
+        for chunk in chunks:
+            output_file.write(chunk)
+
+def write_csv_export(journal_df, output_path, iching_data=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    write_text_export(iter_journal_csv(journal_df, chunk_rows), output_path)
+
+def write_markdown_export(journal_df, output_path, iching_data=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    write_text_export(iter_journal_markdown(journal_df, chunk_rows), output_path)
+
+def write_jsonl_export(journal_df, output_path, iching_data=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    write_text_export(iter_journal_jsonl(journal_df, chunk_rows), output_path)
+
+def write_parquet_export(journal_df, output_path, iching_data=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes the journal as Parquet with one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise JournalExportError("Parquet export requires the pyarrow package.") from e
+
+    def normalize(chunk_df):
+        text_columns = chunk_df.select_dtypes(include="object").columns
+        return chunk_df.astype({column: "string" for column in text_columns})
+
+    schema = pa.Schema.from_pandas(normalize(journal_df.head(0)), preserve_index=False)
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for chunk_df in iter_journal_chunks(journal_df, chunk_rows):
+            writer.write_table(
+                pa.Table.from_pandas(normalize(chunk_df), schema=schema, preserve_index=False),
+                row_group_size=chunk_rows,
+            )
+
+def write_bundle_export(journal_df, output_path, iching_data=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes a zip holding the journal as JSONL plus the hexagram texts it references."""
+    if iching_data is None:
+        iching_data, _ = load_iching_data()
+
+    referenced_numbers = set()
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        with bundle.open("journal.jsonl", "w") as journal_file:
+            for chunk_df in iter_journal_chunks(journal_df, chunk_rows):
+                journal_file.write(format_jsonl_chunk(chunk_df).encode("utf-8"))
+                for column in ["Primary Hexagram Number", "Evolving Hexagram Number"]:
+                    if column in chunk_df.columns:
+                        numbers = pd.to_numeric(chunk_df[column], errors="coerce").dropna()
+                        referenced_numbers.update(numbers.astype(int).tolist())
+
+        hexagrams = {
+            str(number): iching_data[str(number)]
+            for number in sorted(referenced_numbers)
+            if str(number) in iching_data
+        }
+        bundle.writestr("hexagrams.json", json.dumps(hexagrams, ensure_ascii=False, indent=2))
+
+@dataclass(frozen=True)
+class JournalExporter:
+    """A named journal export format and the function that writes it to a path."""
+
+    name: str
+    suffix: str
+    file_name: str
+    mime: str
+    write: object
+
+JOURNAL_EXPORTERS = {
+    exporter.name: exporter
+    for exporter in [
+        JournalExporter("CSV", ".csv", "i_ching_journal_filtered.csv", "text/csv", write_csv_export),
+        JournalExporter("Markdown", ".md", "i_ching_journal.md", "text/markdown", write_markdown_export),
+        JournalExporter("JSONL", ".jsonl", "i_ching_journal.jsonl", "application/x-ndjson", write_jsonl_export),
+        JournalExporter(
+            "Parquet",
+            ".parquet",
+            "i_ching_journal.parquet",
+            "application/vnd.apache.parquet",
+            write_parquet_export,
+        ),
+        JournalExporter("Zip bundle", ".zip", "i_ching_journal_bundle.zip", "application/zip", write_bundle_export),
+    ]
+}
+
+def register_journal_exporter(exporter):
+    """Adds or replaces an export format available to the journal UI."""
+    JOURNAL_EXPORTERS[exporter.name] = exporter
+
+def export_journal(journal_df, format_name, iching_data=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Writes a journal export to a new temporary file and returns its path."""
+    exporter = JOURNAL_EXPORTERS.get(format_name)
+    if exporter is None:
+        raise JournalExportError(f"Unknown journal export format: {format_name}")
+
+    export_df = journal_df.drop(columns=["Date Parsed"], errors="ignore")
+    with tempfile.NamedTemporaryFile(
+        suffix=exporter.suffix,
+        prefix="i_ching_export_",
+        delete=False,
+    ) as temp_file:
+        output_path = Path(temp_file.name)
+
+    try:
+        exporter.write(export_df, output_path, iching_data=iching_data, chunk_rows=chunk_rows)
+    except BaseException:
+        output_path.unlink(missing_ok=True)
+        raise
+
+    return output_path
 
 def reconstruct_reading_from_row(row, iching_data):
     """Reconstructs a reading dictionary from a DataFrame row."""
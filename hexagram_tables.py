@@ -0,0 +1,121 @@
+"""Integer lookup tables derived once from the hexagram source data.
+
+A hexagram code is the six-bit integer of its ``binary_code`` string, so line 1
+(the bottom line) is the most significant bit. The lower trigram is therefore
+``code >> 3`` and the upper trigram is ``code & 7``.
+
+The classical relationships are derived from the same codes: the nuclear
+hexagram stacks lines 2-4 under lines 3-5, the inverse reads the lines from the
+top down, and the complementary hexagram flips every line.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from file_handler import load_iching_data
+
+
+HEXAGRAM_COUNT = 64
+ALL_LINES_MASK = 0b111111
+NUCLEAR_LINE_ORDER = [1, 2, 3, 2, 3, 4]
+LINE_BIT_WEIGHTS = np.array([32, 16, 8, 4, 2, 1], dtype=np.int64)
+TRIGRAM_NAMES = {
+    0b111: "Heaven ☰",
+    0b000: "Earth ☷",
+    0b100: "Thunder ☳",
+    0b010: "Water ☵",
+    0b001: "Mountain ☶",
+    0b011: "Wind ☴",
+    0b101: "Fire ☲",
+    0b110: "Lake ☱",
+}
+
+
+@dataclass(frozen=True)
+class HexagramTables:
+    """Code, trigram, and relationship lookups indexed by hexagram code or zero-based number.
+
+    ``nuclear``, ``inverse``, and ``complementary`` hold hexagram numbers.
+    """
+
+    code_to_number: np.ndarray
+    number_to_code: np.ndarray
+    lower_trigram: np.ndarray
+    upper_trigram: np.ndarray
+    nuclear: np.ndarray
+    inverse: np.ndarray
+    complementary: np.ndarray
+    labels: tuple
+
+    def code_for_number(self, number):
+        return int(self.number_to_code[int(number) - 1])
+
+    def number_for_code(self, code):
+        return int(self.code_to_number[int(code)])
+
+    def label_for_number(self, number):
+        return self.labels[int(number) - 1]
+
+
+def build_hexagram_tables(iching_data):
+    """Builds lookup tables from validated hexagram source data."""
+    code_to_number = np.zeros(HEXAGRAM_COUNT, dtype=np.int16)
+    number_to_code = np.zeros(HEXAGRAM_COUNT, dtype=np.int16)
+    labels = [""] * HEXAGRAM_COUNT
+
+    for hexagram in iching_data.values():
+        code = int(hexagram["binary_code"], 2)
+        number = int(hexagram["number"])
+        code_to_number[code] = number
+        number_to_code[number - 1] = code
+        labels[number - 1] = f"{number}: {hexagram['name_en']}"
+
+    # Column i holds line i + 1, matching LINE_BIT_WEIGHTS.
+    line_bits = (number_to_code[:, None].astype(np.int64) >> np.arange(5, -1, -1)) & 1
+    nuclear_codes = line_bits[:, NUCLEAR_LINE_ORDER] @ LINE_BIT_WEIGHTS
+    inverse_codes = line_bits[:, ::-1] @ LINE_BIT_WEIGHTS
+
+    return HexagramTables(
+        code_to_number=code_to_number,
+        number_to_code=number_to_code,
+        lower_trigram=(number_to_code >> 3).astype(np.int8),
+        upper_trigram=(number_to_code & 7).astype(np.int8),
+        nuclear=code_to_number[nuclear_codes].astype(np.int8),
+        inverse=code_to_number[inverse_codes].astype(np.int8),
+        complementary=code_to_number[number_to_code ^ ALL_LINES_MASK].astype(np.int8),
+        labels=tuple(labels),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_hexagram_tables():
+    """Returns tables for the bundled hexagram data, computed once per process."""
+    iching_data, _ = load_iching_data()
+    return build_hexagram_tables(iching_data)
+
+
+def lookup_by_number(table, numbers, missing=-1):
+    """Reads a zero-based-number table for an array of hexagram numbers.
+
+    Missing or out-of-range numbers, such as NaN evolving hexagrams, get ``missing``.
+    """
+    numbers = np.asarray(numbers, dtype=float)
+    known = (numbers >= 1) & (numbers <= HEXAGRAM_COUNT)
+    indexes = np.where(known, numbers, 1).astype(np.int64) - 1
+    return np.where(known, table[indexes], missing)
+
+
+def encode_line_values(line_values):
+    """Encodes an (n, 6) array of line values into primary and evolving codes.
+
+    Returns ``(primary_codes, evolving_codes, changing)`` where ``changing`` is
+    the boolean (n, 6) matrix of moving lines.
+    """
+    line_values = np.asarray(line_values)
+    yang = (line_values == 7) | (line_values == 9)
+    changing = (line_values == 6) | (line_values == 9)
+    primary_codes = yang.astype(np.int64) @ LINE_BIT_WEIGHTS
+    evolving_codes = (yang ^ changing).astype(np.int64) @ LINE_BIT_WEIGHTS
+    return primary_codes, evolving_codes, changing
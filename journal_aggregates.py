@@ -0,0 +1,210 @@
+"""Incrementally maintained journal counts for sidebar statistics."""
+
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from file_handler import add_journal_listener, has_changing_lines, normalize_bool
+
+
+HEXAGRAM_COUNT = 64
+JOURNAL_FLAGS = ("Favorite", "Archived", "Has AI Contemplation", "Has Changing Lines")
+
+
+class JournalAggregates:
+    """Per-hexagram, per-month and per-flag counts for one journal version."""
+
+    def __init__(self):
+        self.total = 0
+        self.primary_counts = np.zeros(HEXAGRAM_COUNT, dtype=np.int64)
+        self.evolving_counts = np.zeros(HEXAGRAM_COUNT, dtype=np.int64)
+        self.archived_primary_counts = np.zeros(HEXAGRAM_COUNT, dtype=np.int64)
+        self.month_counts = Counter()
+        self.flag_counts = Counter()
+
+    @classmethod
+    def from_journal(cls, journal_df):
+        """Builds aggregates from a raw or enriched journal DataFrame in one pass."""
+        aggregates = cls()
+        if journal_df.empty:
+            return aggregates
+
+        primary_numbers = pd.to_numeric(journal_df["Primary Hexagram Number"], errors="coerce")
+        evolving_numbers = pd.to_numeric(journal_df["Evolving Hexagram Number"], errors="coerce")
+        archived = journal_df["Archived"].map(normalize_bool).to_numpy(dtype=bool)
+
+        aggregates.total = len(journal_df)
+        aggregates.primary_counts = count_hexagram_numbers(primary_numbers)
+        aggregates.evolving_counts = count_hexagram_numbers(evolving_numbers)
+        aggregates.archived_primary_counts = count_hexagram_numbers(primary_numbers[archived])
+
+        months = pd.to_datetime(journal_df["Date"], errors="coerce").dt.strftime("%Y-%m")
+        aggregates.month_counts = Counter(months.dropna().value_counts().to_dict())
+
+        flags = journal_flag_values(journal_df)
+        aggregates.flag_counts = Counter(
+            {flag: int(values.sum()) for flag, values in flags.items()}
+        )
+
+        return aggregates
+
+    def copy(self):
+        copied = JournalAggregates()
+        copied.total = self.total
+        copied.primary_counts = self.primary_counts.copy()
+        copied.evolving_counts = self.evolving_counts.copy()
+        copied.archived_primary_counts = self.archived_primary_counts.copy()
+        copied.month_counts = Counter(self.month_counts)
+        copied.flag_counts = Counter(self.flag_counts)
+        return copied
+
+    def add_record(self, record, weight=1):
+        """Adds (or with weight=-1, removes) one CSV journal record."""
+        self.total += weight
+
+        primary_index = hexagram_index(record.get("Primary Hexagram Number"))
+        archived = normalize_bool(record.get("Archived"))
+        if primary_index is not None:
+            self.primary_counts[primary_index] += weight
+            if archived:
+                self.archived_primary_counts[primary_index] += weight
+
+        evolving_index = hexagram_index(record.get("Evolving Hexagram Number"))
+        if evolving_index is not None:
+            self.evolving_counts[evolving_index] += weight
+
+        date = pd.to_datetime(record.get("Date"), errors="coerce")
+        if pd.notna(date):
+            self.month_counts[date.strftime("%Y-%m")] += weight
+
+        for flag, value in record_flag_values(record).items():
+            if value:
+                self.flag_counts[flag] += weight
+
+    def visible_primary_counts(self):
+        """Returns primary counts for readings shown when archived ones are hidden."""
+        return self.primary_counts - self.archived_primary_counts
+
+
+class JournalAggregateStore:
+    """Thread-safe holder of the aggregates for the current journal version."""
+
+    def __init__(self):
+        self._version = None
+        self._aggregates = None
+        self._lock = threading.Lock()
+
+    def get(self, journal_version, journal_df):
+        """Returns aggregates for a version, rebuilding from the frame only on a miss."""
+        with self._lock:
+            if self._aggregates is not None and self._version == journal_version:
+                return self._aggregates
+
+        aggregates = JournalAggregates.from_journal(journal_df)
+        with self._lock:
+            self._version = journal_version
+            self._aggregates = aggregates
+        return aggregates
+
+    def apply_change(self, change):
+        """Applies a JournalChange delta, or drops stale aggregates it cannot patch."""
+        with self._lock:
+            if self._aggregates is None or self._version != change.previous_version:
+                self._version = None
+                self._aggregates = None
+                return
+
+            aggregates = self._aggregates.copy()
+            for record in change.added_records:
+                aggregates.add_record(record)
+            for before_record, after_record in change.updated_records:
+                aggregates.add_record(before_record, weight=-1)
+                aggregates.add_record(after_record)
+
+            self._version = change.version
+            self._aggregates = aggregates
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._aggregates = None
+
+
+def hexagram_index(value):
+    """Returns the zero-based array index for a hexagram number, or None."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+
+    if 1 <= number <= HEXAGRAM_COUNT:
+        return number - 1
+    return None
+
+
+def count_hexagram_numbers(numbers):
+    """Counts hexagram numbers into a 64-element array, ignoring invalid values."""
+    numbers = pd.to_numeric(pd.Series(numbers), errors="coerce").to_numpy(dtype=float)
+    numbers = numbers[~np.isnan(numbers)].astype(np.int64)
+    numbers = numbers[(numbers >= 1) & (numbers <= HEXAGRAM_COUNT)]
+    return np.bincount(numbers - 1, minlength=HEXAGRAM_COUNT).astype(np.int64)
+
+
+def top_hexagram_counts(counts, iching_data, limit=3):
+    """Returns the most common hexagrams as a label-to-count Series."""
+    order = np.argsort(-counts, kind="stable")[:limit]
+    labels = []
+    values = []
+    for index in order:
+        if counts[index] <= 0:
+            break
+        hexagram = iching_data.get(str(index + 1))
+        labels.append(f"{index + 1}: {hexagram['name_en']}" if hexagram else f"{index + 1}")
+        values.append(int(counts[index]))
+
+    return pd.Series(values, index=labels, dtype="int64")
+
+
+def journal_flag_values(journal_df):
+    """Returns boolean flag arrays for a raw or enriched journal DataFrame."""
+    if "Has AI Contemplation" in journal_df.columns:
+        has_ai = journal_df["Has AI Contemplation"].to_numpy(dtype=bool)
+    else:
+        ai_text = journal_df["AI Interpretation"]
+        has_ai = (ai_text.notna() & (ai_text.astype(str).str.strip() != "")).to_numpy()
+
+    if "Has Changing Lines" in journal_df.columns:
+        has_changing = journal_df["Has Changing Lines"].to_numpy(dtype=bool)
+    else:
+        has_changing = journal_df["Lines"].apply(has_changing_lines).to_numpy(dtype=bool)
+
+    return {
+        "Favorite": journal_df["Favorite"].map(normalize_bool).to_numpy(dtype=bool),
+        "Archived": journal_df["Archived"].map(normalize_bool).to_numpy(dtype=bool),
+        "Has AI Contemplation": has_ai,
+        "Has Changing Lines": has_changing,
+    }
+
+
+def record_flag_values(record):
+    """Returns the flag values for a single CSV journal record."""
+    ai_text = record.get("AI Interpretation")
+    return {
+        "Favorite": normalize_bool(record.get("Favorite")),
+        "Archived": normalize_bool(record.get("Archived")),
+        "Has AI Contemplation": bool(
+            ai_text is not None and not pd.isna(ai_text) and str(ai_text).strip()
+        ),
+        "Has Changing Lines": has_changing_lines(record.get("Lines")),
+    }
+
+
+JOURNAL_AGGREGATES = JournalAggregateStore()
+add_journal_listener(JOURNAL_AGGREGATES.apply_change)
+
+
+def get_journal_aggregates(journal_version, journal_df):
+    """Returns the shared aggregates for the given journal version."""
+    return JOURNAL_AGGREGATES.get(journal_version, journal_df)
@@ -0,0 +1,272 @@
+"""Vectorized journal analytics computed from integer-encoded readings."""
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from hexagram_tables import HEXAGRAM_COUNT, TRIGRAM_NAMES, encode_line_values, get_hexagram_tables
+
+
+VALID_LINES_PATTERN = r"[6-9](?:,[6-9]){5}"
+FREQUENCY_CHART_HEXAGRAMS = 6
+
+
+@dataclass(frozen=True)
+class EncodedJournal:
+    """Journal readings as parallel integer arrays, one element per valid row."""
+
+    primary: np.ndarray
+    evolving: np.ndarray
+    changing: np.ndarray
+    month: np.ndarray
+    month_labels: tuple
+    skipped_rows: int
+
+
+@dataclass(frozen=True)
+class JournalAnalytics:
+    """Aggregated journal analytics ready for charting."""
+
+    reading_count: int
+    skipped_rows: int
+    month_labels: tuple
+    monthly_counts: np.ndarray
+    transition_counts: np.ndarray
+    line_change_counts: np.ndarray
+    trigram_counts: np.ndarray
+
+
+def encode_journal(journal_df, tables=None):
+    """Encodes saved lines and dates into zero-based hexagram and month indexes.
+
+    Hexagram indexes are ``number - 1``; readings without changing lines have an
+    evolving index of -1 and rows without a parseable date have a month of -1.
+    """
+    tables = tables or get_hexagram_tables()
+    valid, digits = parse_line_column(journal_df["Lines"])
+    primary_codes, evolving_codes, changing = encode_line_values(digits)
+    has_changing = changing.any(axis=1)
+
+    primary = tables.code_to_number[primary_codes].astype(np.int16) - 1
+    evolving = np.where(has_changing, tables.code_to_number[evolving_codes] - 1, -1).astype(np.int16)
+
+    if "Date Parsed" in journal_df.columns:
+        dates = journal_df["Date Parsed"]
+    else:
+        dates = pd.to_datetime(journal_df["Date"], errors="coerce")
+    month_numbers = (dates[valid].dt.year * 12 + dates[valid].dt.month - 1).to_numpy(dtype=float)
+    dated = ~np.isnan(month_numbers)
+    unique_months, month_codes = np.unique(month_numbers[dated].astype(np.int64), return_inverse=True)
+    month = np.full(len(month_numbers), -1, dtype=np.int32)
+    month[dated] = month_codes
+    month_labels = tuple(f"{number // 12}-{number % 12 + 1:02d}" for number in unique_months)
+
+    return EncodedJournal(
+        primary=primary,
+        evolving=evolving,
+        changing=changing,
+        month=month,
+        month_labels=month_labels,
+        skipped_rows=int((~valid).sum()),
+    )
+
+
+def parse_line_column(lines):
+    """Parses a column of saved line strings into a validity mask and (n, 6) digits.
+
+    Rows in the canonical ``"6,7,8,9,7,8"`` form are decoded straight from a
+    fixed-width byte buffer; anything else falls back to a regex pass.
+    """
+    lines = lines.astype(str)
+    try:
+        buffer = np.array(lines.tolist(), dtype="S")
+    except UnicodeEncodeError:
+        buffer = None
+
+    if buffer is not None and buffer.dtype.itemsize >= 11:
+        chars = buffer.view(np.uint8).reshape(len(buffer), -1)
+        digit_chars = chars[:, 0:11:2]
+        valid = (
+            ((digit_chars >= ord("6")) & (digit_chars <= ord("9"))).all(axis=1) &
+            (chars[:, 1:11:2] == ord(",")).all(axis=1)
+        )
+        if chars.shape[1] > 11:
+            valid &= chars[:, 11] == 0
+        digits = np.zeros((len(lines), 6), dtype=np.int8)
+        digits[valid] = digit_chars[valid] - ord("0")
+    else:
+        valid = np.zeros(len(lines), dtype=bool)
+        digits = np.zeros((len(lines), 6), dtype=np.int8)
+
+    fallback = ~valid
+    if fallback.any():
+        stripped = lines[fallback].str.replace(" ", "", regex=False)
+        matched = stripped.str.fullmatch(VALID_LINES_PATTERN).to_numpy(dtype=bool)
+        if matched.any():
+            fallback_rows = np.flatnonzero(fallback)[matched]
+            digits[fallback_rows] = (
+                np.frombuffer(
+                    "".join(stripped[matched]).replace(",", "").encode("ascii"),
+                    dtype=np.uint8,
+                ).reshape(-1, 6) - ord("0")
+            )
+            valid[fallback_rows] = True
+
+    return valid, digits[valid]
+
+
+def compute_journal_analytics(encoded, tables=None):
+    """Computes every dashboard aggregate with bincounts over the encoded arrays."""
+    tables = tables or get_hexagram_tables()
+    month_count = len(encoded.month_labels)
+
+    dated = encoded.month >= 0
+    monthly_counts = np.bincount(
+        encoded.month[dated].astype(np.int64) * HEXAGRAM_COUNT + encoded.primary[dated],
+        minlength=month_count * HEXAGRAM_COUNT,
+    ).reshape(month_count, HEXAGRAM_COUNT)
+
+    moving = encoded.evolving >= 0
+    transition_counts = np.bincount(
+        encoded.primary[moving].astype(np.int64) * HEXAGRAM_COUNT + encoded.evolving[moving],
+        minlength=HEXAGRAM_COUNT * HEXAGRAM_COUNT,
+    ).reshape(HEXAGRAM_COUNT, HEXAGRAM_COUNT)
+
+    primary = encoded.primary.astype(np.int64)
+    trigram_counts = np.bincount(
+        tables.lower_trigram[primary].astype(np.int64) * 8 + tables.upper_trigram[primary],
+        minlength=64,
+    ).reshape(8, 8)
+
+    return JournalAnalytics(
+        reading_count=len(encoded.primary),
+        skipped_rows=encoded.skipped_rows,
+        month_labels=encoded.month_labels,
+        monthly_counts=monthly_counts,
+        transition_counts=transition_counts,
+        line_change_counts=encoded.changing.sum(axis=0),
+        trigram_counts=trigram_counts,
+    )
+
+
+_analytics_lock = threading.Lock()
+_analytics_cache = {}
+
+
+def get_journal_analytics(journal_version, journal_df):
+    """Returns analytics for a journal version, computing them once per version."""
+    with _analytics_lock:
+        analytics = _analytics_cache.get(journal_version)
+    if analytics is not None:
+        return analytics
+
+    analytics = compute_journal_analytics(encode_journal(journal_df))
+    with _analytics_lock:
+        _analytics_cache.clear()
+        _analytics_cache[journal_version] = analytics
+    return analytics
+
+
+def hexagram_labels(iching_data):
+    """Returns "number: name" labels ordered by zero-based hexagram index."""
+    labels = []
+    for number in range(1, HEXAGRAM_COUNT + 1):
+        hexagram = iching_data.get(str(number))
+        labels.append(f"{number}: {hexagram['name_en']}" if hexagram else str(number))
+    return labels
+
+
+def render_journal_analytics(analytics, iching_data):
+    """Renders the journal analytics dashboard."""
+    if analytics.reading_count == 0:
+        st.info("Save readings with valid lines to see journal analytics.")
+        return
+
+    labels = hexagram_labels(iching_data)
+    st.caption(f"Across {analytics.reading_count} saved readings.")
+    if analytics.skipped_rows:
+        st.caption(f"{analytics.skipped_rows} entries with invalid lines were left out.")
+
+    st.subheader("Hexagram frequency over time")
+    if analytics.month_labels:
+        top_indexes = np.argsort(-analytics.monthly_counts.sum(axis=0), kind="stable")
+        top_indexes = [
+            index for index in top_indexes[:FREQUENCY_CHART_HEXAGRAMS]
+            if analytics.monthly_counts[:, index].any()
+        ]
+        st.line_chart(
+            pd.DataFrame(
+                analytics.monthly_counts[:, top_indexes],
+                index=list(analytics.month_labels),
+                columns=[labels[index] for index in top_indexes],
+            )
+        )
+    else:
+        st.caption("No dated readings yet.")
+
+    st.subheader("Primary to evolving transitions")
+    primary_indexes, evolving_indexes = np.nonzero(analytics.transition_counts)
+    if len(primary_indexes):
+        render_transition_heatmap(
+            pd.DataFrame(
+                {
+                    "Primary": primary_indexes + 1,
+                    "Evolving": evolving_indexes + 1,
+                    "Readings": analytics.transition_counts[primary_indexes, evolving_indexes],
+                    "Transition": [
+                        f"{labels[primary]} -> {labels[evolving]}"
+                        for primary, evolving in zip(primary_indexes, evolving_indexes)
+                    ],
+                }
+            )
+        )
+    else:
+        st.caption("No readings with changing lines yet.")
+
+    st.subheader("Most frequently changing lines")
+    st.bar_chart(
+        pd.DataFrame(
+            {"Changes": analytics.line_change_counts},
+            index=[f"Line {number}" for number in range(1, 7)],
+        )
+    )
+
+    st.subheader("Trigram composition")
+    trigram_labels = [TRIGRAM_NAMES[code] for code in range(8)]
+    trigram_df = pd.DataFrame(
+        analytics.trigram_counts,
+        index=pd.Index(trigram_labels, name="Lower trigram"),
+        columns=pd.Index(trigram_labels, name="Upper trigram"),
+    )
+    st.bar_chart(
+        pd.DataFrame(
+            {
+                "Lower": analytics.trigram_counts.sum(axis=1),
+                "Upper": analytics.trigram_counts.sum(axis=0),
+            },
+            index=trigram_labels,
+        )
+    )
+    st.dataframe(trigram_df, use_container_width=True)
+
+
+def render_transition_heatmap(transitions_df):
+    """Draws the 64x64 primary-to-evolving heatmap from its non-empty cells."""
+    import altair as alt
+
+    axis_scale = alt.Scale(domain=list(range(1, HEXAGRAM_COUNT + 1)))
+    chart = (
+        alt.Chart(transitions_df)
+        .mark_rect()
+        .encode(
+            x=alt.X("Evolving:O", scale=axis_scale, axis=alt.Axis(labelAngle=0, labelFontSize=7)),
+            y=alt.Y("Primary:O", scale=axis_scale, axis=alt.Axis(labelFontSize=7)),
+            color=alt.Color("Readings:Q", scale=alt.Scale(scheme="goldorange")),
+            tooltip=["Transition", "Readings"],
+        )
+        .properties(height=520)
+    )
+    st.altair_chart(chart, use_container_width=True)
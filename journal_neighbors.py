@@ -0,0 +1,134 @@
+"""Hamming-distance and shared-trigram queries over integer-encoded readings.
+
+A reading code packs the primary hexagram code into the high six bits and the
+evolving hexagram code into the low six bits; a reading without changing lines
+evolves into itself. The number of set bits in ``code_a ^ code_b`` is then how
+many primary and evolving lines differ between two readings, so a query is one
+XOR over a column of codes plus a popcount read from a lookup table.
+"""
+
+import threading
+
+import numpy as np
+
+from hexagram_tables import encode_line_values
+from journal_analytics import parse_line_column
+
+
+READING_CODE_BITS = 12
+MAX_READING_DISTANCE = READING_CODE_BITS
+DEFAULT_READING_DISTANCE = 2
+# Rows whose lines cannot be parsed get a code with bit 12 set. XOR keeps that bit,
+# so the distance table maps every such row past any reachable distance.
+INVALID_READING_CODE = 1 << READING_CODE_BITS
+UNREACHABLE_DISTANCE = 255
+
+TRIGRAM_MATCH_ANY = "Any"
+TRIGRAM_MATCH_UPPER = "Same upper trigram"
+TRIGRAM_MATCH_LOWER = "Same lower trigram"
+TRIGRAM_MATCH_EITHER = "Same upper or lower trigram"
+TRIGRAM_MATCH_OPTIONS = (
+    TRIGRAM_MATCH_ANY,
+    TRIGRAM_MATCH_UPPER,
+    TRIGRAM_MATCH_LOWER,
+    TRIGRAM_MATCH_EITHER,
+)
+
+_DISTANCE_TABLE = np.array(
+    [bin(value).count("1") for value in range(INVALID_READING_CODE)] +
+    [UNREACHABLE_DISTANCE] * INVALID_READING_CODE,
+    dtype=np.uint8,
+)
+
+
+def reading_code(lines):
+    """Returns the 12-bit code of one reading's six line values."""
+    primary_codes, evolving_codes, _ = encode_line_values(np.asarray([lines]))
+    return int(primary_codes[0]) << 6 | int(evolving_codes[0])
+
+
+def encode_reading_codes(lines):
+    """Encodes a column of saved line strings into a uint16 array of reading codes.
+
+    The result is aligned with the column; rows without six valid line values
+    get INVALID_READING_CODE and never match a query.
+    """
+    valid, digits = parse_line_column(lines)
+    primary_codes, evolving_codes, _ = encode_line_values(digits)
+    codes = np.full(len(valid), INVALID_READING_CODE, dtype=np.uint16)
+    codes[valid] = primary_codes << 6 | evolving_codes
+    return codes
+
+
+def reading_distances(codes, query_code):
+    """Returns how many primary and evolving lines differ from the query, per row."""
+    return _DISTANCE_TABLE[np.bitwise_xor(codes, np.uint16(query_code))]
+
+
+def trigram_mask(codes, query_code, trigram_match=TRIGRAM_MATCH_ANY):
+    """Returns rows whose primary hexagram shares the requested trigram with the query."""
+    codes = np.asarray(codes)
+    valid = codes < INVALID_READING_CODE
+    if trigram_match == TRIGRAM_MATCH_ANY:
+        return valid
+
+    # The primary code sits in bits 6-11: its lower trigram in 9-11, upper in 6-8.
+    same_lower = (codes >> 9) == (query_code >> 9)
+    same_upper = ((codes >> 6) & 7) == ((query_code >> 6) & 7)
+    if trigram_match == TRIGRAM_MATCH_UPPER:
+        return valid & same_upper
+    if trigram_match == TRIGRAM_MATCH_LOWER:
+        return valid & same_lower
+    if trigram_match == TRIGRAM_MATCH_EITHER:
+        return valid & (same_upper | same_lower)
+    raise ValueError(f"Unknown trigram match: {trigram_match}")
+
+
+def neighbor_mask(codes, query_code, max_distance=MAX_READING_DISTANCE, trigram_match=TRIGRAM_MATCH_ANY):
+    """Returns rows within ``max_distance`` lines of the query that pass the trigram match."""
+    mask = reading_distances(codes, query_code) <= max_distance
+    if trigram_match != TRIGRAM_MATCH_ANY:
+        mask &= trigram_mask(codes, query_code, trigram_match)
+    return mask
+
+
+def find_journal_neighbors(
+    journal_df,
+    lines,
+    max_distance=DEFAULT_READING_DISTANCE,
+    trigram_match=TRIGRAM_MATCH_ANY,
+    codes=None,
+):
+    """Returns journal rows near a reading with a "Line Distance" column, nearest first.
+
+    Rows at the same distance keep their journal order. Pass ``codes`` from
+    get_journal_reading_codes to skip re-encoding the Lines column.
+    """
+    if codes is None:
+        codes = encode_reading_codes(journal_df["Lines"])
+    query_code = reading_code(lines)
+    distances = reading_distances(codes, query_code)
+
+    rows = np.flatnonzero(neighbor_mask(codes, query_code, max_distance, trigram_match))
+    rows = rows[np.argsort(distances[rows], kind="stable")]
+    neighbors_df = journal_df.iloc[rows].copy()
+    neighbors_df["Line Distance"] = distances[rows].astype(int)
+    return neighbors_df
+
+
+_codes_lock = threading.Lock()
+_codes_cache = {}
+
+
+def get_journal_reading_codes(journal_version, journal_df):
+    """Returns reading codes for a journal version, encoding the Lines column once per version."""
+    with _codes_lock:
+        codes = _codes_cache.get(journal_version)
+    if codes is not None and len(codes) == len(journal_df):
+        return codes
+
+    codes = encode_reading_codes(journal_df["Lines"])
+    with _codes_lock:
+        _codes_cache.clear()
+        _codes_cache[journal_version] = codes
+    return codes
@@ -0,0 +1,281 @@
+"""Local TF-IDF index for finding journal entries related to a new reading.
+
+Each entry is indexed on its question and AI interpretation. Postings store
+length-normalized log term frequencies, which do not depend on the rest of the
+journal, so saves and edits update the index in place; inverse document
+frequencies are applied on the query side from live document counts. A query
+is a sparse dot product over the postings of its terms, plus a boost for
+entries that share the reading's primary or evolving hexagram.
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from file_handler import add_journal_listener, normalize_bool
+
+
+DEFAULT_SIMILAR_READINGS = 3
+PRIMARY_HEXAGRAM_BOOST = 0.15
+EVOLVING_HEXAGRAM_BOOST = 0.1
+MIN_SIMILARITY_SCORE = 0.05
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+STOP_WORDS = frozenset(
+    """
+    a about after again all am an and any are as at be because been before being but by can could
+    did do does doing for from had has have having he her here hers him his how i if in into is it
+    its me more most my no nor not of off on once only or other our ours out over own same she should
+    so some such than that the their theirs them then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with would you
+    your yours
+    """.split()
+)
+
+
+@dataclass(frozen=True)
+class SimilarReading:
+    """One related journal entry and its similarity score."""
+
+    entry_id: str
+    score: float
+    date: str
+    question: str
+    primary_number: int
+    evolving_number: int
+
+
+def tokenize(text):
+    """Returns lowercase word tokens without stop words."""
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return []
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOP_WORDS]
+
+
+def term_weights(tokens):
+    """Returns L2-normalized ``1 + log(tf)`` weights for a token list."""
+    counts = Counter(tokens)
+    weights = {term: 1.0 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+    return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+
+class _Postings:
+    """Growable (document, weight) arrays for one term."""
+
+    __slots__ = ("documents", "weights", "size")
+
+    def __init__(self):
+        self.documents = np.empty(4, dtype=np.int32)
+        self.weights = np.empty(4, dtype=np.float32)
+        self.size = 0
+
+    def append(self, document, weight):
+        if self.size == len(self.documents):
+            self.documents = np.resize(self.documents, self.size * 2)
+            self.weights = np.resize(self.weights, self.size * 2)
+        self.documents[self.size] = document
+        self.weights[self.size] = weight
+        self.size += 1
+
+
+class JournalSimilarityIndex:
+    """Inverted TF-IDF index over journal entries.
+
+    Documents are append-only; an updated entry is re-added under a new
+    document number and its old number is marked inactive, so postings never
+    need to be rewritten.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._document_frequency = Counter()
+        self._document_terms = []
+        self._entry_ids = []
+        self._summaries = []
+        self._primary = np.zeros(16, dtype=np.int8)
+        self._evolving = np.zeros(16, dtype=np.int8)
+        self._active = np.zeros(16, dtype=bool)
+        self._document_for_entry = {}
+        self.active_count = 0
+
+    @classmethod
+    def from_journal(cls, journal_df):
+        index = cls()
+        if journal_df.empty:
+            return index
+
+        columns = [
+            "Entry ID",
+            "Date",
+            "Question",
+            "AI Interpretation",
+            "Primary Hexagram Number",
+            "Evolving Hexagram Number",
+            "Archived",
+        ]
+        for record in journal_df[columns].to_dict("records"):
+            index.add_record(record)
+        return index
+
+    def add_record(self, record):
+        """Indexes one CSV journal record, replacing any earlier version of the same entry."""
+        entry_id = str(record.get("Entry ID"))
+        self.remove_entry(entry_id)
+        if normalize_bool(record.get("Archived")):
+            return
+
+        weights = term_weights(tokenize(record.get("Question")) + tokenize(record.get("AI Interpretation")))
+        document = len(self._entry_ids)
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.append(document, weight)
+        self._document_frequency.update(weights.keys())
+
+        if document == len(self._active):
+            self._primary = np.resize(self._primary, document * 2)
+            self._evolving = np.resize(self._evolving, document * 2)
+            self._active = np.resize(self._active, document * 2)
+        self._primary[document] = _hexagram_number(record.get("Primary Hexagram Number"))
+        self._evolving[document] = _hexagram_number(record.get("Evolving Hexagram Number"))
+        self._active[document] = True
+        self._document_terms.append(tuple(weights))
+        self._entry_ids.append(entry_id)
+        self._summaries.append((str(record.get("Date", "")), str(record.get("Question", ""))))
+        self._document_for_entry[entry_id] = document
+        self.active_count += 1
+
+    def remove_entry(self, entry_id):
+        document = self._document_for_entry.pop(entry_id, None)
+        if document is None:
+            return
+
+        self._active[document] = False
+        self._document_frequency.subtract(self._document_terms[document])
+        self.active_count -= 1
+
+    def search(
+        self,
+        question,
+        primary_number=None,
+        evolving_number=None,
+        ai_text=None,
+        k=DEFAULT_SIMILAR_READINGS,
+        exclude_entry_ids=(),
+    ):
+        """Returns up to ``k`` SimilarReadings, best first."""
+        document_count = len(self._entry_ids)
+        if not document_count or not self.active_count:
+            return []
+
+        query = term_weights(tokenize(question) + tokenize(ai_text))
+        scores = np.zeros(document_count, dtype=np.float64)
+        query_weights = {}
+        for term, weight in query.items():
+            if term in self._postings and self._document_frequency[term] > 0:
+                idf = math.log((1 + self.active_count) / (1 + self._document_frequency[term])) + 1
+                query_weights[term] = weight * idf * idf
+
+        norm = math.sqrt(sum(weight * weight for weight in query_weights.values()))
+        for term, weight in query_weights.items():
+            postings = self._postings[term]
+            scores += np.bincount(
+                postings.documents[:postings.size],
+                weights=postings.weights[:postings.size] * (weight / norm),
+                minlength=document_count,
+            )
+
+        if primary_number is not None:
+            scores += PRIMARY_HEXAGRAM_BOOST * (self._primary[:document_count] == primary_number)
+        if evolving_number is not None:
+            scores += EVOLVING_HEXAGRAM_BOOST * (self._evolving[:document_count] == evolving_number)
+
+        scores[~self._active[:document_count]] = 0
+        for entry_id in exclude_entry_ids:
+            document = self._document_for_entry.get(entry_id)
+            if document is not None:
+                scores[document] = 0
+
+        candidates = np.flatnonzero(scores >= MIN_SIMILARITY_SCORE)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            SimilarReading(
+                entry_id=self._entry_ids[document],
+                score=float(scores[document]),
+                date=self._summaries[document][0],
+                question=self._summaries[document][1],
+                primary_number=int(self._primary[document]),
+                evolving_number=int(self._evolving[document]),
+            )
+            for document in candidates
+        ]
+
+
+class JournalSimilarityStore:
+    """Thread-safe holder of the similarity index for the current journal version."""
+
+    def __init__(self):
+        self._version = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def search(self, journal_version, load_journal_df, reading, k=DEFAULT_SIMILAR_READINGS):
+        """Searches the index for a reading, building it with ``load_journal_df()`` only on a miss."""
+        with self._lock:
+            if self._index is None or self._version != journal_version:
+                self._index = JournalSimilarityIndex.from_journal(load_journal_df())
+                self._version = journal_version
+
+            secondary_hex = reading.get("secondary_hex")
+            exclude = (reading["entry_id"],) if reading.get("entry_id") else ()
+            return self._index.search(
+                reading.get("question"),
+                primary_number=int(reading["primary_hex"]["number"]),
+                evolving_number=int(secondary_hex["number"]) if secondary_hex else None,
+                ai_text=reading.get("ai_interpretation"),
+                k=k,
+                exclude_entry_ids=exclude,
+            )
+
+    def apply_change(self, change):
+        """Patches the index with a JournalChange, or drops it if it belongs to another version."""
+        with self._lock:
+            if self._index is None or self._version != change.previous_version:
+                self._version = None
+                self._index = None
+                return
+
+            for record in change.added_records:
+                self._index.add_record(record)
+            for _, after_record in change.updated_records:
+                self._index.add_record(after_record)
+            self._version = change.version
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._index = None
+
+
+def _hexagram_number(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+JOURNAL_SIMILARITY = JournalSimilarityStore()
+add_journal_listener(JOURNAL_SIMILARITY.apply_change)
+
+
+def find_similar_readings(reading, journal_version, load_journal_df, k=DEFAULT_SIMILAR_READINGS):
+    """Returns the journal entries most similar to a reading, best first."""
+    return JOURNAL_SIMILARITY.search(journal_version, load_journal_df, reading, k=k)
@@ -1,10 +1,127 @@
 import html
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from constants import HEXAGRAM_THEME_SUMMARIES
-from file_handler import journal_to_markdown
+from constants import (
+    DEFAULT_JOURNAL_PAGE_SIZE,
+    HEXAGRAM_THEME_SUMMARIES,
+    JOURNAL_FILTER_CACHE_MAX_ENTRIES,
+    JOURNAL_FILTER_CACHE_MAX_IDS,
+    JOURNAL_PAGE_SIZE_OPTIONS,
+)
+from file_handler import JOURNAL_EXPORTERS, JournalExportError, export_journal
+from hexagram_tables import TRIGRAM_NAMES, get_hexagram_tables, lookup_by_number
+from journal_aggregates import count_hexagram_numbers, get_journal_aggregates, top_hexagram_counts
+from journal_neighbors import (
+    DEFAULT_READING_DISTANCE,
+    MAX_READING_DISTANCE,
+    TRIGRAM_MATCH_ANY,
+    TRIGRAM_MATCH_OPTIONS,
+    encode_reading_codes,
+    get_journal_reading_codes,
+    neighbor_mask,
+    reading_code,
+    reading_distances,
+)
+from page_assets import inject_once
+
+
+NEIGHBOR_SOURCE_OFF = "Off"
+NEIGHBOR_SOURCE_CURRENT = "Current reading"
+NEIGHBOR_SOURCE_ENTRY = "Selected journal entry"
+SORT_CLOSEST_FIRST = "Closest lines first"
+RELATION_TABLES = {
+    "Nuclear of the primary": "nuclear",
+    "Inverse of the primary": "inverse",
+    "Complement of the primary": "complementary",
+}
+TRIGRAM_IDS = {name: trigram for trigram, name in TRIGRAM_NAMES.items()}
+SIDEBAR_STAT_STYLES = (
+    '<style>'
+    '.hexagram-stat-row{margin:0.65rem 0;}'
+    '.hexagram-stat-label{align-items:baseline;display:flex;font-size:0.86rem;'
+    'gap:0.5rem;justify-content:space-between;line-height:1.2;}'
+    '.hexagram-stat-label span{overflow-wrap:anywhere;}'
+    '.hexagram-stat-label strong{color:#6c757d;flex:0 0 auto;font-size:0.8rem;}'
+    '.hexagram-stat-track{background:rgba(108,117,125,0.18);border-radius:999px;'
+    'height:0.45rem;margin-top:0.25rem;overflow:hidden;}'
+    '.hexagram-stat-fill{background:#ffc107;border-radius:999px;height:100%;}'
+    '.theme-summary-text{color:#000;font-size:0.9rem;line-height:1.35;margin:0.25rem 0 0;}'
+    '</style>'
+)
+
+
+class JournalFilterCache:
+    """Thread-safe LRU of filtered Entry ID lists shared across sessions.
+
+    Entries are evicted least recently used first whenever either the number of
+    cached filter combinations or the total number of cached IDs exceeds its bound.
+    """
+
+    def __init__(
+        self,
+        max_entries=JOURNAL_FILTER_CACHE_MAX_ENTRIES,
+        max_total_ids=JOURNAL_FILTER_CACHE_MAX_IDS,
+    ):
+        self.max_entries = max_entries
+        self.max_total_ids = max_total_ids
+        self._entries = OrderedDict()
+        self._total_ids = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def total_ids(self):
+        with self._lock:
+            return self._total_ids
+
+    def get(self, key):
+        """Returns the cached Entry IDs for a key, or None on a miss."""
+        with self._lock:
+            entry_ids = self._entries.get(key)
+            if entry_ids is not None:
+                self._entries.move_to_end(key)
+            return entry_ids
+
+    def put(self, key, entry_ids):
+        """Stores Entry IDs for a key, evicting older results to stay within bounds."""
+        entry_ids = tuple(entry_ids)
+        if len(entry_ids) > self.max_total_ids:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_ids -= len(previous)
+
+            self._entries[key] = entry_ids
+            self._total_ids += len(entry_ids)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or
+                self._total_ids > self.max_total_ids
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_ids -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_ids = 0
+
+
+JOURNAL_FILTER_CACHE = JournalFilterCache()
+JOURNAL_EXPORT_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="journal-export")
 
 
 def render_empty_journal_sidebar():
@@ -14,7 +131,7 @@ def render_empty_journal_sidebar():
         st.info("Save a reading to unlock search, filters, patterns, and exports.")
 
 
-def render_journal_sidebar(journal_df, iching_data):
+def render_journal_sidebar(journal_df, iching_data, journal_version=None):
     """Renders sidebar filters and exports, returning the filtered journal."""
     filtered_df = journal_df.copy()
     valid_dates = filtered_df["Date Parsed"].dropna()
@@ -36,9 +153,17 @@ def render_journal_sidebar(journal_df, iching_data):
             st.session_state.journal_evolving = "All"
             st.session_state.journal_ai_only = False
             st.session_state.journal_changing_only = False
+            st.session_state.journal_nuclear = "All"
+            st.session_state.journal_lower_trigram = "All"
+            st.session_state.journal_upper_trigram = "All"
+            st.session_state.journal_relation = "All"
             st.session_state.journal_favorites_only = False
             st.session_state.journal_show_archived = False
+            st.session_state.journal_neighbor_source = NEIGHBOR_SOURCE_OFF
+            st.session_state.journal_neighbor_distance = DEFAULT_READING_DISTANCE
+            st.session_state.journal_trigram_match = TRIGRAM_MATCH_ANY
             st.session_state.journal_sort = "Newest first"
+            st.session_state.journal_page = 1
             if default_date_range:
                 st.session_state.journal_date_range = default_date_range
             st.rerun()
@@ -79,27 +204,129 @@ def render_journal_sidebar(journal_df, iching_data):
         show_archived = st.checkbox("Show archived readings", key="journal_show_archived")
         ai_only = st.checkbox("With AI contemplation only", key="journal_ai_only")
         changing_only = st.checkbox("With changing lines only", key="journal_changing_only")
-        sort_order = st.selectbox("Sort", ["Newest first", "Oldest first"], key="journal_sort")
+        nuclear_options, trigram_options = get_relationship_filter_options()
+        with st.expander("Hexagram relationships"):
+            nuclear_filter = st.selectbox("Nuclear hexagram", nuclear_options, key="journal_nuclear")
+            lower_trigram_filter = st.selectbox("Lower trigram", trigram_options, key="journal_lower_trigram")
+            upper_trigram_filter = st.selectbox("Upper trigram", trigram_options, key="journal_upper_trigram")
+            relation_filter = st.selectbox(
+                "Evolving hexagram is the",
+                ["All", *RELATION_TABLES],
+                key="journal_relation",
+            )
+        neighbor_code, max_line_distance, trigram_match = render_neighbor_filters()
 
-    filtered_df = apply_journal_filters(
+        sort_options = ["Newest first", "Oldest first"]
+        if neighbor_code is not None:
+            sort_options.append(SORT_CLOSEST_FIRST)
+        if st.session_state.get("journal_sort") not in sort_options:
+            st.session_state.journal_sort = "Newest first"
+        sort_order = st.selectbox("Sort", sort_options, key="journal_sort")
+        if "journal_page_size" not in st.session_state:
+            st.session_state.journal_page_size = DEFAULT_JOURNAL_PAGE_SIZE
+        st.selectbox("Readings per page", JOURNAL_PAGE_SIZE_OPTIONS, key="journal_page_size")
+
+    filters = {
+        "search_query": search_query,
+        "date_range": date_range,
+        "primary_filter": primary_filter,
+        "evolving_filter": evolving_filter,
+        "favorites_only": favorites_only,
+        "show_archived": show_archived,
+        "ai_only": ai_only,
+        "changing_only": changing_only,
+        "nuclear_filter": nuclear_filter,
+        "lower_trigram_filter": lower_trigram_filter,
+        "upper_trigram_filter": upper_trigram_filter,
+        "relation_filter": relation_filter,
+        "neighbor_code": neighbor_code,
+        "max_line_distance": max_line_distance,
+        "trigram_match": trigram_match,
+        "sort_order": sort_order,
+    }
+    if journal_version is None:
+        filtered_df = apply_journal_filters(filtered_df, **filters)
+    else:
+        reading_codes = (
+            get_journal_reading_codes(journal_version, journal_df)
+            if neighbor_code is not None
+            else None
+        )
+        entry_ids = get_filtered_entry_ids(filtered_df, journal_version, filters, reading_codes=reading_codes)
+        filtered_df = select_journal_entries(filtered_df, entry_ids)
+
+    aggregates = (
+        get_journal_aggregates(journal_version, journal_df)
+        if journal_version is not None
+        else None
+    )
+    render_journal_sidebar_summary(
+        journal_df,
         filtered_df,
-        search_query=search_query,
-        date_range=date_range,
-        primary_filter=primary_filter,
-        evolving_filter=evolving_filter,
-        favorites_only=favorites_only,
-        show_archived=show_archived,
-        ai_only=ai_only,
-        changing_only=changing_only,
-        sort_order=sort_order,
+        stats_container,
+        iching_data,
+        aggregates=aggregates,
+        filters_active=journal_filters_active(filters, default_date_range),
+    )
+    render_journal_sidebar_exports(
+        filtered_df,
+        iching_data=iching_data,
+        export_key=make_filter_cache_key(journal_version, filters),
     )
-
-    render_journal_sidebar_summary(journal_df, filtered_df, stats_container, iching_data)
-    render_journal_sidebar_exports(filtered_df)
 
     return filtered_df
 
 
+def render_neighbor_filters():
+    """Renders the "readings like this one" controls, returning the query code, distance, and trigram match."""
+    queries = {}
+    reading = st.session_state.get("reading")
+    if st.session_state.get("reading_cast") and reading:
+        queries[NEIGHBOR_SOURCE_CURRENT] = reading["lines"]
+    selected_entry = st.session_state.get("journal_neighbor_entry")
+    if selected_entry:
+        queries[NEIGHBOR_SOURCE_ENTRY] = selected_entry["lines"]
+
+    source_options = [NEIGHBOR_SOURCE_OFF] + list(queries)
+    if st.session_state.get("journal_neighbor_source") not in source_options:
+        st.session_state.journal_neighbor_source = NEIGHBOR_SOURCE_OFF
+    if len(source_options) == 1:
+        return None, MAX_READING_DISTANCE, TRIGRAM_MATCH_ANY
+
+    source = st.selectbox("Readings like", source_options, key="journal_neighbor_source")
+    if source == NEIGHBOR_SOURCE_OFF:
+        return None, MAX_READING_DISTANCE, TRIGRAM_MATCH_ANY
+    if source == NEIGHBOR_SOURCE_ENTRY:
+        st.caption(f"Comparing with the reading from {selected_entry['date']}.")
+
+    if "journal_neighbor_distance" not in st.session_state:
+        st.session_state.journal_neighbor_distance = DEFAULT_READING_DISTANCE
+    max_line_distance = st.slider(
+        "Differing lines (primary + evolving)",
+        min_value=0,
+        max_value=MAX_READING_DISTANCE,
+        key="journal_neighbor_distance",
+    )
+    trigram_match = st.selectbox("Shared trigram", TRIGRAM_MATCH_OPTIONS, key="journal_trigram_match")
+    return reading_code(queries[source]), max_line_distance, trigram_match
+
+
+@lru_cache(maxsize=1)
+def get_relationship_filter_options():
+    """Returns the nuclear hexagram and trigram filter options, built once from the tables."""
+    tables = get_hexagram_tables()
+    nuclear_options = ["All"] + [tables.label_for_number(number) for number in np.unique(tables.nuclear)]
+    trigram_options = ["All"] + list(TRIGRAM_NAMES.values())
+    return nuclear_options, trigram_options
+
+
+def select_journal_neighbor_entry(lines, date):
+    """Button callback that makes a journal entry the "readings like" query."""
+    st.session_state.journal_neighbor_entry = {"lines": list(lines), "date": date}
+    st.session_state.journal_neighbor_source = NEIGHBOR_SOURCE_ENTRY
+    st.session_state.journal_page = 1
+
+
 def apply_journal_filters(
     journal_df,
     search_query="",
@@ -110,10 +337,32 @@ def apply_journal_filters(
     show_archived=False,
     ai_only=False,
     changing_only=False,
+    nuclear_filter="All",
+    lower_trigram_filter="All",
+    upper_trigram_filter="All",
+    relation_filter="All",
+    neighbor_code=None,
+    max_line_distance=MAX_READING_DISTANCE,
+    trigram_match=TRIGRAM_MATCH_ANY,
     sort_order="Newest first",
+    reading_codes=None,
 ):
-    """Applies journal filters independently of Streamlit widgets."""
+    """Applies journal filters independently of Streamlit widgets.
+
+    ``neighbor_code`` keeps readings within ``max_line_distance`` differing
+    lines of that reading code. ``reading_codes`` may hold the codes of every
+    journal row, as from get_journal_reading_codes; otherwise they are encoded
+    from the Lines column.
+    """
     filtered_df = journal_df.copy()
+    line_distances = None
+
+    if neighbor_code is not None:
+        if reading_codes is None:
+            reading_codes = encode_reading_codes(filtered_df["Lines"])
+        matches = neighbor_mask(reading_codes, neighbor_code, max_line_distance, trigram_match)
+        line_distances = pd.Series(reading_distances(reading_codes, neighbor_code), index=filtered_df.index)[matches]
+        filtered_df = filtered_df[matches]
 
     if not show_archived:
         filtered_df = filtered_df[~filtered_df["Archived"]]
@@ -154,6 +403,28 @@ def apply_journal_filters(
     if changing_only:
         filtered_df = filtered_df[filtered_df["Has Changing Lines"]]
 
+    tables = get_hexagram_tables()
+    if nuclear_filter != "All":
+        nuclear_number = int(str(nuclear_filter).split(":", 1)[0])
+        filtered_df = filtered_df[primary_lookup(tables.nuclear, filtered_df) == nuclear_number]
+
+    if lower_trigram_filter != "All":
+        filtered_df = filtered_df[primary_lookup(tables.lower_trigram, filtered_df) == TRIGRAM_IDS[lower_trigram_filter]]
+
+    if upper_trigram_filter != "All":
+        filtered_df = filtered_df[primary_lookup(tables.upper_trigram, filtered_df) == TRIGRAM_IDS[upper_trigram_filter]]
+
+    if relation_filter != "All":
+        related_numbers = primary_lookup(getattr(tables, RELATION_TABLES[relation_filter]), filtered_df)
+        filtered_df = filtered_df[related_numbers == filtered_df["Evolving Hexagram Number"].to_numpy(dtype=float)]
+
+    if sort_order == SORT_CLOSEST_FIRST and line_distances is not None:
+        return (
+            filtered_df.assign(**{"Line Distance": line_distances})
+            .sort_values(["Line Distance", "Date Parsed"], ascending=[True, False], na_position="last")
+            .drop(columns="Line Distance")
+        )
+
     return filtered_df.sort_values(
         "Date Parsed",
         ascending=(sort_order == "Oldest first"),
@@ -161,18 +432,147 @@ def apply_journal_filters(
     )
 
 
-def render_journal_sidebar_summary(journal_df, filtered_df, container, iching_data):
+def primary_lookup(table, journal_df):
+    """Reads a hexagram table for each row's primary hexagram, or -1 where it is missing."""
+    return lookup_by_number(table, journal_df["Primary Hexagram Number"])
+
+
+def journal_filters_active(filters, default_date_range=None):
+    """Returns whether any filter narrows the default (non-archived) journal view."""
+    date_range = filters.get("date_range")
+    date_range_active = bool(date_range) and tuple(date_range) != tuple(default_date_range or ())
+
+    return (
+        bool(filters.get("search_query")) or
+        date_range_active or
+        filters.get("primary_filter", "All") != "All" or
+        filters.get("evolving_filter", "All") != "All" or
+        bool(filters.get("favorites_only")) or
+        bool(filters.get("show_archived")) or
+        bool(filters.get("ai_only")) or
+        bool(filters.get("changing_only")) or
+        filters.get("nuclear_filter", "All") != "All" or
+        filters.get("lower_trigram_filter", "All") != "All" or
+        filters.get("upper_trigram_filter", "All") != "All" or
+        filters.get("relation_filter", "All") != "All" or
+        filters.get("neighbor_code") is not None
+    )
+
+
+def make_filter_cache_key(journal_version, filters):
+    """Builds a hashable cache key from a journal version and filter values."""
+    date_range = filters.get("date_range")
+    if date_range is not None:
+        date_range = tuple(date_range)
+
+    return (
+        journal_version,
+        str(filters.get("search_query") or ""),
+        date_range,
+        filters.get("primary_filter", "All"),
+        filters.get("evolving_filter", "All"),
+        bool(filters.get("favorites_only", False)),
+        bool(filters.get("show_archived", False)),
+        bool(filters.get("ai_only", False)),
+        bool(filters.get("changing_only", False)),
+        filters.get("nuclear_filter", "All"),
+        filters.get("lower_trigram_filter", "All"),
+        filters.get("upper_trigram_filter", "All"),
+        filters.get("relation_filter", "All"),
+        filters.get("neighbor_code"),
+        int(filters.get("max_line_distance", MAX_READING_DISTANCE)),
+        filters.get("trigram_match", TRIGRAM_MATCH_ANY),
+        filters.get("sort_order", "Newest first"),
+    )
+
+
+def get_filtered_entry_ids(journal_df, journal_version, filters, cache=None, reading_codes=None):
+    """Returns filtered Entry IDs in display order, reusing cached results per journal version."""
+    cache = JOURNAL_FILTER_CACHE if cache is None else cache
+    cache_key = make_filter_cache_key(journal_version, filters)
+
+    entry_ids = cache.get(cache_key)
+    if entry_ids is None:
+        filtered_df = apply_journal_filters(journal_df, reading_codes=reading_codes, **filters)
+        entry_ids = tuple(filtered_df["Entry ID"].astype(str))
+        cache.put(cache_key, entry_ids)
+
+    return entry_ids
+
+
+def select_journal_entries(journal_df, entry_ids):
+    """Returns journal rows for the given Entry IDs, preserving their order."""
+    entry_index = pd.Index(journal_df["Entry ID"].astype(str))
+    if entry_index.is_unique:
+        positions = entry_index.get_indexer(list(entry_ids))
+        return journal_df.iloc[positions[positions >= 0]]
+
+    order = {entry_id: position for position, entry_id in enumerate(entry_ids)}
+    selected_df = journal_df[entry_index.isin(order)]
+    return selected_df.iloc[
+        selected_df["Entry ID"].astype(str).map(order).argsort(kind="stable")
+    ]
+
+
+def paginate_journal(filtered_df, page, page_size):
+    """Returns the rows for one page plus the clamped page number and page count."""
+    page_size = max(int(page_size), 1)
+    page_count = max((len(filtered_df) + page_size - 1) // page_size, 1)
+    page = min(max(int(page), 1), page_count)
+    start = (page - 1) * page_size
+
+    return filtered_df.iloc[start:start + page_size], page, page_count
+
+
+def render_journal_pagination(filtered_df):
+    """Renders page controls for the journal list and returns the visible rows."""
+    page_size = st.session_state.get("journal_page_size", DEFAULT_JOURNAL_PAGE_SIZE)
+    page_df, page, page_count = paginate_journal(
+        filtered_df,
+        st.session_state.get("journal_page", 1),
+        page_size,
+    )
+    st.session_state.journal_page = page
+
+    if page_count > 1:
+        page_column, _ = st.columns([1, 2])
+        with page_column:
+            st.number_input("Page", min_value=1, max_value=page_count, step=1, key="journal_page")
+
+    start = (page - 1) * int(page_size)
+    st.caption(
+        f"Showing {start + 1}-{start + len(page_df)} of {len(filtered_df)} readings "
+        f"(page {page} of {page_count})"
+    )
+
+    return page_df
+
+
+def render_journal_sidebar_summary(
+    journal_df,
+    filtered_df,
+    container,
+    iching_data,
+    aggregates=None,
+    filters_active=True,
+):
     """Shows compact journal patterns in the sidebar."""
     with container:
         st.subheader("Stats")
-        st.metric("Total readings", len(journal_df))
+        st.metric("Total readings", aggregates.total if aggregates else len(journal_df))
 
         if not filtered_df.empty:
-            hexagram_counts = filtered_df["Primary Hexagram"].value_counts().head(3)
+            primary_counts = get_summary_primary_counts(filtered_df, aggregates, filters_active)
+            hexagram_counts = top_hexagram_counts(primary_counts, iching_data, limit=3)
             if not hexagram_counts.empty:
+                inject_once("sidebar-stat-styles", SIDEBAR_STAT_STYLES)
                 st.caption("Most common:")
                 st.markdown(build_top_hexagram_bars(hexagram_counts), unsafe_allow_html=True)
-                theme_title, theme_text = get_recurring_theme(filtered_df, iching_data)
+                theme_title, theme_text = get_recurring_theme(
+                    filtered_df,
+                    iching_data,
+                    primary_counts=primary_counts,
+                )
                 if theme_title and theme_text:
                     st.caption(f"Recurring theme: {theme_title}")
                     st.markdown(
@@ -185,13 +585,23 @@ def render_journal_sidebar_summary(journal_df, filtered_df, container, iching_da
                 st.caption(f"Most recent: {latest_date.strftime('%Y-%m-%d')}")
 
 
-def get_recurring_theme(filtered_df, iching_data):
+def get_summary_primary_counts(filtered_df, aggregates, filters_active):
+    """Returns primary hexagram counts, read from aggregates when no filter narrows the view."""
+    month_total = sum(aggregates.month_counts.values()) if aggregates else 0
+    if aggregates and not filters_active and month_total == aggregates.total:
+        return aggregates.visible_primary_counts()
+
+    return count_hexagram_numbers(filtered_df["Primary Hexagram Number"])
+
+
+def get_recurring_theme(filtered_df, iching_data, primary_counts=None):
     """Returns a deterministic theme summary for the most common primary hexagram."""
-    primary_numbers = filtered_df["Primary Hexagram Number"].dropna()
-    if primary_numbers.empty:
+    if primary_counts is None:
+        primary_counts = count_hexagram_numbers(filtered_df["Primary Hexagram Number"])
+    if not primary_counts.any():
         return None, None
 
-    hexagram_number = int(primary_numbers.value_counts().index[0])
+    hexagram_number = int(primary_counts.argmax()) + 1
     hexagram = iching_data.get(str(hexagram_number))
     if not hexagram:
         return None, None
@@ -225,42 +635,109 @@ def build_top_hexagram_bars(hexagram_counts):
             f'</div>'
         )
 
-    return (
-        '<style>'
-        '.hexagram-stat-row{margin:0.65rem 0;}'
-        '.hexagram-stat-label{align-items:baseline;display:flex;font-size:0.86rem;'
-        'gap:0.5rem;justify-content:space-between;line-height:1.2;}'
-        '.hexagram-stat-label span{overflow-wrap:anywhere;}'
-        '.hexagram-stat-label strong{color:#6c757d;flex:0 0 auto;font-size:0.8rem;}'
-        '.hexagram-stat-track{background:rgba(108,117,125,0.18);border-radius:999px;'
-        'height:0.45rem;margin-top:0.25rem;overflow:hidden;}'
-        '.hexagram-stat-fill{background:#ffc107;border-radius:999px;height:100%;}'
-        '.theme-summary-text{color:#000;font-size:0.9rem;line-height:1.35;margin:0.25rem 0 0;}'
-        '</style>'
-        f'<div>{"".join(rows)}</div>'
-    )
+    return f'<div>{"".join(rows)}</div>'
 
 
-def render_journal_sidebar_exports(filtered_df):
-    """Adds filtered journal export actions to the sidebar."""
-    export_df = filtered_df.drop(columns=["Date Parsed"], errors="ignore")
+def render_journal_sidebar_exports(filtered_df, iching_data=None, export_key=None):
+    """Adds on-demand filtered journal exports to the sidebar.
 
+    Exports run on a background worker when requested, so preparing a large
+    file never blocks a rerun. The prepared export is held in memory and
+    offered for download until the filters, journal, or format change.
+    """
     with st.sidebar:
         st.divider()
         st.subheader("Export")
-        st.download_button(
-            "Download filtered CSV",
-            data=export_df.to_csv(index=False).encode("utf-8"),
-            file_name="i_ching_journal_filtered.csv",
-            mime="text/csv",
+        export_format = st.selectbox(
+            "Export format",
+            list(JOURNAL_EXPORTERS),
+            key="journal_export_format",
+        )
+        exporter = JOURNAL_EXPORTERS[export_format]
+        prepared_key = (export_key, export_format)
+
+        if st.button(
+            f"Prepare {export_format} export",
             use_container_width=True,
             disabled=filtered_df.empty,
-        )
+        ):
+            discard_prepared_export()
+            st.session_state.journal_export = {
+                "key": prepared_key,
+                "future": JOURNAL_EXPORT_EXECUTOR.submit(
+                    export_journal,
+                    filtered_df,
+                    export_format,
+                    iching_data=iching_data,
+                ),
+            }
+
+        prepared_export = st.session_state.get("journal_export")
+        if not prepared_export:
+            return
+        if prepared_export["key"] != prepared_key:
+            discard_prepared_export()
+            return
+
+        export_future = prepared_export["future"]
+        if not export_future.done():
+            render_pending_export_status()
+            return
+
+        try:
+            export_data = load_prepared_export(prepared_export)
+        except JournalExportError as e:
+            st.error(str(e))
+            return
+        except Exception:
+            logging.exception(f"Journal {export_format} export failed unexpectedly.")
+            discard_prepared_export()
+            st.error(f"Could not prepare the {export_format} export. Please try again.")
+            return
+
         st.download_button(
-            "Download Markdown",
-            data=journal_to_markdown(filtered_df).encode("utf-8"),
-            file_name="i_ching_journal.md",
-            mime="text/markdown",
+            f"Download {export_format}",
+            data=export_data,
+            file_name=exporter.file_name,
+            mime=exporter.mime,
             use_container_width=True,
-            disabled=filtered_df.empty,
         )
+
+
+@st.fragment(run_every=1)
+def render_pending_export_status():
+    """Polls a running export and reruns the app once its file is ready."""
+    prepared_export = st.session_state.get("journal_export")
+    if prepared_export and prepared_export["future"].done():
+        st.rerun()
+
+    st.caption("Preparing export...")
+
+
+def load_prepared_export(prepared_export):
+    """Reads a finished export into memory and deletes its temporary file.
+
+    The bytes stay in the session until the export is discarded, so reruns
+    keep offering the download without leaving files behind on disk.
+    """
+    if "data" not in prepared_export:
+        export_path = prepared_export["future"].result()
+        try:
+            prepared_export["data"] = export_path.read_bytes()
+        finally:
+            export_path.unlink(missing_ok=True)
+    return prepared_export["data"]
+
+
+def discard_prepared_export():
+    """Cancels or deletes this session's prepared export file, if any."""
+    prepared_export = st.session_state.pop("journal_export", None)
+    if prepared_export:
+        prepared_export["future"].add_done_callback(delete_export_file)
+
+
+def delete_export_file(export_future):
+    if export_future.cancelled() or export_future.exception() is not None:
+        return
+
+    export_future.result().unlink(missing_ok=True)
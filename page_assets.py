@@ -0,0 +1,33 @@
+"""Stylesheets and other shared markup sent once per page render.
+
+Streamlit rebuilds the page on every script run, so shared assets must be sent
+again on each run, but only once per run no matter how many readings or journal
+entries use them. app.main calls start_page_render() first; inject_once() then
+records the names of the assets already sent in this run.
+"""
+
+import streamlit as st
+
+
+PAGE_ASSETS_KEY = "page_assets"
+
+
+def start_page_render():
+    """Begins a page render with no assets sent yet."""
+    st.session_state[PAGE_ASSETS_KEY] = set()
+
+
+def inject_once(name, markup):
+    """Sends HTML markup to the page unless an asset with this name was already sent in this render.
+
+    Outside a render started by start_page_render, the markup is always sent.
+    Returns whether the markup was sent.
+    """
+    sent_assets = st.session_state.get(PAGE_ASSETS_KEY)
+    if sent_assets is not None:
+        if name in sent_assets:
+            return False
+        sent_assets.add(name)
+
+    st.markdown(markup, unsafe_allow_html=True)
+    return True
@@ -0,0 +1,324 @@
+"""Local OpenAI-compatible chat-completions server for offline load and latency tests.
+
+Point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:8001/v1`` (any
+``OPENAI_API_KEY`` value works) and start it with ``make stub-server`` or::
+
+    python stub_openai_server.py --latency-ms 400 --latency-distribution lognormal \\
+        --tokens-per-second 60 --rate-limit-rate 0.05 --server-error-rate 0.01
+
+Responses are deterministic placeholder text; only the timing and error
+behaviour are meant to resemble the hosted API.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+STUB_RESPONSE_WORDS = (
+    "The lines suggest a season of patient attention. Notice where effort meets resistance, "
+    "and where stillness lets the situation ripen. Small, consistent steps serve better than "
+    "a single bold move. Reflect on what you are ready to release."
+).split()
+
+
+@dataclass(frozen=True)
+class StubServerConfig:
+    """Timing and fault-injection knobs for the stub server.
+
+    ``latency_ms`` is the mean delay before the first byte, drawn from
+    ``latency_distribution``. Error rates are per-request probabilities;
+    a timeout holds the request open for ``timeout_hold_seconds`` and then
+    drops the connection without a response.
+    """
+
+    latency_ms: float = 200.0
+    latency_distribution: str = "fixed"
+    tokens_per_second: float = 0.0
+    response_tokens: int = 120
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    timeout_hold_seconds: float = 60.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {', '.join(LATENCY_DISTRIBUTIONS)}.")
+        if self.rate_limit_rate + self.server_error_rate + self.timeout_rate > 1:
+            raise ValueError("Injected error rates must add up to at most 1.")
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server that answers ``POST /v1/chat/completions``.
+
+    Usable as a context manager that serves from a background thread::
+
+        with StubOpenAIServer(StubServerConfig(latency_ms=0)) as server:
+            client = openai.OpenAI(api_key="stub", base_url=server.base_url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), StubChatCompletionsHandler)
+        self.config = config or StubServerConfig()
+        self.stats = Counter()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self):
+        self._thread = threading.Thread(
+            target=self.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.shutdown()
+        self.server_close()
+        return False
+
+    def draw_outcome(self):
+        """Returns ``(latency_seconds, outcome)`` for one request."""
+        config = self.config
+        with self._lock:
+            roll = self._random.random()
+            latency = _sample_latency(self._random, config.latency_distribution, config.latency_ms / 1000)
+
+        if roll < config.rate_limit_rate:
+            outcome = "rate_limit"
+        elif roll < config.rate_limit_rate + config.server_error_rate:
+            outcome = "server_error"
+        elif roll < config.rate_limit_rate + config.server_error_rate + config.timeout_rate:
+            outcome = "timeout"
+        else:
+            outcome = "ok"
+        return latency, outcome
+
+    def record(self, outcome):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[outcome] += 1
+
+
+def _sample_latency(rng, distribution, mean_seconds):
+    if mean_seconds <= 0:
+        return 0.0
+    if distribution == "uniform":
+        return rng.uniform(0, 2 * mean_seconds)
+    if distribution == "exponential":
+        return rng.expovariate(1 / mean_seconds)
+    if distribution == "lognormal":
+        sigma = 0.5
+        return rng.lognormvariate(math.log(mean_seconds) - sigma ** 2 / 2, sigma)
+    return mean_seconds
+
+
+def build_stub_words(messages, response_tokens):
+    """Returns deterministic response words, tagged with the prompt length."""
+    prompt = messages[-1].get("content", "") if messages else ""
+    words = [f"[stub:{len(prompt)}]"]
+    while len(words) < response_tokens:
+        words.extend(STUB_RESPONSE_WORDS)
+    return words[:max(response_tokens, 1)]
+
+
+class StubChatCompletionsHandler(BaseHTTPRequestHandler):
+    """Implements the subset of the chat-completions protocol the app uses."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, _error_payload(f"Unknown path: {self.path}", "invalid_request_error"))
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        latency, outcome = self.server.draw_outcome()
+        self.server.record(outcome)
+
+        if outcome == "timeout":
+            time.sleep(self.server.config.timeout_hold_seconds)
+            self.close_connection = True
+            return
+
+        time.sleep(latency)
+        if outcome == "rate_limit":
+            self._send_json(
+                429,
+                _error_payload("Rate limit reached (stub).", "rate_limit_error"),
+                headers={"retry-after": f"{self.server.config.retry_after_seconds:g}"},
+            )
+            return
+        if outcome == "server_error":
+            self._send_json(500, _error_payload("Injected server error (stub).", "server_error"))
+            return
+
+        response_tokens = self.server.config.response_tokens
+        if body.get("max_tokens"):
+            response_tokens = min(response_tokens, int(body["max_tokens"]))
+        words = build_stub_words(body.get("messages", []), response_tokens)
+        if body.get("stream"):
+            self._stream_words(body, words)
+        else:
+            self._send_completion(body, words)
+
+    def _send_completion(self, body, words):
+        self._pace(len(words))
+        prompt_tokens = _estimate_prompt_tokens(body.get("messages", []))
+        self._send_json(
+            200,
+            {
+                "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words),
+                },
+            },
+        )
+
+    def _stream_words(self, body, words):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        for index, word in enumerate(words):
+            if index:
+                self._pace(1)
+            self._write_event(body, completion_id, {"content": word if index == 0 else f" {word}"}, None)
+        self._write_event(body, completion_id, {}, "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._write_usage_event(body, completion_id, len(words))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _write_event(self, body, completion_id, delta, finish_reason):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _write_usage_event(self, body, completion_id, completion_tokens):
+        prompt_tokens = _estimate_prompt_tokens(body.get("messages", []))
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _pace(self, token_count):
+        tokens_per_second = self.server.config.tokens_per_second
+        if tokens_per_second > 0:
+            time.sleep(token_count / tokens_per_second)
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _error_payload(message, error_type):
+    return {"error": {"message": message, "type": error_type}}
+
+
+def _estimate_prompt_tokens(messages):
+    return sum(len(message.get("content") or "") for message in messages) // 4
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a local OpenAI-compatible stub for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--response-tokens", type=int, default=120)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-seconds", type=float, default=1.0)
+    parser.add_argument("--timeout-hold-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = StubServerConfig(
+        latency_ms=args.latency_ms,
+        latency_distribution=args.latency_distribution,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        timeout_rate=args.timeout_rate,
+        retry_after_seconds=args.retry_after_seconds,
+        timeout_hold_seconds=args.timeout_hold_seconds,
+        seed=args.seed,
+    )
+    server = StubOpenAIServer(config, host=args.host, port=args.port)
+    print(f"Stub OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {dict(server.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import httpx
+import openai
+
+from ai_backends import AIBackend, AIBackendConfig, AIBackendRouter
+from ai_cache import AIInterpretationCache
+from ai_integration import (
+    AIConfigurationError,
+    AIRuntime,
+    AISettings,
+    build_ai_config,
+    close_shared_clients,
+    get_ai_interpretation,
+    get_shared_client,
+    stream_ai_interpretation,
+)
+from stub_openai_server import StubOpenAIServer, StubServerConfig
+from tests.test_ai_integration import make_reading
+
+
+def make_mock_backend(name, text="ok", error=None, **config):
+    client = Mock()
+    if error is not None:
+        client.chat.completions.create.side_effect = error
+    else:
+        client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))]
+        )
+    return AIBackend(AIBackendConfig(name=name, **config), client)
+
+
+def make_bad_request_error():
+    request = httpx.Request("POST", "http://127.0.0.1/v1/chat/completions")
+    response = httpx.Response(400, request=request)
+    return openai.BadRequestError("Bad request", response=response, body=None)
+
+
+class TestAIBackendRouter(unittest.TestCase):
+    def test_router_falls_back_when_a_backend_is_unavailable(self):
+        failing = make_mock_backend(
+            "local",
+            error=openai.APIConnectionError(request=httpx.Request("POST", "http://127.0.0.1")),
+        )
+        hosted = make_mock_backend("hosted", text="From the hosted backend.")
+        router = AIBackendRouter([failing, hosted])
+
+        with self.assertLogs(level="WARNING"):
+            result = get_ai_interpretation(make_reading(), router)
+
+        self.assertEqual(result, "From the hosted backend.")
+        failing.client.chat.completions.create.assert_called_once()
+
+    def test_router_raises_request_errors_without_fallback(self):
+        failing = make_mock_backend("local", error=make_bad_request_error())
+        hosted = make_mock_backend("hosted")
+        router = AIBackendRouter([failing, hosted])
+
+        with self.assertRaises(openai.BadRequestError):
+            router.chat.completions.create(model="gpt-4o-mini", messages=[])
+
+        hosted.client.chat.completions.create.assert_not_called()
+
+    def test_router_skips_backends_at_their_concurrency_cap(self):
+        local = make_mock_backend("local", text="local", max_concurrency=1)
+        hosted = make_mock_backend("hosted", text="hosted")
+        router = AIBackendRouter([local, hosted])
+
+        self.assertTrue(local.try_acquire())
+        response = router.chat.completions.create(model="gpt-4o-mini", messages=[])
+        local.release()
+
+        self.assertEqual(response.choices[0].message.content, "hosted")
+        self.assertEqual(router.chat.completions.create(model="m", messages=[]).choices[0].message.content, "local")
+
+    def test_backend_overrides_model_and_timeout(self):
+        local = make_mock_backend("local", model="llama-3.1-8b", timeout_seconds=90)
+        router = AIBackendRouter([local])
+
+        router.chat.completions.create(model="gpt-4o-mini", timeout=30, messages=[])
+
+        create_kwargs = local.client.chat.completions.create.call_args.kwargs
+        self.assertEqual(create_kwargs["model"], "llama-3.1-8b")
+        self.assertEqual(create_kwargs["timeout"], 90)
+
+    def test_cache_keys_follow_the_backend_and_model_that_served(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        runtime = AIRuntime(cache=AIInterpretationCache(Path(temp_dir.name) / "cache.sqlite3"))
+
+        def ask(local_model, local_text):
+            local = make_mock_backend("local", text=local_text, base_url="http://127.0.0.1:8000/v1", model=local_model)
+            hosted = make_mock_backend("hosted", text="From the hosted backend.")
+            text = get_ai_interpretation(make_reading(), AIBackendRouter([local, hosted]), AISettings(), runtime)
+            return text, local.client.chat.completions.create.call_count
+
+        self.assertEqual(ask("llama", "From llama."), ("From llama.", 1))
+        self.assertEqual(ask("llama", "unused"), ("From llama.", 0))
+        self.assertEqual(ask("mistral", "From mistral."), ("From mistral.", 1))
+
+    def test_configured_backends_route_real_requests_with_fallback(self):
+        broken = StubOpenAIServer(StubServerConfig(latency_ms=0, server_error_rate=1)).__enter__()
+        self.addCleanup(broken.__exit__, None, None, None)
+        healthy = StubOpenAIServer(StubServerConfig(latency_ms=0, response_tokens=5)).__enter__()
+        self.addCleanup(healthy.__exit__, None, None, None)
+        self.addCleanup(close_shared_clients)
+
+        config = build_ai_config(
+            secrets=None,
+            environ={
+                "OPENAI_MAX_RETRIES": "0",
+                "OPENAI_BACKEND_ORDER": "local, backup",
+                "OPENAI_BACKEND_LOCAL_BASE_URL": broken.base_url,
+                "OPENAI_BACKEND_BACKUP_BASE_URL": healthy.base_url,
+                "OPENAI_BACKEND_BACKUP_MAX_CONCURRENCY": "1",
+            },
+        )
+        client = get_shared_client(config)
+
+        with self.assertLogs(level="WARNING"):
+            text = get_ai_interpretation(make_reading(), client, settings=config.settings)
+            streamed = "".join(stream_ai_interpretation(make_reading(), client, settings=config.settings))
+            again = get_ai_interpretation(make_reading(), client, settings=config.settings)
+
+        self.assertTrue(config.enabled)
+        self.assertIsInstance(client, AIBackendRouter)
+        self.assertEqual(text, streamed)
+        self.assertEqual(again, text)
+        self.assertEqual(broken.stats["server_error"], 3)
+        self.assertEqual(healthy.stats["ok"], 3)
+
+
+class TestAIBackendConfig(unittest.TestCase):
+    def test_backend_settings_follow_secrets_then_environment_precedence(self):
+        config = build_ai_config(
+            secrets={
+                "openai": {
+                    "api_key": "sk-main",
+                    "backend_order": ["local", "hosted"],
+                    "backends": {
+                        "local": {"base_url": "http://localhost:11434/v1", "model": "llama3"},
+                    },
+                }
+            },
+            environ={
+                "OPENAI_BACKEND_LOCAL_MODEL": "ignored",
+                "OPENAI_BACKEND_LOCAL_TIMEOUT_SECONDS": "120",
+                "OPENAI_BACKEND_HOSTED_MAX_CONCURRENCY": "2",
+            },
+        )
+
+        local, hosted = config.backends
+        self.assertEqual(local.base_url, "http://localhost:11434/v1")
+        self.assertEqual(local.model, "llama3")
+        self.assertEqual(local.timeout_seconds, 120)
+        self.assertIsNone(hosted.base_url)
+        self.assertEqual(hosted.max_concurrency, 2)
+        self.assertEqual(hosted.client_kwargs("sk-main", 30, 2)["api_key"], "sk-main")
+
+    def test_hosted_backend_without_a_key_is_rejected(self):
+        with self.assertRaisesRegex(AIConfigurationError, "AI backend 'hosted' needs an API key"):
+            build_ai_config(secrets=None, environ={"OPENAI_BACKEND_ORDER": "hosted"})
+
+    def test_no_backends_keeps_the_single_client(self):
+        config = build_ai_config(secrets=None, environ={"OPENAI_API_KEY": "sk"})
+
+        self.assertEqual(config.backends, ())
+
+
+if __name__ == "__main__":
+    unittest.main()
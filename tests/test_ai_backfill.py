@@ -0,0 +1,182 @@
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import openai
+
+from ai_backfill import BackfillResult, backfill_ai_interpretations, main, select_backfill_rows
+from ai_integration import AIRuntime, AISettings
+from ai_rate_limit import AIRateLimiter
+from file_handler import load_iching_data, load_journal, save_reading_to_csv
+
+
+def make_saved_reading(number, question, ai_interpretation=None):
+    return {
+        "timestamp": "2026-05-03 14:30:00",
+        "question": question,
+        "lines": [7, 8, 7, 8, 7, 8],
+        "primary_hex": {"number": number},
+        "secondary_hex": None,
+        "ai_interpretation": ai_interpretation,
+    }
+
+
+def make_rate_limit_error(retry_after="0"):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return openai.RateLimitError("Too many requests", response=response, body=None)
+
+
+class StubAsyncClient:
+    """Async chat-completions stub that can fail the first few calls."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.questions = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            if self.failures:
+                raise self.failures.pop(0)
+            question = kwargs["messages"][-1]["content"].split('inquiry: "')[1].split('"')[0]
+            self.questions.append(question)
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=f"Contemplation for {question}"))]
+            )
+        finally:
+            self.in_flight -= 1
+
+
+class TestAIBackfill(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.journal_path = Path(self.temp_dir.name) / "journal.csv"
+        self.checkpoint_path = Path(self.temp_dir.name) / "checkpoint.jsonl"
+        patcher = patch("file_handler.JOURNAL_FILE", str(self.journal_path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+        self.iching_data, _ = load_iching_data()
+
+        save_reading_to_csv(make_saved_reading(1, "First question"))
+        save_reading_to_csv(make_saved_reading(2, "Second question", "Already contemplated."))
+        save_reading_to_csv(make_saved_reading(3, "Third question"))
+        save_reading_to_csv(make_saved_reading(4, "Fourth question"))
+
+    def run_backfill(self, client, runtime=None, **kwargs):
+        async def no_sleep(delay):
+            self.sleeps.append(delay)
+
+        self.sleeps = []
+        return asyncio.run(
+            backfill_ai_interpretations(
+                client,
+                AISettings(),
+                iching_data=self.iching_data,
+                checkpoint_path=self.checkpoint_path,
+                runtime=runtime or AIRuntime(),
+                sleep=no_sleep,
+                **kwargs,
+            )
+        )
+
+    def interpretations_by_question(self):
+        journal_df = load_journal()
+        return dict(zip(journal_df["Question"], journal_df["AI Interpretation"]))
+
+    def test_select_backfill_rows_skips_entries_with_contemplations(self):
+        rows = select_backfill_rows(load_journal(), self.iching_data)
+
+        self.assertEqual(list(rows["Question"]), ["First question", "Third question", "Fourth question"])
+
+    def test_backfill_fills_missing_contemplations_with_bounded_concurrency(self):
+        client = StubAsyncClient()
+
+        result = self.run_backfill(client, concurrency=2, batch_size=2)
+
+        self.assertEqual(len(result.completed), 3)
+        self.assertEqual(result.failed, {})
+        self.assertLessEqual(client.max_in_flight, 2)
+        self.assertEqual(
+            self.interpretations_by_question(),
+            {
+                "First question": "Contemplation for First question",
+                "Second question": "Already contemplated.",
+                "Third question": "Contemplation for Third question",
+                "Fourth question": "Contemplation for Fourth question",
+            },
+        )
+        self.assertFalse(self.checkpoint_path.exists())
+
+    def test_backfill_retries_after_rate_limits(self):
+        client = StubAsyncClient(failures=[make_rate_limit_error("3"), make_rate_limit_error("0")])
+
+        result = self.run_backfill(client, concurrency=1)
+
+        self.assertEqual(len(result.completed), 3)
+        self.assertEqual(result.failed, {})
+        self.assertAlmostEqual(self.sleeps[0], 3.0, places=1)
+
+    def test_backfill_retries_rate_limits_in_one_layer(self):
+        client = StubAsyncClient(failures=[make_rate_limit_error("0") for _ in range(20)])
+        runtime = AIRuntime(rate_limiter=AIRateLimiter(requests_per_minute=0, tokens_per_minute=0))
+
+        result = self.run_backfill(client, runtime=runtime, concurrency=1, max_attempts=2)
+
+        self.assertEqual(len(result.failed), 3)
+        self.assertEqual(len(client.failures), 20 - 3 * 2)
+
+    def test_main_reports_missing_api_key_when_only_backends_are_configured(self):
+        environ = {"OPENAI_BACKEND_ORDER": "local", "OPENAI_BACKEND_LOCAL_BASE_URL": "http://127.0.0.1:8000/v1"}
+        stderr = io.StringIO()
+
+        with patch.dict("os.environ", environ, clear=True), patch("dotenv.load_dotenv"), \
+                contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+            main([])
+
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("OPENAI_API_KEY is not set", stderr.getvalue())
+
+    def test_main_disables_sdk_retries_so_the_backfill_owns_them(self):
+        environ = {"OPENAI_API_KEY": "test-key"}
+
+        with patch.dict("os.environ", environ, clear=True), patch("dotenv.load_dotenv"), \
+                patch("openai.AsyncOpenAI", return_value=MagicMock()) as async_openai, \
+                patch("ai_backfill.backfill_ai_interpretations", AsyncMock(return_value=BackfillResult())), \
+                contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main([]), 0)
+
+        self.assertEqual(async_openai.call_args.kwargs["max_retries"], 0)
+
+    def test_backfill_resumes_from_checkpoint_without_repeating_requests(self):
+        first_id = load_journal().loc[0, "Entry ID"]
+        self.checkpoint_path.write_text(
+            json.dumps({"entry_id": first_id, "interpretation": "Recovered from checkpoint."}) + "\n"
+            + '{"entry_id": "torn',
+            encoding="utf-8",
+        )
+        client = StubAsyncClient()
+
+        result = self.run_backfill(client)
+
+        self.assertEqual(result.resumed, [first_id])
+        self.assertCountEqual(client.questions, ["Third question", "Fourth question"])
+        self.assertEqual(self.interpretations_by_question()["First question"], "Recovered from checkpoint.")
+        self.assertFalse(self.checkpoint_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
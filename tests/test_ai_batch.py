@@ -0,0 +1,211 @@
+import contextlib
+import io
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import openai
+
+import file_handler
+from ai_batch import (
+    BatchJobError,
+    LocalBatchBackend,
+    OpenAIBatchBackend,
+    build_batch_requests,
+    main,
+    parse_batch_results,
+    run_batch_job,
+    split_batch_requests,
+)
+from ai_integration import AIRuntime, AISettings, build_interpretation_messages
+from file_handler import load_iching_data, load_journal, reconstruct_reading_from_row, save_reading_to_csv
+from stub_openai_server import StubOpenAIServer, StubServerConfig
+from tests.test_ai_backfill import make_saved_reading
+
+
+def short_sleep(seconds):
+    time.sleep(0.01)
+
+
+class TestAIBatch(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        patcher = patch("file_handler.JOURNAL_FILE", str(Path(temp_dir.name) / "journal.csv"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.iching_data, _ = load_iching_data()
+
+        save_reading_to_csv(make_saved_reading(1, "First question"))
+        save_reading_to_csv(make_saved_reading(2, "Second question", "Written by an older model."))
+        save_reading_to_csv(make_saved_reading(3, "Third question"))
+
+    def test_build_batch_requests_uses_entry_ids_and_the_interactive_prompt(self):
+        journal_df = load_journal()
+        settings = AISettings(model="gpt-batch", max_tokens=400)
+
+        requests, readings, failed = build_batch_requests(journal_df, self.iching_data, settings)
+        missing_requests, _, _ = build_batch_requests(journal_df, self.iching_data, settings, only_missing=True)
+
+        self.assertEqual([request["custom_id"] for request in requests], list(journal_df["Entry ID"]))
+        self.assertEqual(failed, {})
+        first_reading = reconstruct_reading_from_row(journal_df.iloc[0], self.iching_data)
+        self.assertEqual(requests[0]["url"], "/v1/chat/completions")
+        self.assertEqual(requests[0]["body"]["model"], "gpt-batch")
+        self.assertEqual(requests[0]["body"]["messages"], build_interpretation_messages(first_reading))
+        self.assertEqual(set(readings), set(journal_df["Entry ID"]))
+        self.assertEqual(len(missing_requests), 2)
+
+    def test_parse_batch_results_separates_successes_and_errors(self):
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": "a",
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "Text A"}}]}},
+                    "error": None,
+                }
+            ),
+            json.dumps(
+                {
+                    "custom_id": "b",
+                    "response": {"status_code": 429, "body": {"error": {"message": "Slow down"}}},
+                    "error": None,
+                }
+            ),
+            json.dumps({"custom_id": "c", "response": None, "error": {"message": "Expired"}}),
+            json.dumps({"custom_id": "line 5", "response": {"status_code": 500, "body": None}, "error": None}),
+            "",
+            '{"custom_id": "d", "respo',
+        ]
+
+        interpretations, failed, unreadable = parse_batch_results(lines)
+
+        self.assertEqual(interpretations, {"a": "Text A"})
+        self.assertEqual(failed, {"b": "Slow down", "c": "Expired", "line 5": "HTTP 500"})
+        self.assertEqual(len(unreadable), 1)
+        self.assertTrue(unreadable[0].startswith("Line 6:"))
+
+    def test_requests_are_split_by_count_and_file_size(self):
+        requests = [{"custom_id": str(index), "body": {"text": "x" * 90}} for index in range(5)]
+        line_bytes = len(json.dumps(requests[0])) + 1
+
+        by_count = split_batch_requests(requests, max_requests=2)
+        by_size = split_batch_requests(requests, max_bytes=line_bytes * 3)
+
+        self.assertEqual([len(chunk) for chunk in by_count], [2, 2, 1])
+        self.assertEqual([len(chunk) for chunk in by_size], [3, 2])
+        self.assertEqual([request for chunk in by_size for request in chunk], requests)
+
+    def test_split_jobs_merge_completed_results_and_fail_the_rest(self):
+        entry_ids = list(load_journal()["Entry ID"])
+        statuses = {"batch_1": "completed", "batch_2": "expired", "batch_3": "completed"}
+        backend = Mock()
+        backend.submit.side_effect = list(statuses)
+        backend.status.side_effect = statuses.get
+        backend.results.side_effect = lambda job_id: [
+            json.dumps(
+                {
+                    "custom_id": entry_ids[int(job_id[-1]) - 1],
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"content": job_id}}]}},
+                }
+            ),
+            "[]",
+        ]
+        backend.cache_endpoint.return_value = None
+
+        with patch("ai_batch.split_batch_requests", side_effect=lambda requests: [[request] for request in requests]):
+            result = run_batch_job(backend, AISettings(), iching_data=self.iching_data, runtime=AIRuntime(), sleep=Mock())
+
+        self.assertEqual(result.status, "partial")
+        self.assertEqual((result.job_id, result.job_ids), ("batch_1", list(statuses)))
+        self.assertEqual(result.updated, 2)
+        self.assertEqual(result.failed, {entry_ids[1]: "Batch batch_2 ended with status 'expired'."})
+        self.assertEqual(
+            result.unreadable,
+            ["Batch batch_1: Line 2: not a JSON object.", "Batch batch_3: Line 2: not a JSON object."],
+        )
+        self.assertEqual(list(load_journal()["AI Interpretation"]), ["batch_1", "Written by an older model.", "batch_3"])
+
+    def test_local_batch_job_merges_results_in_one_journal_write(self):
+        with StubOpenAIServer(StubServerConfig(latency_ms=0, response_tokens=6)) as server:
+            client = openai.OpenAI(api_key="stub", base_url=server.base_url, max_retries=0)
+            self.addCleanup(client.close)
+
+            with patch(
+                "ai_batch.update_journal_ai_interpretations",
+                wraps=file_handler.update_journal_ai_interpretations,
+            ) as update:
+                result = run_batch_job(
+                    LocalBatchBackend(client),
+                    AISettings(),
+                    iching_data=self.iching_data,
+                    poll_seconds=0,
+                    runtime=AIRuntime(),
+                    sleep=short_sleep,
+                )
+
+        update.assert_called_once()
+        self.assertEqual(result.status, "completed")
+        self.assertEqual(result.updated, 3)
+        self.assertEqual(result.failed, {})
+        self.assertTrue(all(text.startswith("[stub:") for text in load_journal()["AI Interpretation"]))
+
+    def test_failed_batches_raise_without_touching_the_journal(self):
+        backend = Mock()
+        backend.submit.return_value = "batch_1"
+        backend.status.side_effect = ["validating", "failed"]
+
+        with self.assertRaisesRegex(BatchJobError, "batch_1 ended with status 'failed'"):
+            run_batch_job(backend, AISettings(), iching_data=self.iching_data, runtime=AIRuntime(), sleep=Mock())
+
+        self.assertEqual(load_journal().loc[1, "AI Interpretation"], "Written by an older model.")
+
+
+class TestOpenAIBatchBackend(unittest.TestCase):
+    def test_submits_uploaded_file_and_reads_output_and_error_files(self):
+        client = Mock()
+        client.files.create.return_value = SimpleNamespace(id="file_in")
+        client.batches.create.return_value = SimpleNamespace(id="batch_1")
+        client.batches.retrieve.return_value = SimpleNamespace(
+            status="completed",
+            output_file_id="file_out",
+            error_file_id="file_err",
+        )
+        client.files.content.side_effect = lambda file_id: SimpleNamespace(text=f"{file_id}-1\n{file_id}-2\n")
+        backend = OpenAIBatchBackend(client)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            requests_path = Path(temp_dir) / "requests.jsonl"
+            requests_path.write_text("{}\n", encoding="utf-8")
+            job_id = backend.submit(requests_path)
+
+        self.assertEqual(job_id, "batch_1")
+        self.assertEqual(client.files.create.call_args.kwargs["purpose"], "batch")
+        self.assertEqual(client.batches.create.call_args.kwargs["input_file_id"], "file_in")
+        self.assertEqual(client.batches.create.call_args.kwargs["endpoint"], "/v1/chat/completions")
+        self.assertEqual(backend.status(job_id), "completed")
+        self.assertEqual(backend.results(job_id), ["file_out-1", "file_out-2", "file_err-1", "file_err-2"])
+
+    def test_main_reports_configuration_errors_as_usage_errors(self):
+        cases = {
+            "invalid setting": ({"OPENAI_API_KEY": "sk-test", "OPENAI_MAX_TOKENS": "lots"}, [], "OPENAI_MAX_TOKENS"),
+            "hosted without a key": ({}, [], "OPENAI_API_KEY is not set"),
+            "local without an endpoint": ({}, ["--local"], "No AI endpoint is configured"),
+        }
+        for name, (environ, argv, message) in cases.items():
+            with self.subTest(name):
+                stderr = io.StringIO()
+                with patch.dict("os.environ", environ, clear=True), patch("dotenv.load_dotenv"), \
+                        contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+                    main(argv)
+
+                self.assertEqual(raised.exception.code, 2)
+                self.assertIn(message, stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
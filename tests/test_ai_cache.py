@@ -0,0 +1,82 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from ai_cache import AIInterpretationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAIInterpretationCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = Path(self.temp_dir.name) / "cache.sqlite3"
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_cache(self, **kwargs):
+        return AIInterpretationCache(self.cache_path, clock=self.clock, **kwargs)
+
+    def test_get_returns_stored_value_and_counts_hits_and_misses(self):
+        cache = self.make_cache()
+
+        self.assertIsNone(cache.get("reading"))
+        cache.set("reading", "A contemplative response.")
+
+        self.assertEqual(cache.get("reading"), "A contemplative response.")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_entries_are_shared_between_cache_instances(self):
+        self.make_cache().set("reading", "Shared response.")
+
+        self.assertEqual(self.make_cache().get("reading"), "Shared response.")
+
+    def test_expired_entries_are_misses(self):
+        cache = self.make_cache(ttl_seconds=60)
+        cache.set("reading", "Old response.")
+
+        self.clock.now += 61
+
+        self.assertIsNone(cache.get("reading"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        cache.set("first", "1")
+        self.clock.now += 1
+        cache.set("second", "2")
+        self.clock.now += 1
+        cache.get("first")
+        self.clock.now += 1
+        cache.set("third", "3")
+
+        self.assertEqual(cache.get("first"), "1")
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), "3")
+
+    def test_reads_do_not_wait_for_a_writer(self):
+        cache = self.make_cache()
+        cache.set("reading", "Stored response.")
+        writer = sqlite3.connect(self.cache_path, isolation_level=None)
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            self.assertEqual(cache.get("reading"), "Stored response.")
+            self.assertIsNone(cache.get("other"))
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
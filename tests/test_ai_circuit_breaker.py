@@ -0,0 +1,179 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+import httpx
+import openai
+
+from ai_circuit_breaker import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker
+from ai_integration import (
+    AIBackendUnavailableError,
+    AIInterpretationError,
+    AIRuntime,
+    AISettings,
+    build_ai_config,
+    get_ai_interpretation,
+    stream_ai_interpretation,
+)
+from stub_openai_server import StubOpenAIServer, StubServerConfig
+from tests.test_ai_backends import make_bad_request_error
+from tests.test_ai_integration import make_client, make_reading
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_refuses_calls(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_seconds=10, clock=FakeClock())
+
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        breaker.record_success()
+        for _ in range(3):
+            breaker.record_failure()
+
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retry_after(), 10)
+
+    def test_half_open_allows_one_trial_at_a_time(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.release()
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_reopens_the_circuit(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=5, reset_seconds=10, clock=clock)
+        for _ in range(5):
+            breaker.record_failure()
+
+        clock.now = 12
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+        clock.now = 21
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retry_after(), 1)
+
+
+class TestAICircuitBreakerIntegration(unittest.TestCase):
+    def test_open_circuit_fails_fast_without_calling_the_api(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = make_connection_error()
+        settings = AISettings(max_retries=0)
+        runtime = AIRuntime(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+
+        for _ in range(2):
+            with self.assertRaises(AIInterpretationError) as raised:
+                get_ai_interpretation(make_reading(), client, settings=settings, runtime=runtime)
+            self.assertNotIsInstance(raised.exception, AIBackendUnavailableError)
+        with self.assertRaisesRegex(AIBackendUnavailableError, "try again in about 60 seconds"):
+            get_ai_interpretation(make_reading(), client, runtime=runtime)
+        with self.assertRaises(AIBackendUnavailableError):
+            list(stream_ai_interpretation(make_reading(), client, runtime=runtime))
+
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+    def test_each_failed_attempt_counts_toward_opening_the_circuit(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = make_connection_error()
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+        runtime = AIRuntime(circuit_breaker=breaker)
+
+        with self.assertRaises(AIInterpretationError) as raised:
+            get_ai_interpretation(make_reading(), client, settings=AISettings(max_retries=5), runtime=runtime)
+
+        self.assertNotIsInstance(raised.exception, AIBackendUnavailableError)
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+    def test_retried_failure_followed_by_success_closes_the_circuit(self):
+        client = make_client("Steady again.")
+        client.chat.completions.create.side_effect = [
+            make_connection_error(),
+            client.chat.completions.create.return_value,
+        ]
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        result = get_ai_interpretation(make_reading(), client, runtime=AIRuntime(circuit_breaker=breaker))
+        breaker.record_failure()
+
+        self.assertEqual(result, "Steady again.")
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_rejected_requests_do_not_open_the_circuit(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = make_bad_request_error()
+        breaker = CircuitBreaker(failure_threshold=1)
+
+        with self.assertRaises(AIInterpretationError):
+            get_ai_interpretation(make_reading(), client, runtime=AIRuntime(circuit_breaker=breaker))
+
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_successful_trial_closes_the_circuit(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=5, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+
+        result = get_ai_interpretation(make_reading(), make_client("Back again."), runtime=AIRuntime(circuit_breaker=breaker))
+
+        self.assertEqual(result, "Back again.")
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_outage_only_waits_for_the_timeouts_that_open_the_circuit(self):
+        server = StubOpenAIServer(StubServerConfig(latency_ms=0, timeout_rate=1, timeout_hold_seconds=2)).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        client = openai.OpenAI(api_key="stub", base_url=server.base_url, timeout=0.2, max_retries=0)
+        self.addCleanup(client.close)
+        settings = AISettings(timeout_seconds=0.2, max_retries=3)
+        runtime = AIRuntime(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+
+        started = time.perf_counter()
+        errors = []
+        for _ in range(10):
+            with self.assertRaises(AIInterpretationError) as raised:
+                get_ai_interpretation(make_reading(), client, settings=settings, runtime=runtime)
+            errors.append(type(raised.exception))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(server.stats["requests"], 2)
+        self.assertEqual(errors.count(AIBackendUnavailableError), 9)
+        self.assertLess(elapsed, 1.5)
+
+    def test_circuit_settings_are_configurable(self):
+        config = build_ai_config(
+            secrets=None,
+            environ={"OPENAI_CIRCUIT_FAILURE_THRESHOLD": "0", "OPENAI_CIRCUIT_RESET_SECONDS": "12.5"},
+        )
+
+        self.assertEqual(config.settings.circuit_failure_threshold, 0)
+        self.assertEqual(config.settings.circuit_reset_seconds, 12.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,23 @@
+import tempfile
 import unittest
+from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
+from ai_cache import AIInterpretationCache
 from ai_integration import (
+    AIConfig,
     AIConfigurationError,
+    AIRuntime,
     AISettings,
     AIInterpretationError,
     AIRateLimitError,
     build_ai_config,
+    build_interpretation_cache_key,
+    close_shared_clients,
     get_ai_interpretation,
+    get_shared_client,
+    prefetch_ai_interpretation,
 )
 
 
@@ -107,6 +116,58 @@ class TestAIIntegration(unittest.TestCase):
         self.assertEqual(create_kwargs["temperature"], 0.2)
         self.assertEqual(create_kwargs["timeout"], 12.5)
 
+    def test_repeat_requests_are_served_from_the_runtime_cache(self):
+        client = make_client("Cached contemplation.")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            runtime = AIRuntime(cache=AIInterpretationCache(Path(temp_dir) / "cache.sqlite3"))
+            first = get_ai_interpretation(make_reading(), client, runtime=runtime)
+            repeat_reading = make_reading()
+            repeat_reading["question"] = "  How should I approach   this collaboration? "
+            second = get_ai_interpretation(repeat_reading, client, runtime=runtime)
+            stats = runtime.cache.stats()
+
+        self.assertEqual(first, "Cached contemplation.")
+        self.assertEqual(second, "Cached contemplation.")
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_cache_key_depends_on_reading_and_request_settings(self):
+        base_key = build_interpretation_cache_key(make_reading(), AISettings())
+
+        self.assertNotEqual(
+            base_key,
+            build_interpretation_cache_key(make_reading(), AISettings(model="gpt-other")),
+        )
+        self.assertNotEqual(
+            base_key,
+            build_interpretation_cache_key(make_reading(), AISettings(temperature=0.1)),
+        )
+        self.assertNotEqual(
+            base_key,
+            build_interpretation_cache_key(make_reading(changing_lines_indices=[2]), AISettings()),
+        )
+        self.assertEqual(
+            base_key,
+            build_interpretation_cache_key(make_reading(), AISettings(timeout_seconds=5)),
+        )
+        with patch("ai_integration.PROMPT_VERSION", "edited-prompt"):
+            self.assertNotEqual(base_key, build_interpretation_cache_key(make_reading(), AISettings()))
+
+    def test_each_endpoint_gets_its_own_cache_keys(self):
+        hosted = build_ai_config(environ={"OPENAI_API_KEY": "sk-test"})
+        explicit = build_ai_config(environ={"OPENAI_API_KEY": "sk-test", "OPENAI_BASE_URL": "https://api.openai.com/v1/"})
+        local = build_ai_config(environ={"OPENAI_API_KEY": "sk-test", "OPENAI_BASE_URL": "http://127.0.0.1:8000/v1"})
+
+        self.assertEqual(hosted.settings, explicit.settings)
+        self.assertEqual(local.settings.endpoint, "http://127.0.0.1:8000/v1")
+        self.assertNotEqual(
+            build_interpretation_cache_key(make_reading(), hosted.settings),
+            build_interpretation_cache_key(make_reading(), local.settings),
+        )
+        # get_ai_runtime is keyed by settings, so the endpoints also get separate runtimes.
+        self.assertNotEqual(hosted.settings, local.settings)
+
     def test_build_ai_config_reads_secrets_before_environment(self):
         config = build_ai_config(
             secrets={
@@ -134,6 +195,36 @@ class TestAIIntegration(unittest.TestCase):
         self.assertEqual(config.settings.timeout_seconds, 45)
         self.assertEqual(config.settings.max_retries, 4)
 
+    def test_shared_clients_are_reused_per_config_until_closed(self):
+        config = AIConfig(api_key="sk-test", settings=AISettings(max_connections=3))
+        self.addCleanup(close_shared_clients)
+
+        first = get_shared_client(config)
+        second = get_shared_client(AIConfig(api_key="sk-test", settings=AISettings(max_connections=3)))
+        other = get_shared_client(AIConfig(api_key="sk-other", settings=AISettings(max_connections=3)))
+        close_shared_clients()
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        self.assertTrue(first.is_closed())
+        self.assertIsNot(get_shared_client(config), first)
+
+    def test_shared_clients_ignore_settings_that_do_not_affect_the_connection(self):
+        self.addCleanup(close_shared_clients)
+
+        first = get_shared_client(AIConfig(api_key="sk-test", settings=AISettings(model="gpt-a")))
+        second = get_shared_client(
+            AIConfig(api_key="sk-test", settings=AISettings(model="gpt-b", temperature=0.2, cache_max_entries=0))
+        )
+        other = get_shared_client(AIConfig(api_key="sk-test", settings=AISettings(timeout_seconds=5)))
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+    def test_shared_client_requires_an_api_key(self):
+        with self.assertRaises(AIConfigurationError):
+            get_shared_client(AIConfig(api_key=None, settings=AISettings()))
+
     def test_build_ai_config_supports_flat_secret_keys(self):
         config = build_ai_config(
             secrets={
@@ -150,6 +241,35 @@ class TestAIIntegration(unittest.TestCase):
         with self.assertRaisesRegex(AIConfigurationError, "OPENAI_MAX_TOKENS must be an integer"):
             build_ai_config(secrets=None, environ={"OPENAI_MAX_TOKENS": "many"})
 
+    def test_build_ai_config_parses_prefetch_flag(self):
+        self.assertFalse(build_ai_config(secrets=None, environ={}).settings.prefetch)
+        self.assertTrue(build_ai_config(secrets=None, environ={"OPENAI_PREFETCH": "yes"}).settings.prefetch)
+        self.assertTrue(build_ai_config(secrets={"openai": {"prefetch": True}}, environ={}).settings.prefetch)
+
+        with self.assertRaisesRegex(AIConfigurationError, "OPENAI_PREFETCH must be true or false"):
+            build_ai_config(secrets=None, environ={"OPENAI_PREFETCH": "sometimes"})
+
+    def test_prefetch_fills_the_runtime_cache_in_the_background(self):
+        client = make_client("Prefetched contemplation.")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            runtime = AIRuntime(cache=AIInterpretationCache(Path(temp_dir) / "cache.sqlite3"))
+            prefetched = prefetch_ai_interpretation(make_reading(), client, runtime=runtime).result(timeout=5)
+            requested = get_ai_interpretation(make_reading(), client, runtime=runtime)
+
+        self.assertEqual(prefetched, "Prefetched contemplation.")
+        self.assertEqual(requested, "Prefetched contemplation.")
+        self.assertEqual(client.chat.completions.create.call_count, 1)
+
+    def test_failed_prefetch_resolves_to_none(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = RuntimeError("offline")
+
+        with self.assertLogs(level="WARNING"):
+            result = prefetch_ai_interpretation(make_reading(), client).result(timeout=5)
+
+        self.assertIsNone(result)
+
     def test_prompt_handles_reading_without_changing_lines_or_evolving_hexagram(self):
         client = make_client()
 
@@ -0,0 +1,130 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import openai
+
+from ai_integration import AIRuntime, AISettings
+import ai_library
+from ai_library import (
+    PATTERN_COUNT,
+    OfflineLibrary,
+    OfflineLibraryError,
+    generate_offline_library,
+    get_offline_library,
+    lookup_offline_interpretation,
+    pattern_index,
+    pattern_lines,
+    write_offline_library,
+)
+from file_handler import load_iching_data
+from reading_service import create_reading
+from stub_openai_server import StubOpenAIServer, StubServerConfig
+
+
+class TestLinePatterns(unittest.TestCase):
+    def test_pattern_indices_cover_every_cast_once(self):
+        indices = {pattern_index(pattern_lines(index)) for index in range(PATTERN_COUNT)}
+
+        self.assertEqual(indices, set(range(PATTERN_COUNT)))
+        self.assertEqual(pattern_index([6, 6, 6, 6, 6, 6]), 0)
+        self.assertEqual(pattern_index([9, 6, 6, 6, 6, 6]), 3 * 4 ** 5)
+        self.assertEqual(pattern_lines(PATTERN_COUNT - 1), [9] * 6)
+
+    def test_invalid_patterns_are_rejected(self):
+        with self.assertRaises(ValueError):
+            pattern_index([7, 7, 7])
+        with self.assertRaises(ValueError):
+            pattern_index([7, 7, 7, 7, 7, 5])
+
+
+class TestOfflineLibraryFile(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "ai_library.bin"
+
+    def test_written_entries_are_read_back_by_index_and_lines(self):
+        text = "Hold steady; the path clears as you walk it. " * 20
+        write_offline_library({0: "All yin, all changing.", 1365: text}, self.path)
+
+        library = OfflineLibrary.load(self.path)
+
+        self.assertEqual(library.get(0), "All yin, all changing.")
+        self.assertEqual(library.lookup(pattern_lines(1365)), text)
+        self.assertIsNone(library.get(1))
+        self.assertIsNone(library.get(PATTERN_COUNT))
+        self.assertLess(self.path.stat().st_size, len(text) + 5 * PATTERN_COUNT)
+
+    def test_unknown_or_missing_files_are_ignored(self):
+        self.assertIsNone(get_offline_library(self.path))
+
+        self.path.write_bytes(b"not a library")
+        with self.assertRaises(OfflineLibraryError):
+            OfflineLibrary.load(self.path)
+        with self.assertLogs(level="WARNING"):
+            self.assertIsNone(get_offline_library(self.path))
+
+    def test_lookup_follows_the_reading_lines_and_file_updates(self):
+        iching_data, binary_to_hex_map = load_iching_data()
+        lines = [7, 8, 9, 7, 6, 8]
+        reading = create_reading("Anything?", lines, iching_data, binary_to_hex_map, timestamp=None)
+        write_offline_library({pattern_index(lines): "First."}, self.path)
+        self.assertEqual(lookup_offline_interpretation(reading, self.path), "First.")
+
+        write_offline_library({pattern_index(lines): "Second, rewritten."}, self.path)
+
+        self.assertEqual(lookup_offline_interpretation(reading, self.path), "Second, rewritten.")
+
+
+class TestGenerateOfflineLibrary(unittest.TestCase):
+    def test_generation_fills_missing_patterns_and_resumes(self):
+        server = StubOpenAIServer(StubServerConfig(latency_ms=0, response_tokens=6)).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        client = openai.OpenAI(api_key="stub", base_url=server.base_url, max_retries=0)
+        self.addCleanup(client.close)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        path = Path(temp_dir.name) / "ai_library.bin"
+        settings = AISettings(max_retries=0)
+
+        first = generate_offline_library(client, settings, path=path, runtime=AIRuntime(), limit=5)
+        second = generate_offline_library(client, settings, path=path, runtime=AIRuntime(), limit=3)
+
+        self.assertEqual((first.generated, first.reused, first.failed), (5, 0, {}))
+        self.assertEqual((second.generated, second.reused), (3, 5))
+        self.assertEqual(server.stats["ok"], 8)
+        library = OfflineLibrary.load(path)
+        self.assertEqual(len(library.entries()), 8)
+        self.assertTrue(library.get(7).startswith("[stub:"))
+
+    def test_generation_checkpoints_and_records_unexpected_failures(self):
+        server = StubOpenAIServer(StubServerConfig(latency_ms=0, response_tokens=6)).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        client = openai.OpenAI(api_key="stub", base_url=server.base_url, max_retries=0)
+        self.addCleanup(client.close)
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        path = Path(temp_dir.name) / "ai_library.bin"
+        build_reading = ai_library.build_library_reading
+
+        def build_or_fail(index, *args):
+            if index == 3:
+                raise KeyError("hexagram data")
+            return build_reading(index, *args)
+
+        with patch("ai_library.build_library_reading", side_effect=build_or_fail), patch(
+            "ai_library.write_offline_library", wraps=write_offline_library
+        ) as write, self.assertLogs(level="ERROR"):
+            result = generate_offline_library(
+                client, AISettings(max_retries=0), path=path, runtime=AIRuntime(), limit=7, checkpoint_every=2
+            )
+
+        self.assertEqual((result.generated, list(result.failed)), (6, [3]))
+        self.assertEqual(write.call_count, 4)
+        self.assertEqual(sorted(OfflineLibrary.load(path).entries()), [0, 1, 2, 4, 5, 6])
+
+
+if __name__ == "__main__":
+    unittest.main()
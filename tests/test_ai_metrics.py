@@ -0,0 +1,187 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import openai
+
+from ai_integration import (
+    AIInterpretationError,
+    AIRuntime,
+    AISettings,
+    build_ai_config,
+    close_shared_clients,
+    get_ai_interpretation,
+    get_ai_interpretation_async,
+    get_shared_client,
+    stream_ai_interpretation,
+)
+from ai_metrics import AICallRecord, AIMetrics, RollingHistogram, read_metrics_log
+from ai_rate_limit import AIRateLimiter
+from stub_openai_server import StubOpenAIServer, StubServerConfig
+from tests.test_ai_backfill import make_rate_limit_error
+from tests.test_ai_integration import make_reading
+
+
+def make_usage_response(text, prompt_tokens=120, completion_tokens=40, model="gpt-4o-mini-2024-07-18"):
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+class TestRollingHistogram(unittest.TestCase):
+    def test_percentiles_use_nearest_rank_over_the_window(self):
+        histogram = RollingHistogram(window=100)
+        for value in range(1, 201):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.count(), 100)
+        self.assertEqual(histogram.percentile(50), 150)
+        self.assertEqual(histogram.percentile(95), 195)
+        self.assertIsNone(RollingHistogram().percentile(50))
+
+
+class TestAIMetrics(unittest.TestCase):
+    def test_summary_groups_calls_by_model(self):
+        metrics = AIMetrics()
+        metrics.record(AICallRecord(model="a", streamed=False, wall_seconds=1.0, prompt_tokens=10, completion_tokens=5))
+        metrics.record(AICallRecord(model="a", streamed=True, wall_seconds=3.0, ttft_seconds=0.5, error="AIRateLimitError"))
+        metrics.record(AICallRecord(model="b", streamed=False, wall_seconds=2.0))
+
+        summary = {row["model"]: row for row in metrics.summary()}
+
+        self.assertEqual(summary["a"]["calls"], 2)
+        self.assertEqual(summary["a"]["errors"], 1)
+        self.assertEqual(summary["a"]["p50_seconds"], 1.0)
+        self.assertEqual(summary["a"]["p95_seconds"], 3.0)
+        self.assertEqual(summary["a"]["p50_ttft_seconds"], 0.5)
+        self.assertEqual(summary["a"]["prompt_tokens"], 10)
+        self.assertEqual(summary["a"]["error_counts"], {"AIRateLimitError": 1})
+        self.assertEqual(summary["b"]["calls"], 1)
+
+    def test_records_are_appended_to_the_log_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = Path(temp_dir) / "ai_metrics.jsonl"
+            metrics = AIMetrics(log_path)
+            first = AICallRecord(model="a", streamed=False, wall_seconds=1.0)
+            second = AICallRecord(model="a", streamed=True, wall_seconds=2.0, error="AIInterpretationError")
+
+            metrics.record(first)
+            metrics.record(second)
+            with log_path.open("a", encoding="utf-8") as log_file:
+                log_file.write("not json\n")
+
+            self.assertEqual(read_metrics_log(log_path), [first, second])
+
+
+class TestAICallInstrumentation(unittest.TestCase):
+    def test_successful_call_records_usage_model_and_retries(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = [
+            make_rate_limit_error("0"),
+            make_usage_response("Steady."),
+        ]
+        metrics = AIMetrics()
+        runtime = AIRuntime(
+            rate_limiter=AIRateLimiter(requests_per_minute=0, tokens_per_minute=0),
+            metrics=metrics,
+        )
+
+        get_ai_interpretation(make_reading(), client, runtime=runtime)
+
+        (row,) = metrics.summary()
+        self.assertEqual(row["model"], "gpt-4o-mini-2024-07-18")
+        self.assertEqual(row["calls"], 1)
+        self.assertEqual(row["retries"], 1)
+        self.assertEqual(row["errors"], 0)
+        self.assertEqual((row["prompt_tokens"], row["completion_tokens"]), (120, 40))
+        self.assertIsNone(row["p50_ttft_seconds"])
+
+    def test_failed_call_records_mapped_error_and_cause(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = openai.APITimeoutError(
+            request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        )
+        metrics = AIMetrics()
+
+        with self.assertRaises(AIInterpretationError):
+            get_ai_interpretation(make_reading(), client, runtime=AIRuntime(metrics=metrics))
+
+        (row,) = metrics.summary()
+        self.assertEqual(row["model"], "gpt-4o-mini")
+        self.assertEqual(row["error_counts"], {"AIInterpretationError": 1})
+
+    def test_async_call_records_usage(self):
+        client = Mock()
+        client.chat.completions.create = AsyncMock(return_value=make_usage_response("Calm.", model="m"))
+        metrics = AIMetrics()
+
+        asyncio.run(get_ai_interpretation_async(make_reading(), client, runtime=AIRuntime(metrics=metrics)))
+
+        (row,) = metrics.summary()
+        self.assertEqual((row["model"], row["completion_tokens"]), ("m", 40))
+
+    def test_streamed_call_records_time_to_first_token_and_usage(self):
+        server = StubOpenAIServer(StubServerConfig(latency_ms=20, response_tokens=8)).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        client = openai.OpenAI(api_key="stub", base_url=server.base_url, max_retries=0)
+        self.addCleanup(client.close)
+        metrics = AIMetrics()
+
+        text = "".join(stream_ai_interpretation(make_reading(), client, runtime=AIRuntime(metrics=metrics)))
+
+        (row,) = metrics.summary()
+        self.assertEqual(row["completion_tokens"], len(text.split()))
+        self.assertGreater(row["prompt_tokens"], 0)
+        self.assertGreaterEqual(row["p50_ttft_seconds"], 0.015)
+        self.assertLessEqual(row["p50_ttft_seconds"], row["p50_seconds"])
+
+    def test_streams_without_usage_support_record_estimated_usage(self):
+        server = StubOpenAIServer(StubServerConfig(latency_ms=0, response_tokens=8)).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        self.addCleanup(close_shared_clients)
+        config = build_ai_config(
+            secrets=None,
+            environ={
+                "OPENAI_BACKEND_ORDER": "local",
+                "OPENAI_BACKEND_LOCAL_BASE_URL": server.base_url,
+                "OPENAI_BACKEND_LOCAL_STREAM_USAGE": "false",
+            },
+        )
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        log_path = Path(temp_dir.name) / "metrics.jsonl"
+        runtime = AIRuntime(metrics=AIMetrics(log_path))
+
+        text = "".join(
+            stream_ai_interpretation(make_reading(), get_shared_client(config), config.settings, runtime)
+        )
+
+        (record,) = read_metrics_log(log_path)
+        self.assertTrue(record.usage_estimated)
+        self.assertEqual(record.completion_tokens, len(text) // 4)
+        self.assertGreater(record.prompt_tokens, 0)
+
+    def test_stream_usage_can_be_turned_off_for_the_main_endpoint(self):
+        client = Mock()
+        client.chat.completions.create.return_value = iter(())
+        settings = build_ai_config(secrets=None, environ={"OPENAI_STREAM_USAGE": "false"}).settings
+
+        list(stream_ai_interpretation(make_reading(), client, settings=settings))
+
+        self.assertNotIn("stream_options", client.chat.completions.create.call_args.kwargs)
+
+    def test_metrics_log_can_be_disabled(self):
+        self.assertTrue(AISettings().metrics_log)
+        config = build_ai_config(secrets=None, environ={"OPENAI_METRICS_LOG": "false"})
+
+        self.assertFalse(config.settings.metrics_log)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from ai_prompts import (
+    NO_CHANGING_LINES_TEXT,
+    SYSTEM_MESSAGE,
+    _hexagram_fragment,
+    build_interpretation_messages,
+)
+from tests.test_ai_integration import SAMPLE_SECONDARY_HEX, make_reading
+
+
+class TestAIPrompts(unittest.TestCase):
+    def test_system_message_is_the_same_for_every_reading(self):
+        stable = build_interpretation_messages(make_reading())
+        changing = build_interpretation_messages(
+            make_reading(changing_lines_indices=[0, 4], secondary_hex=SAMPLE_SECONDARY_HEX)
+        )
+
+        self.assertIs(stable[0]["content"], SYSTEM_MESSAGE)
+        self.assertIs(changing[0]["content"], SYSTEM_MESSAGE)
+        self.assertNotIn("collaboration", SYSTEM_MESSAGE)
+        self.assertIn("**Guidance for Reflection:**", SYSTEM_MESSAGE)
+
+    def test_user_message_holds_only_the_reading(self):
+        prompt = build_interpretation_messages(
+            make_reading(changing_lines_indices=[4], secondary_hex=SAMPLE_SECONDARY_HEX)
+        )[1]["content"]
+
+        self.assertTrue(prompt.startswith('A user has approached you with the following inquiry: "How should'))
+        self.assertLess(prompt.index("**Line 5:**"), prompt.index("**Evolving Hexagram:**"))
+        self.assertNotIn("**The Present Situation:**", prompt)
+
+    def test_stable_reading_says_there_are_no_changing_lines(self):
+        prompt = build_interpretation_messages(make_reading())[1]["content"]
+
+        self.assertIn(NO_CHANGING_LINES_TEXT, prompt)
+        self.assertNotIn("Evolving Hexagram", prompt)
+
+    def test_hexagram_fragments_are_memoized(self):
+        _hexagram_fragment.cache_clear()
+
+        build_interpretation_messages(make_reading())
+        build_interpretation_messages(make_reading())
+
+        info = _hexagram_fragment.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
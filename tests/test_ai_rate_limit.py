@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from ai_integration import AIRateLimitError, AIRuntime, get_ai_interpretation
+from ai_rate_limit import AIRateLimiter, estimate_request_tokens
+from tests.test_ai_backfill import make_rate_limit_error
+from tests.test_ai_integration import make_reading
+
+
+def make_response(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+class TestAIRateLimiter(unittest.TestCase):
+    def test_estimate_request_tokens_uses_prompt_length_and_max_tokens(self):
+        messages = [{"role": "system", "content": "a" * 40}, {"role": "user", "content": "b" * 80}]
+
+        self.assertEqual(estimate_request_tokens(messages, max_tokens=900), 930)
+
+    def test_token_bucket_delays_requests_beyond_the_per_minute_budget(self):
+        limiter = AIRateLimiter(requests_per_minute=0, tokens_per_minute=600)
+
+        self.assertLess(limiter.acquire(600), 0.05)
+        waited = limiter.acquire(3)
+
+        self.assertGreaterEqual(waited, 0.25)
+
+    def test_waiting_callers_are_admitted_in_arrival_order(self):
+        limiter = AIRateLimiter(requests_per_minute=0, tokens_per_minute=1200)
+        limiter.acquire(1200)
+        admitted = []
+        positions = {}
+        threads = []
+
+        for caller in range(3):
+            positions[caller] = []
+
+            def run(caller=caller):
+                limiter.acquire(1, on_wait=positions[caller].append)
+                admitted.append(caller)
+
+            thread = threading.Thread(target=run)
+            thread.start()
+            threads.append(thread)
+            while limiter.queue_length() < caller + 1:
+                time.sleep(0.001)
+
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(admitted, [0, 1, 2])
+        self.assertEqual(positions[2], [3, 2, 1])
+        self.assertEqual(limiter.queue_length(), 0)
+
+    def test_rate_limit_responses_pause_admissions(self):
+        limiter = AIRateLimiter(requests_per_minute=6000, tokens_per_minute=0)
+
+        limiter.record_rate_limit(retry_after=0.3)
+
+        self.assertGreaterEqual(limiter.acquire(1), 0.25)
+
+    def test_get_ai_interpretation_retries_rate_limits_through_the_limiter(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = [
+            make_rate_limit_error("0.1"),
+            make_response("Patience is rewarded."),
+        ]
+        runtime = AIRuntime(rate_limiter=AIRateLimiter(requests_per_minute=0, tokens_per_minute=0))
+
+        result = get_ai_interpretation(make_reading(), client, runtime=runtime)
+
+        self.assertEqual(result, "Patience is rewarded.")
+        self.assertEqual(client.chat.completions.create.call_count, 2)
+
+    def test_get_ai_interpretation_raises_after_repeated_rate_limits(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = [make_rate_limit_error("0")] * 3
+        runtime = AIRuntime(rate_limiter=AIRateLimiter(requests_per_minute=0, tokens_per_minute=0))
+
+        with self.assertRaises(AIRateLimitError):
+            get_ai_interpretation(make_reading(), client, runtime=runtime)
+
+        self.assertEqual(client.chat.completions.create.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ai_integration import (
+    AIInterpretationError,
+    AIRuntime,
+    AISettings,
+    get_ai_interpretation,
+    get_ai_interpretation_async,
+)
+from ai_singleflight import SingleFlight
+from tests.test_ai_integration import make_reading
+
+
+CALLERS = 8
+
+
+class SlowStubClient:
+    """Chat-completions stub that holds each call open long enough to overlap."""
+
+    def __init__(self, error=None, delay=0.2):
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"Interpretation #{call_number}"))]
+        )
+
+
+class AsyncSlowStubClient(SlowStubClient):
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"Interpretation #{self.calls}"))]
+        )
+
+
+def run_concurrently(target, callers=CALLERS):
+    barrier = threading.Barrier(callers)
+    outcomes = [None] * callers
+
+    def run(index):
+        barrier.wait()
+        try:
+            outcomes[index] = target()
+        except Exception as e:
+            outcomes[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return outcomes
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_identical_requests_make_one_upstream_call(self):
+        client = SlowStubClient()
+        runtime = AIRuntime(single_flight=SingleFlight())
+
+        outcomes = run_concurrently(lambda: get_ai_interpretation(make_reading(), client, runtime=runtime))
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(outcomes, ["Interpretation #1"] * CALLERS)
+        self.assertEqual(runtime.single_flight.in_flight(), 0)
+
+    def test_concurrent_callers_share_the_upstream_error(self):
+        client = SlowStubClient(error=RuntimeError("upstream exploded"))
+        runtime = AIRuntime(single_flight=SingleFlight())
+
+        outcomes = run_concurrently(lambda: get_ai_interpretation(make_reading(), client, runtime=runtime))
+
+        self.assertEqual(client.calls, 1)
+        self.assertTrue(all(isinstance(outcome, AIInterpretationError) for outcome in outcomes))
+        self.assertEqual(len({id(outcome) for outcome in outcomes}), 1)
+
+    def test_different_readings_are_not_coalesced(self):
+        client = SlowStubClient(delay=0.05)
+        runtime = AIRuntime(single_flight=SingleFlight())
+        readings = iter({**make_reading(), "question": f"Question {index}?"} for index in range(CALLERS))
+        lock = threading.Lock()
+
+        def next_reading():
+            with lock:
+                return next(readings)
+
+        run_concurrently(lambda: get_ai_interpretation(next_reading(), client, runtime=runtime))
+
+        self.assertEqual(client.calls, CALLERS)
+
+    def test_finished_calls_are_not_reused(self):
+        client = SlowStubClient(delay=0)
+        runtime = AIRuntime(single_flight=SingleFlight())
+
+        first = get_ai_interpretation(make_reading(), client, runtime=runtime)
+        second = get_ai_interpretation(make_reading(), client, runtime=runtime)
+
+        self.assertEqual((first, second), ("Interpretation #1", "Interpretation #2"))
+
+    def test_concurrent_async_requests_make_one_upstream_call(self):
+        client = AsyncSlowStubClient(delay=0.05)
+        runtime = AIRuntime(single_flight=SingleFlight())
+
+        async def run():
+            return await asyncio.gather(
+                *(get_ai_interpretation_async(make_reading(), client, runtime=runtime) for _ in range(CALLERS))
+            )
+
+        results = asyncio.run(run())
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(results, ["Interpretation #1"] * CALLERS)
+
+    @patch("ai_integration.SINGLE_FLIGHT_WAIT_MARGIN_SECONDS", 0)
+    def test_followers_stop_waiting_after_the_request_timeout(self):
+        client = SlowStubClient(delay=0.5)
+        runtime = AIRuntime(single_flight=SingleFlight())
+        settings = AISettings(timeout_seconds=0.1, max_retries=0)
+
+        outcomes = run_concurrently(
+            lambda: get_ai_interpretation(make_reading(), client, settings=settings, runtime=runtime)
+        )
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(outcomes.count("Interpretation #1"), 1)
+        self.assertTrue(
+            all(isinstance(outcome, AIInterpretationError) for outcome in outcomes if outcome != "Interpretation #1")
+        )
+        self.assertEqual(runtime.single_flight.in_flight(), 0)
+
+    @patch("ai_integration.SINGLE_FLIGHT_WAIT_MARGIN_SECONDS", 0)
+    def test_async_follower_timeout_leaves_the_leader_running(self):
+        client = AsyncSlowStubClient(delay=0.3)
+        runtime = AIRuntime(single_flight=SingleFlight())
+        settings = AISettings(timeout_seconds=0.1, max_retries=0)
+
+        async def run():
+            return await asyncio.gather(
+                *(
+                    get_ai_interpretation_async(make_reading(), client, settings=settings, runtime=runtime)
+                    for _ in range(2)
+                ),
+                return_exceptions=True,
+            )
+
+        leader, follower = asyncio.run(run())
+
+        self.assertEqual(leader, "Interpretation #1")
+        self.assertIsInstance(follower, AIInterpretationError)
+
+
+if __name__ == "__main__":
+    unittest.main()
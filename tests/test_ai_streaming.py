@@ -0,0 +1,153 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+
+from ai_integration import (
+    AIInterpretationError,
+    AIRateLimitError,
+    AISettings,
+    build_http_client,
+    get_ai_interpretation,
+    stream_ai_interpretation,
+)
+from tests.test_ai_integration import make_reading
+
+
+class FakeStreamingHandler(BaseHTTPRequestHandler):
+    """Serves canned chat-completions responses as server-sent events."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+
+        if self.server.status != 200:
+            self.send_response(self.server.status)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": {"message": "Too many requests"}}).encode("utf-8"))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for delta in self.server.deltas:
+            chunk = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class KeepAliveCompletionHandler(BaseHTTPRequestHandler):
+    """Serves non-streaming completions over persistent HTTP/1.1 connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.client_ports.append(self.client_address[1])
+        payload = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "Steady progress."},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAIConnectionReuse(unittest.TestCase):
+    def test_pooled_client_reuses_one_connection_for_sequential_requests(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveCompletionHandler)
+        server.client_ports = []
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        client = openai.OpenAI(
+            api_key="sk-test",
+            base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+            max_retries=0,
+            http_client=build_http_client(AISettings()),
+        )
+        self.addCleanup(client.close)
+
+        results = [get_ai_interpretation(make_reading(), client) for _ in range(3)]
+
+        self.assertEqual(results, ["Steady progress."] * 3)
+        self.assertEqual(len(server.client_ports), 3)
+        self.assertEqual(len(set(server.client_ports)), 1)
+
+
+class TestAIStreaming(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStreamingHandler)
+        self.server.requests = []
+        self.server.deltas = ["Stillness ", "before ", "action."]
+        self.server.status = 200
+        threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        self.client = openai.OpenAI(
+            api_key="sk-test",
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            max_retries=0,
+        )
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_stream_yields_content_deltas_in_order(self):
+        deltas = list(stream_ai_interpretation(make_reading(), self.client))
+
+        self.assertEqual(deltas, ["Stillness ", "before ", "action."])
+        self.assertTrue(self.server.requests[0]["stream"])
+        self.assertEqual(self.server.requests[0]["model"], "gpt-4o-mini")
+
+    def test_stream_maps_rate_limit_responses(self):
+        self.server.status = 429
+
+        with self.assertRaisesRegex(AIRateLimitError, "rate limit exceeded"):
+            list(stream_ai_interpretation(make_reading(), self.client))
+
+    def test_stream_maps_server_errors(self):
+        self.server.status = 500
+
+        with self.assertRaises(AIInterpretationError) as raised:
+            list(stream_ai_interpretation(make_reading(), self.client, settings=AISettings()))
+
+        self.assertNotIsInstance(raised.exception, AIRateLimitError)
+
+
+if __name__ == "__main__":
+    unittest.main()
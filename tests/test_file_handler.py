@@ -1,13 +1,20 @@
+import json
 import tempfile
 import unittest
+import zipfile
 from pathlib import Path
 from unittest.mock import patch
 
 import pandas as pd
 
 from file_handler import (
+    JournalExportError,
     JournalValidationError,
     enrich_journal,
+    export_journal,
+    get_journal_version,
+    iter_journal_csv,
+    iter_journal_markdown,
     journal_to_markdown,
     load_journal,
     parse_lines,
@@ -120,6 +127,28 @@ class TestFileHandler(unittest.TestCase):
             with patch("file_handler.JOURNAL_FILE", str(journal_path)):
                 self.assertTrue(load_journal().empty)
 
+    def test_get_journal_version_changes_when_journal_is_written(self):
+        reading = {
+            "timestamp": "2026-05-03 14:30:00",
+            "question": "What needs attention?",
+            "lines": [6, 7, 8, 9, 7, 8],
+            "primary_hex": SAMPLE_ICHING_DATA["1"],
+            "secondary_hex": None,
+        }
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_path = Path(temp_dir) / "journal.csv"
+
+            with patch("file_handler.JOURNAL_FILE", str(journal_path)):
+                self.assertIsNone(get_journal_version())
+                save_reading_to_csv(reading)
+                first_version = get_journal_version()
+                save_reading_to_csv(reading)
+                second_version = get_journal_version()
+
+        self.assertIsNotNone(first_version)
+        self.assertNotEqual(first_version, second_version)
+
     def test_load_journal_raises_for_malformed_csv(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             journal_path = Path(temp_dir) / "journal.csv"
@@ -254,6 +283,97 @@ class TestFileHandler(unittest.TestCase):
         self.assertIn("### AI Contemplation", markdown)
         self.assertIn("Notice the pattern.", markdown)
 
+    def test_chunked_exports_match_whole_frame_exports(self):
+        journal_df = pd.DataFrame(
+            [
+                {
+                    "Date": f"2026-05-0{day} 14:30:00",
+                    "Question": f"Question {day}",
+                    "Lines": "6,7,8,9,7,8",
+                    "Primary Hexagram": "1: The Creative",
+                    "Evolving Hexagram": None if day % 2 else "2: The Receptive",
+                    "AI Interpretation": None if day % 2 else "Notice the pattern.",
+                }
+                for day in range(1, 6)
+            ]
+        )
+
+        csv_chunks = list(iter_journal_csv(journal_df, chunk_rows=2))
+        markdown_chunks = list(iter_journal_markdown(journal_df, chunk_rows=2))
+
+        self.assertEqual(len(csv_chunks), 4)
+        self.assertEqual("".join(csv_chunks), journal_df.to_csv(index=False))
+        self.assertEqual(len(markdown_chunks), 4)
+        self.assertEqual("".join(markdown_chunks), journal_to_markdown(journal_df))
+        self.assertIn("## 2026-05-02 14:30:00 - Question 2", markdown_chunks[1])
+
+    def make_export_df(self):
+        return pd.DataFrame(
+            [
+                {
+                    "Entry ID": f"entry-{number}",
+                    "Date": "2026-05-03 14:30:00",
+                    "Question": f"Question {number}",
+                    "Lines": "6,7,8,9,7,8",
+                    "Primary Hexagram Number": 1,
+                    "Evolving Hexagram Number": 2 if number == 2 else None,
+                    "AI Interpretation": "Notice the pattern." if number == 2 else None,
+                    "Favorite": False,
+                    "Archived": False,
+                    "Date Parsed": pd.Timestamp("2026-05-03 14:30:00"),
+                }
+                for number in range(1, 4)
+            ]
+        )
+
+    def test_export_journal_writes_jsonl_records(self):
+        export_path = export_journal(self.make_export_df(), "JSONL", chunk_rows=2)
+        try:
+            records = [
+                json.loads(line)
+                for line in export_path.read_text(encoding="utf-8").splitlines()
+            ]
+        finally:
+            export_path.unlink()
+
+        self.assertEqual([record["Entry ID"] for record in records], ["entry-1", "entry-2", "entry-3"])
+        self.assertNotIn("Date Parsed", records[0])
+
+    def test_export_journal_writes_parquet_row_groups(self):
+        import pyarrow.parquet as pq
+
+        export_path = export_journal(self.make_export_df(), "Parquet", chunk_rows=2)
+        try:
+            parquet_file = pq.ParquetFile(export_path)
+            table = parquet_file.read()
+        finally:
+            export_path.unlink()
+
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        self.assertEqual(table.column("Question").to_pylist(), ["Question 1", "Question 2", "Question 3"])
+
+    def test_export_journal_bundle_includes_referenced_hexagrams(self):
+        export_path = export_journal(
+            self.make_export_df(),
+            "Zip bundle",
+            iching_data=SAMPLE_ICHING_DATA,
+            chunk_rows=2,
+        )
+        try:
+            with zipfile.ZipFile(export_path) as bundle:
+                journal_lines = bundle.read("journal.jsonl").decode("utf-8").splitlines()
+                hexagrams = json.loads(bundle.read("hexagrams.json"))
+        finally:
+            export_path.unlink()
+
+        self.assertEqual(len(journal_lines), 3)
+        self.assertEqual(set(hexagrams), {"1", "2"})
+        self.assertEqual(hexagrams["2"]["name_en"], "The Receptive")
+
+    def test_export_journal_rejects_unknown_format(self):
+        with self.assertRaisesRegex(JournalExportError, "Unknown journal export format"):
+            export_journal(self.make_export_df(), "XML")
+
     def test_reconstruct_reading_from_row_restores_saved_reading_shape(self):
         row = pd.Series(
             {
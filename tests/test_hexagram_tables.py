@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+from hexagram_tables import TRIGRAM_NAMES, encode_line_values, get_hexagram_tables, lookup_by_number
+
+
+class TestHexagramTables(unittest.TestCase):
+    def test_code_and_number_tables_round_trip(self):
+        tables = get_hexagram_tables()
+
+        for number in range(1, 65):
+            with self.subTest(number=number):
+                self.assertEqual(tables.number_for_code(tables.code_for_number(number)), number)
+
+    def test_trigrams_split_lower_and_upper_lines(self):
+        tables = get_hexagram_tables()
+
+        # Hexagram 48, The Well: Water above Wind.
+        self.assertEqual(TRIGRAM_NAMES[tables.lower_trigram[47]], "Wind ☴")
+        self.assertEqual(TRIGRAM_NAMES[tables.upper_trigram[47]], "Water ☵")
+
+    def test_relationship_tables_follow_the_classical_derivations(self):
+        tables = get_hexagram_tables()
+
+        # Difficulty at the Beginning: nuclear 23, inverse 4, complement 50.
+        self.assertEqual((tables.nuclear[2], tables.inverse[2], tables.complementary[2]), (23, 4, 50))
+        # After Completion: every relation leads to Before Completion.
+        self.assertEqual((tables.nuclear[62], tables.inverse[62], tables.complementary[62]), (64, 64, 64))
+        self.assertEqual(tables.label_for_number(1), "1: The Creative")
+
+        numbers = np.arange(1, 65)
+        np.testing.assert_array_equal(tables.inverse[tables.inverse - 1], numbers)
+        np.testing.assert_array_equal(tables.complementary[tables.complementary - 1], numbers)
+        self.assertEqual(len(np.unique(tables.nuclear)), 16)
+
+    def test_lookup_by_number_marks_missing_hexagrams(self):
+        tables = get_hexagram_tables()
+
+        values = lookup_by_number(tables.complementary, [1, float("nan"), 65, 2])
+
+        self.assertEqual(values.tolist(), [2, -1, -1, 1])
+
+    def test_encode_line_values_derives_primary_and_evolving_codes(self):
+        primary_codes, evolving_codes, changing = encode_line_values([[6, 7, 8, 9, 7, 8]])
+
+        self.assertEqual(format(int(primary_codes[0]), "06b"), "010110")
+        self.assertEqual(format(int(evolving_codes[0]), "06b"), "110010")
+        self.assertEqual(changing[0].tolist(), [True, False, False, True, False, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
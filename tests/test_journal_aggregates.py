@@ -0,0 +1,134 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from file_handler import (
+    JournalChange,
+    get_journal_version,
+    load_journal,
+    save_reading_to_csv,
+    update_journal_entry_flags,
+)
+from journal_aggregates import (
+    JOURNAL_AGGREGATES,
+    JournalAggregates,
+    JournalAggregateStore,
+    count_hexagram_numbers,
+    get_journal_aggregates,
+    top_hexagram_counts,
+)
+
+
+SAMPLE_ICHING_DATA = {
+    "1": {"number": 1, "name_en": "The Creative"},
+    "2": {"number": 2, "name_en": "The Receptive"},
+}
+
+
+def make_reading(primary_number, secondary_number=None, lines=None):
+    return {
+        "timestamp": "2026-05-03 14:30:00",
+        "question": "What needs attention?",
+        "lines": lines or [7, 7, 7, 7, 7, 7],
+        "primary_hex": {"number": primary_number},
+        "secondary_hex": {"number": secondary_number} if secondary_number else None,
+        "ai_interpretation": None,
+    }
+
+
+class TestJournalAggregates(unittest.TestCase):
+    def setUp(self):
+        JOURNAL_AGGREGATES.clear()
+
+    def tearDown(self):
+        JOURNAL_AGGREGATES.clear()
+
+    def test_from_journal_counts_hexagrams_months_and_flags(self):
+        journal_df = pd.DataFrame(
+            [
+                {
+                    "Date": "2026-05-03 14:30:00",
+                    "Lines": "6,7,8,9,7,8",
+                    "Primary Hexagram Number": 1,
+                    "Evolving Hexagram Number": 2,
+                    "AI Interpretation": "Notice the pattern.",
+                    "Favorite": True,
+                    "Archived": False,
+                },
+                {
+                    "Date": "2026-06-01 09:00:00",
+                    "Lines": "7,7,7,7,7,7",
+                    "Primary Hexagram Number": 1,
+                    "Evolving Hexagram Number": None,
+                    "AI Interpretation": None,
+                    "Favorite": False,
+                    "Archived": True,
+                },
+            ]
+        )
+
+        aggregates = JournalAggregates.from_journal(journal_df)
+
+        self.assertEqual(aggregates.total, 2)
+        self.assertEqual(len(aggregates.primary_counts), 64)
+        self.assertEqual(aggregates.primary_counts[0], 2)
+        self.assertEqual(aggregates.evolving_counts[1], 1)
+        self.assertEqual(aggregates.visible_primary_counts()[0], 1)
+        self.assertEqual(aggregates.month_counts, {"2026-05": 1, "2026-06": 1})
+        self.assertEqual(aggregates.flag_counts["Favorite"], 1)
+        self.assertEqual(aggregates.flag_counts["Archived"], 1)
+        self.assertEqual(aggregates.flag_counts["Has AI Contemplation"], 1)
+        self.assertEqual(aggregates.flag_counts["Has Changing Lines"], 1)
+
+    def test_saves_and_flag_changes_update_aggregates_incrementally(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_path = Path(temp_dir) / "journal.csv"
+
+            with patch("file_handler.JOURNAL_FILE", str(journal_path)):
+                save_reading_to_csv(make_reading(1))
+                get_journal_aggregates(get_journal_version(), load_journal())
+
+                save_reading_to_csv(make_reading(2, 1, lines=[6, 8, 8, 8, 8, 8]))
+                entry_id = load_journal().loc[0, "Entry ID"]
+                update_journal_entry_flags(entry_id, archived=True)
+
+                version = get_journal_version()
+                with patch.object(JournalAggregates, "from_journal") as rebuild:
+                    aggregates = get_journal_aggregates(version, load_journal())
+                rebuild.assert_not_called()
+                rebuilt = JournalAggregates.from_journal(load_journal())
+
+        self.assertEqual(aggregates.total, 2)
+        np.testing.assert_array_equal(aggregates.primary_counts, rebuilt.primary_counts)
+        np.testing.assert_array_equal(aggregates.evolving_counts, rebuilt.evolving_counts)
+        np.testing.assert_array_equal(
+            aggregates.visible_primary_counts(),
+            rebuilt.visible_primary_counts(),
+        )
+        self.assertEqual(aggregates.flag_counts, rebuilt.flag_counts)
+
+    def test_store_drops_aggregates_for_changes_from_an_unknown_version(self):
+        store = JournalAggregateStore()
+        store.get(("v", 1), pd.DataFrame())
+
+        store.apply_change(JournalChange(("v", 9), ("v", 10), added_records=({},)))
+
+        with patch.object(JournalAggregates, "from_journal", return_value="rebuilt") as rebuild:
+            self.assertEqual(store.get(("v", 10), pd.DataFrame()), "rebuilt")
+        rebuild.assert_called_once()
+
+    def test_top_hexagram_counts_labels_most_common_hexagrams(self):
+        counts = count_hexagram_numbers([2, 2, 1, None, 99])
+
+        top_counts = top_hexagram_counts(counts, SAMPLE_ICHING_DATA, limit=3)
+
+        self.assertEqual(list(top_counts.index), ["2: The Receptive", "1: The Creative"])
+        self.assertEqual(list(top_counts), [2, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from hexagram_tables import get_hexagram_tables
+from journal_analytics import compute_journal_analytics, encode_journal, parse_line_column
+
+
+class TestJournalAnalytics(unittest.TestCase):
+    def make_journal_df(self):
+        return pd.DataFrame(
+            {
+                "Date": [
+                    "2026-05-03 14:30:00",
+                    "2026-05-20 09:00:00",
+                    "2026-06-01 08:00:00",
+                    "not-a-date",
+                    "2026-06-02 08:00:00",
+                ],
+                "Lines": [
+                    "7,7,7,7,7,7",
+                    "9,7,7,7,7,7",
+                    "8, 8, 8, 8, 8, 8",
+                    "6,8,8,8,8,8",
+                    "6,7,8",
+                ],
+            }
+        )
+
+    def test_parse_line_column_accepts_canonical_and_spaced_lines(self):
+        valid, digits = parse_line_column(self.make_journal_df()["Lines"])
+
+        self.assertEqual(valid.tolist(), [True, True, True, True, False])
+        self.assertEqual(digits[2].tolist(), [8, 8, 8, 8, 8, 8])
+
+    def test_compute_journal_analytics_counts_transitions_lines_and_months(self):
+        tables = get_hexagram_tables()
+        encoded = encode_journal(self.make_journal_df(), tables)
+
+        analytics = compute_journal_analytics(encoded, tables)
+
+        self.assertEqual(analytics.reading_count, 4)
+        self.assertEqual(analytics.skipped_rows, 1)
+        self.assertEqual(analytics.month_labels, ("2026-05", "2026-06"))
+        self.assertEqual(analytics.monthly_counts[0, 0], 2)
+        self.assertEqual(analytics.monthly_counts[1, 1], 1)
+        self.assertEqual(analytics.monthly_counts.sum(), 3)
+
+        creative_to_evolving = tables.number_for_code(int("011111", 2)) - 1
+        receptive_to_evolving = tables.number_for_code(int("100000", 2)) - 1
+        self.assertEqual(analytics.transition_counts[0, creative_to_evolving], 1)
+        self.assertEqual(analytics.transition_counts[1, receptive_to_evolving], 1)
+        self.assertEqual(analytics.transition_counts.sum(), 2)
+
+        np.testing.assert_array_equal(analytics.line_change_counts, [2, 0, 0, 0, 0, 0])
+        self.assertEqual(analytics.trigram_counts[0b111, 0b111], 2)
+        self.assertEqual(analytics.trigram_counts[0b000, 0b000], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
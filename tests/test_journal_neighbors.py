@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from journal_neighbors import (
+    INVALID_READING_CODE,
+    TRIGRAM_MATCH_EITHER,
+    TRIGRAM_MATCH_LOWER,
+    TRIGRAM_MATCH_UPPER,
+    encode_reading_codes,
+    find_journal_neighbors,
+    neighbor_mask,
+    reading_code,
+    reading_distances,
+)
+from journal_ui import SORT_CLOSEST_FIRST, apply_journal_filters, make_filter_cache_key
+
+
+def make_journal_df(lines_by_id):
+    return pd.DataFrame(
+        [
+            {
+                "Entry ID": entry_id,
+                "Date Parsed": pd.Timestamp("2026-05-01") + pd.Timedelta(days=position),
+                "Lines": lines,
+                "Archived": False,
+            }
+            for position, (entry_id, lines) in enumerate(lines_by_id.items())
+        ]
+    )
+
+
+class TestReadingCodes(unittest.TestCase):
+    def test_codes_pack_primary_and_evolving_lines(self):
+        self.assertEqual(reading_code([7, 7, 7, 7, 7, 7]), 0b111111_111111)
+        self.assertEqual(reading_code([9, 8, 8, 8, 8, 8]), 0b100000_000000)
+        self.assertEqual(reading_code([6, 7, 8, 9, 7, 8]), 0b010110_110010)
+
+    def test_column_encoding_marks_unparseable_rows(self):
+        codes = encode_reading_codes(pd.Series(["7,7,7,7,7,7", "7,7,7", None, "6, 7, 8, 9, 7, 8"]))
+
+        self.assertEqual(codes.tolist(), [0b111111_111111, INVALID_READING_CODE, INVALID_READING_CODE, 0b010110_110010])
+
+    def test_distances_count_differing_primary_and_evolving_lines(self):
+        codes = encode_reading_codes(pd.Series(["7,7,7,7,7,7", "9,7,7,7,7,7", "8,7,7,7,7,7", "x"]))
+
+        distances = reading_distances(codes, reading_code([7, 7, 7, 7, 7, 7]))
+
+        self.assertEqual(distances[:3].tolist(), [0, 1, 2])
+        self.assertGreater(distances[3], 12)
+
+    def test_trigram_matches_use_the_primary_hexagram(self):
+        # Heaven over Earth, Earth over Heaven, and Heaven doubled; all without changing lines.
+        codes = encode_reading_codes(pd.Series(["8,8,8,7,7,7", "7,7,7,8,8,8", "7,7,7,7,7,7", "bad"]))
+        query = reading_code([8, 8, 8, 7, 7, 7])
+
+        self.assertEqual(neighbor_mask(codes, query, trigram_match=TRIGRAM_MATCH_UPPER).tolist(), [True, False, True, False])
+        self.assertEqual(neighbor_mask(codes, query, trigram_match=TRIGRAM_MATCH_LOWER).tolist(), [True, False, False, False])
+        self.assertEqual(neighbor_mask(codes, query, trigram_match=TRIGRAM_MATCH_EITHER).tolist(), [True, False, True, False])
+
+
+class TestJournalNeighborQueries(unittest.TestCase):
+    def test_find_neighbors_returns_nearest_first(self):
+        journal_df = make_journal_df(
+            {
+                "far": "8,8,8,8,8,8",
+                "two": "9,9,7,7,7,7",
+                "same": "7,7,7,7,7,7",
+                "one": "9,7,7,7,7,7",
+            }
+        )
+
+        neighbors_df = find_journal_neighbors(journal_df, [7, 7, 7, 7, 7, 7], max_distance=2)
+
+        self.assertEqual(neighbors_df["Entry ID"].tolist(), ["same", "one", "two"])
+        self.assertEqual(neighbors_df["Line Distance"].tolist(), [0, 1, 2])
+
+    def test_journal_filter_keeps_neighbors_and_can_sort_by_distance(self):
+        journal_df = make_journal_df({"same": "7,7,7,7,7,7", "far": "8,8,8,8,8,8", "one": "9,7,7,7,7,7"})
+        query = reading_code([7, 7, 7, 7, 7, 7])
+
+        newest = apply_journal_filters(journal_df, neighbor_code=query, max_line_distance=1)
+        closest = apply_journal_filters(
+            journal_df,
+            neighbor_code=query,
+            max_line_distance=1,
+            sort_order=SORT_CLOSEST_FIRST,
+            reading_codes=encode_reading_codes(journal_df["Lines"]),
+        )
+
+        self.assertEqual(newest["Entry ID"].tolist(), ["one", "same"])
+        self.assertEqual(closest["Entry ID"].tolist(), ["same", "one"])
+        self.assertNotIn("Line Distance", closest.columns)
+        self.assertNotEqual(
+            make_filter_cache_key(1, {"neighbor_code": query, "max_line_distance": 1}),
+            make_filter_cache_key(1, {"neighbor_code": query, "max_line_distance": 2}),
+        )
+
+    def test_scan_handles_a_million_rows(self):
+        codes = np.random.default_rng(7).integers(0, 1 << 12, size=1_000_000, dtype=np.uint16)
+
+        mask = neighbor_mask(codes, 0b101010_010101, max_distance=2)
+
+        # 1 + 12 + 66 of the 4096 codes lie within two bits of any code.
+        self.assertAlmostEqual(mask.mean(), 79 / 4096, delta=0.002)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+from file_handler import (
+    get_journal_version,
+    load_journal,
+    save_reading_to_csv,
+    update_journal_ai_interpretations,
+    update_journal_entry_flags,
+)
+from journal_similarity import (
+    JOURNAL_SIMILARITY,
+    JournalSimilarityIndex,
+    find_similar_readings,
+    tokenize,
+)
+
+
+def make_record(entry_id, question, primary=1, evolving=None, ai_text=None, archived=False):
+    return {
+        "Entry ID": entry_id,
+        "Date": "2026-05-03 14:30:00",
+        "Question": question,
+        "AI Interpretation": ai_text,
+        "Primary Hexagram Number": primary,
+        "Evolving Hexagram Number": evolving,
+        "Archived": archived,
+    }
+
+
+def make_reading(question, primary_number=1, secondary_number=None, ai_interpretation=None):
+    return {
+        "timestamp": "2026-05-03 14:30:00",
+        "question": question,
+        "lines": [7, 7, 7, 7, 7, 7],
+        "primary_hex": {"number": primary_number},
+        "secondary_hex": {"number": secondary_number} if secondary_number else None,
+        "ai_interpretation": ai_interpretation,
+    }
+
+
+class TestJournalSimilarityIndex(unittest.TestCase):
+    def test_tokenize_drops_stop_words_and_missing_text(self):
+        self.assertEqual(tokenize("What should I do about my Career's next step?"), ["career's", "next", "step"])
+        self.assertEqual(tokenize(None), [])
+        self.assertEqual(tokenize(float("nan")), [])
+
+    def test_search_ranks_by_shared_rare_terms(self):
+        index = JournalSimilarityIndex.from_journal(
+            pd.DataFrame(
+                [
+                    make_record("career", "Should I change my career path?", primary=5),
+                    make_record("garden", "How will the garden grow?", primary=6),
+                    make_record("move", "Should I move abroad for a new career?", primary=7),
+                    make_record("rest", "How can I rest?", primary=8),
+                ]
+            )
+        )
+
+        results = index.search("Is a career change right for me?", k=2)
+
+        self.assertEqual([result.entry_id for result in results], ["career", "move"])
+        self.assertGreater(results[0].score, results[1].score)
+        self.assertEqual(results[0].question, "Should I change my career path?")
+
+    def test_shared_hexagrams_boost_matches(self):
+        index = JournalSimilarityIndex()
+        index.add_record(make_record("a", "Finding balance at work", primary=11, evolving=32))
+        index.add_record(make_record("b", "Finding balance at work", primary=12))
+        index.add_record(make_record("c", "Unrelated words entirely", primary=11))
+
+        results = index.search("balance at work", primary_number=11, evolving_number=32)
+
+        self.assertEqual([result.entry_id for result in results], ["a", "b", "c"])
+
+    def test_updates_replace_entries_and_archived_entries_are_hidden(self):
+        index = JournalSimilarityIndex()
+        index.add_record(make_record("a", "A question about travel"))
+        index.add_record(make_record("b", "A question about travel"))
+
+        index.add_record(make_record("a", "A question about travel", ai_text="Journeys teach patience."))
+        index.add_record(make_record("b", "A question about travel", archived=True))
+
+        results = index.search("patience on journeys")
+        self.assertEqual([result.entry_id for result in results], ["a"])
+        self.assertEqual(index.active_count, 1)
+        self.assertEqual(index.search("travel", exclude_entry_ids=("a",)), [])
+
+
+class TestJournalSimilarityStore(unittest.TestCase):
+    def setUp(self):
+        JOURNAL_SIMILARITY.clear()
+
+    def tearDown(self):
+        JOURNAL_SIMILARITY.clear()
+
+    def test_saves_and_edits_update_the_index_without_rebuilding(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal_path = Path(temp_dir) / "journal.csv"
+
+            with patch("file_handler.JOURNAL_FILE", str(journal_path)):
+                first_id = save_reading_to_csv(make_reading("How do I mend a friendship?", 3))
+                find_similar_readings(make_reading("friendship"), get_journal_version(), load_journal)
+
+                second_id = save_reading_to_csv(make_reading("Is my friendship with Sam worth the effort?", 4))
+                update_journal_ai_interpretations({first_id: "Gentle honesty restores trust."})
+                update_journal_entry_flags(second_id, favorite=True)
+
+                with patch.object(JournalSimilarityIndex, "from_journal") as rebuild:
+                    results = find_similar_readings(
+                        make_reading("Can trust be restored in a friendship?"),
+                        get_journal_version(),
+                        load_journal,
+                    )
+                rebuild.assert_not_called()
+
+        self.assertEqual([result.entry_id for result in results], [first_id, second_id])
+
+    def test_saved_reading_is_not_listed_as_related_to_itself(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch("file_handler.JOURNAL_FILE", str(Path(temp_dir) / "journal.csv")):
+                reading = make_reading("Where should my energy go?")
+                reading["entry_id"] = save_reading_to_csv(reading)
+
+                results = find_similar_readings(reading, get_journal_version(), load_journal)
+
+        self.assertEqual(results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,37 @@
+import tempfile
 import unittest
+from concurrent.futures import Future
 from datetime import date
+from pathlib import Path
+from unittest.mock import patch
 
 import pandas as pd
+from streamlit.testing.v1 import AppTest
 
-from journal_ui import apply_journal_filters
+from journal_ui import (
+    JournalFilterCache,
+    apply_journal_filters,
+    get_filtered_entry_ids,
+    paginate_journal,
+    select_journal_entries,
+)
+
+
+def render_prepared_export():
+    import pandas as pd
+
+    from journal_ui import render_journal_sidebar_exports
+
+    render_journal_sidebar_exports(pd.DataFrame({"Question": ["What now?"]}))
+
+
+def make_finished_export(result=None, exception=None):
+    future = Future()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return {"key": (None, "CSV"), "future": future}
 
 
 class TestJournalUI(unittest.TestCase):
@@ -11,22 +39,28 @@ class TestJournalUI(unittest.TestCase):
         return pd.DataFrame(
             [
                 {
+                    "Entry ID": "first",
                     "Date Parsed": pd.Timestamp("2026-05-01"),
                     "Question": "What should I continue?",
                     "AI Interpretation": "",
                     "Primary Hexagram": "1: The Creative",
                     "Evolving Hexagram": None,
+                    "Primary Hexagram Number": 1,
+                    "Evolving Hexagram Number": None,
                     "Favorite": True,
                     "Archived": False,
                     "Has AI Contemplation": False,
                     "Has Changing Lines": False,
                 },
                 {
+                    "Entry ID": "second",
                     "Date Parsed": pd.Timestamp("2026-05-02"),
                     "Question": "What should I release?",
                     "AI Interpretation": "Let the old pattern rest.",
                     "Primary Hexagram": "2: The Receptive",
-                    "Evolving Hexagram": None,
+                    "Evolving Hexagram": "1: The Creative",
+                    "Primary Hexagram Number": 2,
+                    "Evolving Hexagram Number": 1,
                     "Favorite": False,
                     "Archived": True,
                     "Has AI Contemplation": True,
@@ -69,6 +103,99 @@ class TestJournalUI(unittest.TestCase):
             ["What should I continue [literally]?"],
         )
 
+    def test_apply_journal_filters_uses_hexagram_relationships(self):
+        journal_df = self.make_journal_df()
+
+        by_nuclear = apply_journal_filters(journal_df, nuclear_filter="1: The Creative", show_archived=True)
+        by_trigram = apply_journal_filters(journal_df, upper_trigram_filter="Earth ☷", show_archived=True)
+        by_relation = apply_journal_filters(
+            journal_df,
+            relation_filter="Complement of the primary",
+            show_archived=True,
+        )
+
+        self.assertEqual(list(by_nuclear["Entry ID"]), ["first"])
+        self.assertEqual(list(by_trigram["Entry ID"]), ["second"])
+        self.assertEqual(list(by_relation["Entry ID"]), ["second"])
+
+    def test_get_filtered_entry_ids_reuses_cached_result_for_same_version(self):
+        journal_df = self.make_journal_df()
+        cache = JournalFilterCache()
+        filters = {"show_archived": True, "sort_order": "Oldest first"}
+
+        first_ids = get_filtered_entry_ids(journal_df, ("v", 1), filters, cache=cache)
+        with patch("journal_ui.apply_journal_filters") as apply_filters:
+            second_ids = get_filtered_entry_ids(journal_df, ("v", 1), filters, cache=cache)
+
+        apply_filters.assert_not_called()
+        self.assertEqual(first_ids, ("first", "second"))
+        self.assertEqual(second_ids, first_ids)
+
+    def test_get_filtered_entry_ids_recomputes_after_journal_version_changes(self):
+        journal_df = self.make_journal_df()
+        cache = JournalFilterCache()
+
+        get_filtered_entry_ids(journal_df, ("v", 1), {}, cache=cache)
+        journal_df.loc[1, "Archived"] = False
+        entry_ids = get_filtered_entry_ids(journal_df, ("v", 2), {}, cache=cache)
+
+        self.assertEqual(entry_ids, ("second", "first"))
+
+    def test_filter_cache_evicts_least_recently_used_by_total_size(self):
+        cache = JournalFilterCache(max_entries=10, max_total_ids=4)
+        cache.put("a", ["1", "2"])
+        cache.put("b", ["3", "4"])
+        cache.get("a")
+        cache.put("c", ["5"])
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ("1", "2"))
+        self.assertEqual(cache.get("c"), ("5",))
+        self.assertEqual(cache.total_ids, 3)
+
+    def test_select_journal_entries_preserves_cached_order(self):
+        selected_df = select_journal_entries(self.make_journal_df(), ("second", "first"))
+
+        self.assertEqual(list(selected_df["Entry ID"]), ["second", "first"])
+
+    def test_paginate_journal_returns_requested_window_and_clamps_page(self):
+        journal_df = pd.DataFrame({"Entry ID": [str(number) for number in range(7)]})
+
+        page_df, page, page_count = paginate_journal(journal_df, page=2, page_size=3)
+        self.assertEqual(list(page_df["Entry ID"]), ["3", "4", "5"])
+        self.assertEqual((page, page_count), (2, 3))
+
+        page_df, page, _ = paginate_journal(journal_df, page=9, page_size=3)
+        self.assertEqual(list(page_df["Entry ID"]), ["6"])
+        self.assertEqual(page, 3)
+
+    def test_prepared_export_is_held_in_memory_and_its_file_deleted(self):
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as export_file:
+            export_file.write(b"Question\nWhat now?\n")
+        export_path = Path(export_file.name)
+        self.addCleanup(export_path.unlink, missing_ok=True)
+
+        app = AppTest.from_function(render_prepared_export)
+        app.session_state["journal_export"] = make_finished_export(export_path)
+        app.run()
+        app.run()
+
+        self.assertFalse(app.exception)
+        self.assertFalse(export_path.exists())
+        self.assertEqual(app.session_state["journal_export"]["data"], b"Question\nWhat now?\n")
+
+    def test_unexpected_export_failure_is_logged_and_discarded(self):
+        app = AppTest.from_function(render_prepared_export)
+        app.session_state["journal_export"] = make_finished_export(exception=OSError("disk full"))
+
+        with self.assertLogs(level="ERROR") as logs:
+            app.run()
+
+        self.assertFalse(app.exception)
+        self.assertIn("disk full", logs.output[0])
+        self.assertEqual(app.error[0].value, "Could not prepare the CSV export. Please try again.")
+        self.assertNotIn("journal_export", app.session_state)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from streamlit.testing.v1 import AppTest
+
+
+def render_page_with_repeated_assets():
+    from page_assets import inject_once, start_page_render
+
+    start_page_render()
+    for _ in range(3):
+        inject_once("styles", "<style>.card{margin:0;}</style>")
+    inject_once("sprite", "<svg></svg>")
+
+
+def render_without_page_render():
+    from page_assets import inject_once
+
+    inject_once("styles", "<style>.card{margin:0;}</style>")
+    inject_once("styles", "<style>.card{margin:0;}</style>")
+
+
+class TestPageAssets(unittest.TestCase):
+    def test_each_asset_is_sent_once_per_page_render(self):
+        app = AppTest.from_function(render_page_with_repeated_assets)
+
+        for _ in range(2):
+            app.run()
+            self.assertEqual([element.value for element in app.markdown], ["<style>.card{margin:0;}</style>", "<svg></svg>"])
+
+    def test_assets_are_always_sent_outside_a_page_render(self):
+        app = AppTest.from_function(render_without_page_render).run()
+
+        self.assertEqual(len(app.markdown), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
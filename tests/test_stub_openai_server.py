@@ -0,0 +1,127 @@
+import statistics
+import unittest
+
+import openai
+
+from ai_integration import (
+    RATE_LIMIT_ATTEMPTS,
+    AIConfig,
+    AIInterpretationError,
+    AIRateLimitError,
+    AIRuntime,
+    AISettings,
+    build_ai_config,
+    close_shared_clients,
+    get_ai_interpretation,
+    get_shared_client,
+    retry_after_seconds,
+    stream_ai_interpretation,
+)
+from ai_rate_limit import AIRateLimiter
+from stub_openai_server import StubOpenAIServer, StubServerConfig
+from tests.test_ai_integration import make_reading
+
+
+class TestStubOpenAIServer(unittest.TestCase):
+    def start_server(self, **config):
+        server = StubOpenAIServer(StubServerConfig(latency_ms=0, seed=7, **config)).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        return server
+
+    def make_client(self, server, timeout_seconds=5):
+        ai_config = AIConfig(
+            api_key="stub",
+            settings=AISettings(timeout_seconds=timeout_seconds, max_retries=0),
+            base_url=server.base_url,
+        )
+        client = openai.OpenAI(**ai_config.client_kwargs())
+        self.addCleanup(client.close)
+        return client, ai_config.settings
+
+    def test_completions_and_streams_return_the_same_stub_text(self):
+        server = self.start_server(response_tokens=12)
+        client, settings = self.make_client(server)
+
+        text = get_ai_interpretation(make_reading(), client, settings=settings)
+        deltas = list(stream_ai_interpretation(make_reading(), client, settings=settings))
+
+        self.assertTrue(text.startswith("[stub:"))
+        self.assertEqual(len(text.split()), 12)
+        self.assertEqual(len(deltas), 12)
+        self.assertEqual("".join(deltas), text)
+        self.assertEqual(server.stats["requests"], 2)
+
+    def test_injected_rate_limits_carry_retry_after(self):
+        server = self.start_server(rate_limit_rate=1, retry_after_seconds=2)
+        client, settings = self.make_client(server)
+
+        with self.assertRaises(AIRateLimitError) as raised:
+            get_ai_interpretation(make_reading(), client, settings=settings)
+
+        self.assertEqual(retry_after_seconds(raised.exception), 2.0)
+        self.assertEqual(server.stats["rate_limit"], 1)
+
+    def test_injected_server_errors_and_timeouts_surface_as_interpretation_errors(self):
+        server = self.start_server(server_error_rate=0.5, timeout_rate=0.5, timeout_hold_seconds=1)
+        client, settings = self.make_client(server, timeout_seconds=1)
+
+        for _ in range(4):
+            with self.assertRaises(AIInterpretationError) as raised:
+                get_ai_interpretation(make_reading(), client, settings=settings)
+            self.assertNotIsInstance(raised.exception, AIRateLimitError)
+
+        self.assertEqual(server.stats["server_error"] + server.stats["timeout"], 4)
+        self.assertGreater(server.stats["timeout"], 0)
+
+    def test_persistent_rate_limits_are_retried_only_by_the_limiter(self):
+        server = self.start_server(rate_limit_rate=1, retry_after_seconds=0)
+        ai_config = AIConfig(api_key="stub", settings=AISettings(max_retries=2), base_url=server.base_url)
+        self.addCleanup(close_shared_clients)
+        runtime = AIRuntime(rate_limiter=AIRateLimiter(requests_per_minute=0, tokens_per_minute=0))
+
+        with self.assertRaises(AIRateLimitError):
+            get_ai_interpretation(make_reading(), get_shared_client(ai_config), settings=ai_config.settings, runtime=runtime)
+
+        self.assertEqual(server.stats["requests"], RATE_LIMIT_ATTEMPTS)
+
+    def test_server_errors_are_retried_up_to_max_retries(self):
+        server = self.start_server(server_error_rate=1)
+        ai_config = AIConfig(api_key="stub", settings=AISettings(max_retries=2), base_url=server.base_url)
+        self.addCleanup(close_shared_clients)
+
+        with self.assertRaises(AIInterpretationError):
+            list(stream_ai_interpretation(make_reading(), get_shared_client(ai_config), settings=ai_config.settings))
+
+        self.assertEqual(server.stats["requests"], 3)
+
+    def test_latency_distributions_match_the_configured_mean(self):
+        for distribution in ("fixed", "uniform", "exponential", "lognormal"):
+            with self.subTest(distribution=distribution):
+                server = StubOpenAIServer(
+                    StubServerConfig(latency_ms=100, latency_distribution=distribution, seed=3)
+                )
+                self.addCleanup(server.server_close)
+
+                latencies = [server.draw_outcome()[0] for _ in range(4000)]
+
+                self.assertAlmostEqual(statistics.fmean(latencies), 0.1, delta=0.01)
+
+    def test_config_rejects_unknown_distributions_and_excess_error_rates(self):
+        with self.assertRaises(ValueError):
+            StubServerConfig(latency_distribution="gamma")
+        with self.assertRaises(ValueError):
+            StubServerConfig(rate_limit_rate=0.6, server_error_rate=0.6)
+
+    def test_build_ai_config_reads_base_url(self):
+        config = build_ai_config(
+            secrets=None,
+            environ={"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": "http://127.0.0.1:8001/v1"},
+        )
+
+        self.assertEqual(config.base_url, "http://127.0.0.1:8001/v1")
+        self.assertEqual(config.client_kwargs()["base_url"], "http://127.0.0.1:8001/v1")
+        self.assertNotIn("base_url", build_ai_config(secrets=None, environ={"OPENAI_API_KEY": "sk"}).client_kwargs())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,15 @@
 import unittest
+from unittest.mock import patch
 
-from ui_components import format_changing_lines, get_key_takeaway
+from ui_components import (
+    HEXAGRAM_YANG_SYMBOL,
+    HEXAGRAM_YIN_SYMBOL,
+    build_hexagram_svg,
+    format_changing_lines,
+    get_hexagram_relations,
+    get_hexagram_svg,
+    get_key_takeaway,
+)
 
 
 SAMPLE_PRIMARY_HEX = {
@@ -45,6 +54,37 @@ class TestUIComponents(unittest.TestCase):
         self.assertEqual(format_changing_lines([0, 5]), "lines 1 and 6")
         self.assertEqual(format_changing_lines([0, 2, 5]), "lines 1, 3, and 6")
 
+    def test_get_hexagram_relations_lists_trigrams_and_related_hexagrams(self):
+        relations = dict(get_hexagram_relations(3))
+
+        self.assertEqual(relations["Trigrams"], "Thunder ☳ below, Water ☵ above")
+        self.assertTrue(relations["Nuclear"].startswith("23: Splitting Apart"))
+        self.assertTrue(relations["Inverse"].startswith("4: Youthful Folly"))
+        self.assertTrue(relations["Complementary"].startswith("50: The Cauldron"))
+
+    def test_hexagram_svg_references_sprite_symbols_from_the_bottom_line_up(self):
+        with patch("ui_components.inject_hexagram_sprite") as inject_sprite:
+            svg = get_hexagram_svg([9, 8, 7, 8, 7, 8], [0])
+
+        inject_sprite.assert_called_once()
+        self.assertEqual(svg.count(f'href="#{HEXAGRAM_YANG_SYMBOL}"'), 3)
+        self.assertEqual(svg.count(f'href="#{HEXAGRAM_YIN_SYMBOL}"'), 3)
+        self.assertEqual(svg.count("#ffc107"), 1)
+        self.assertIn(f'<use href="#{HEXAGRAM_YANG_SYMBOL}" x="0" y="125" width="100" height="15" fill="#ffc107">', svg)
+        self.assertNotIn("<rect", svg)
+
+    def test_hexagram_svg_markup_is_shared_by_matching_casts(self):
+        build_hexagram_svg.cache_clear()
+
+        with patch("ui_components.inject_hexagram_sprite"):
+            first = get_hexagram_svg([6, 7, 8, 9, 7, 8], [])
+            second = get_hexagram_svg([8, 9, 6, 7, 9, 6], [])
+            wider = get_hexagram_svg([6, 7, 8, 9, 7, 8], [], line_width=120)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, wider)
+        self.assertEqual(build_hexagram_svg.cache_info().hits, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
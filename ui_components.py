@@ -1,8 +1,28 @@
 import html
+from functools import lru_cache
 
 import streamlit as st
 
 from constants import HEXAGRAM_THEME_SUMMARIES
+from hexagram_tables import HEXAGRAM_COUNT, TRIGRAM_NAMES, get_hexagram_tables
+from page_assets import inject_once
+
+
+HEXAGRAM_SVG_CACHE_SIZE = 4096
+HEXAGRAM_YANG_SYMBOL = "iching-line-yang"
+HEXAGRAM_YIN_SYMBOL = "iching-line-yin"
+# Symbols are drawn on a 100x15 line and stretched to each hexagram's size.
+HEXAGRAM_SPRITE = (
+    '<svg width="0" height="0" style="position: absolute;" aria-hidden="true">'
+    f'<symbol id="{HEXAGRAM_YANG_SYMBOL}" viewBox="0 0 100 15" preserveAspectRatio="none">'
+    '<rect x="0" y="0" width="100" height="15" rx="2" />'
+    '</symbol>'
+    f'<symbol id="{HEXAGRAM_YIN_SYMBOL}" viewBox="0 0 100 15" preserveAspectRatio="none">'
+    '<rect x="0" y="0" width="45" height="15" rx="2" />'
+    '<rect x="55" y="0" width="45" height="15" rx="2" />'
+    '</symbol>'
+    '</svg>'
+)
 
 
 def display_reading(reading, is_journal=False):
@@ -49,6 +69,8 @@ def display_compact_reading(reading):
             display_bilingual_text(None, primary_hex.get('judgment_zh'), primary_hex['judgment_en'])
         with st.expander("Image"):
             display_bilingual_text(None, primary_hex.get('image_zh'), primary_hex['image_en'])
+        with st.expander("Related Hexagrams"):
+            display_hexagram_relations(primary_hex)
         if changing_lines_indices:
             with st.expander("Changing Lines"):
                 for i in changing_lines_indices:
@@ -73,8 +95,9 @@ def display_compact_reading(reading):
 
 
 def inject_reading_styles():
-    """Adds reading-specific visual treatments."""
-    st.markdown(
+    """Adds reading-specific visual treatments once per page."""
+    inject_once(
+        "reading-styles",
         """
         <style>
             .reading-card {
@@ -163,7 +186,6 @@ def inject_reading_styles():
             }
         </style>
         """,
-        unsafe_allow_html=True,
     )
 
 
@@ -282,6 +304,31 @@ def display_primary_hexagram_step(reading):
         display_bilingual_text(None, primary_hex.get("judgment_zh"), primary_hex["judgment_en"])
     with st.expander("Read the Image"):
         display_bilingual_text(None, primary_hex.get("image_zh"), primary_hex["image_en"])
+    with st.expander("Related Hexagrams"):
+        display_hexagram_relations(primary_hex)
+
+
+def display_hexagram_relations(hexagram):
+    """Lists a hexagram's trigrams and its nuclear, inverse, and complementary hexagrams."""
+    for relation, description in get_hexagram_relations(hexagram["number"]):
+        st.markdown(f"**{relation}:** {description}")
+
+
+@lru_cache(maxsize=HEXAGRAM_COUNT)
+def get_hexagram_relations(number):
+    """Returns (relation, description) rows for a hexagram number, read from the precomputed tables."""
+    tables = get_hexagram_tables()
+    index = int(number) - 1
+    return (
+        (
+            "Trigrams",
+            f"{TRIGRAM_NAMES[tables.lower_trigram[index]]} below, "
+            f"{TRIGRAM_NAMES[tables.upper_trigram[index]]} above",
+        ),
+        ("Nuclear", f"{tables.label_for_number(tables.nuclear[index])} (the hidden core, lines 2-5)"),
+        ("Inverse", f"{tables.label_for_number(tables.inverse[index])} (the figure turned upside down)"),
+        ("Complementary", f"{tables.label_for_number(tables.complementary[index])} (every line changed to its opposite)"),
+    )
 
 
 def display_changing_lines_step(reading):
@@ -429,19 +476,32 @@ def get_closing_reflection(primary_hex, secondary_hex, changing_lines_indices):
     return f"What would it mean to fully practice {primary_hex['name_en']} before seeking the next answer?"
 
 def get_hexagram_svg(lines, changing_indices, line_height=15, line_width=100, gap=10):
-    """Generates an SVG for a hexagram."""
+    """Returns SVG markup for a hexagram that draws its lines from the shared sprite."""
+    inject_hexagram_sprite()
+    yang_lines = tuple(line_val not in (6, 8) for line_val in lines)
+    changing_lines = tuple(index in changing_indices for index in range(len(lines)))
+    return build_hexagram_svg(yang_lines, changing_lines, line_height, line_width, gap)
+
+
+@lru_cache(maxsize=HEXAGRAM_SVG_CACHE_SIZE)
+def build_hexagram_svg(yang_lines, changing_lines, line_height, line_width, gap):
+    """Builds hexagram SVG markup, memoized by line shapes, changing lines, and size.
+
+    Line 1 is the bottom line. Each line is a ``<use>`` of a sprite symbol,
+    so the markup stays small however many hexagrams a page shows.
+    """
     svg_height = (line_height + gap) * 6 - gap
     svg_lines = []
-    for i, line_val in enumerate(reversed(lines)):
-        is_changing = (len(lines) - 1 - i) in changing_indices
+    for i, (is_yang, is_changing) in enumerate(zip(reversed(yang_lines), reversed(changing_lines))):
         y = i * (line_height + gap)
         line_color = "#ffc107" if is_changing else "#6c757d"
-        animation = f'<animate attributeName="opacity" from="0" to="1" dur="0.5s" begin="{i*0.1}s" fill="freeze" />'
-        if line_val in [6, 8]:
-            svg_lines.append(f'<g transform="translate(0, {y})"><rect x="0" y="0" width="{line_width * 0.45}" height="{line_height}" fill="{line_color}" rx="2">{animation}</rect><rect x="{line_width * 0.55}" y="0" width="{line_width * 0.45}" height="{line_height}" fill="{line_color}" rx="2">{animation}</rect></g>')
-        else:
-            svg_lines.append(f'<g transform="translate(0, {y})"><rect x="0" y="0" width="{line_width}" height="{line_height}" fill="{line_color}" rx="2">{animation}</rect></g>')
-    
+        symbol_id = HEXAGRAM_YANG_SYMBOL if is_yang else HEXAGRAM_YIN_SYMBOL
+        svg_lines.append(
+            f'<use href="#{symbol_id}" x="0" y="{y}" width="{line_width}" height="{line_height}" fill="{line_color}">'
+            f'<animate attributeName="opacity" from="0" to="1" dur="0.5s" begin="{i*0.1}s" fill="freeze" />'
+            f'</use>'
+        )
+
     return f"""
         <div style="display: flex; justify-content: center; align-items: center;">
             <svg width="{line_width}" height="{svg_height}" viewbox="0 0 {line_width} {svg_height}">
@@ -450,6 +510,12 @@ def get_hexagram_svg(lines, changing_indices, line_height=15, line_width=100, ga
         </div>
     """
 
+
+def inject_hexagram_sprite():
+    """Adds the hexagram line symbols to the page once."""
+    inject_once("hexagram-sprite", HEXAGRAM_SPRITE)
+
+
 def display_bilingual_text(header, text_zh, text_en):
     """Displays Chinese and English text."""
     if header: